@@ -3,6 +3,7 @@
 from __future__ import absolute_import, unicode_literals
 import os
 from celery import Celery
+from celery.signals import worker_init, worker_process_shutdown
 
 # Set the default Django settings module
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
@@ -17,4 +18,17 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks()
 
 # Optional: Set a rate limit if necessary
-# app.conf.worker_prefetch_multiplier = 1
\ No newline at end of file
+# app.conf.worker_prefetch_multiplier = 1
+
+
+@worker_init.connect
+def reset_metrics(**kwargs):
+    # Runs in the parent process before the prefork children are started
+    from app.utils.metrics import reset_process_dir
+    reset_process_dir()
+
+
+@worker_process_shutdown.connect
+def mark_metrics_process_dead(pid=None, **kwargs):
+    from app.utils.metrics import mark_process_dead
+    mark_process_dead(pid or os.getpid())
\ No newline at end of file
@@ -1,14 +1,15 @@
 import traceback
 import logging
 from datetime import datetime
-from time import sleep
+from time import sleep, perf_counter
 
 import pandas as pd
 
-from app.utils.api.positions import get_positions
+from app.utils.api.positions import positions_view
 from app.utils.api.ticket import get_order_from_ticket, get_deal_from_ticket
 from app.utils.constants import TIMEZONE
 from app.utils.db.close import close_trade
+from app.utils.metrics import timed_stage, stage_duration, closes_detected
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +27,8 @@ def close_algorithm():
         current_time = datetime.now(TIMEZONE).replace(microsecond=0)
 
         # Fetch current open positions
-        positions = get_positions()
+        with timed_stage('close', 'positions'):
+            positions = positions_view.refresh()
         if positions.empty:
             positions = pd.DataFrame(columns=[
                 'ticket', 'time', 'time_msc', 'time_update', 'time_update_msc', 'type',
@@ -45,8 +47,10 @@ def close_algorithm():
         # Identify closed tickets
         closed_tickets = cached_tickets - current_tickets
 
+        closed_start = perf_counter()
         for ticket in closed_tickets:
             position = cached_positions.pop(ticket)
+            closes_detected.labels(position.symbol).inc()
             sleep(2)  # Optional: delay to ensure the trade is fully processed
 
             try:
@@ -86,6 +90,8 @@ def close_algorithm():
             except Exception as e:
                 error_msg = f"Error processing closed ticket {ticket}: {e}\n{traceback.format_exc()}"
                 logger.error({"error": error_msg, "ticket": ticket})
+        if closed_tickets:
+            stage_duration.labels('close', 'closed').observe(perf_counter() - closed_start)
 
         # Update cached_positions with current open positions
         for index, position in positions.iterrows():
@@ -7,53 +7,71 @@ from dotenv import load_dotenv
 import os
 from datetime import datetime, timedelta
 import traceback
+from time import perf_counter
 
 from app.utils.arithmetics import calculate_order_capital, calculate_order_size_usd, calculate_commission, get_price_at_pnl, get_pnl_at_price, convert_usd_to_lots
 from app.utils.constants import MT5Timeframe
-from app.utils.api.data import fetch_data_pos, symbol_info_tick
-from app.utils.api.positions import get_positions
-from app.utils.api.order import send_market_order
+from app.utils.snapshot import MarketSnapshot
+from app.utils.api.order import send_market_orders
 from app.utils.constants import TIMEZONE
 from app.utils.account import have_open_positions_in_symbol
 from app.utils.market import is_market_open
-from app.quant.indicators.mean_reversion import mean_reversion
+from app.quant.indicators.mean_reversion import SIGNAL_TOP, SIGNAL_BOTTOM, SIGNAL_NAMES
+from app.quant.indicators.bollinger_state import advance_signals
 from app.quant.algorithms.mean_reversion.config import PAIRS, MAIN_TIMEFRAME, TP_PNL_MULTIPLIER, SL_PNL_MULTIPLIER, LEVERAGE, DEVIATION, CAPITAL_PER_TRADE, TRAILING_STOP_STEPS
 from app.utils.db.create import create_trade
+from app.utils.metrics import timed_stage, stage_duration, orders_sent, signal_to_order
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Bars fetched per run: the forming bar plus the bars closed since the previous run
+TAIL_BARS = 10
+
 def entry_algorithm():
     try:
+        cycle_start = perf_counter()
+        with timed_stage('entry', 'fetch'):
+            # Positions, bars, ticks and uncached specs of every pair, fetched concurrently:
+            # the cycle waits for the slowest request instead of the sum of them
+            snapshot = MarketSnapshot.capture(PAIRS, MAIN_TIMEFRAME, TAIL_BARS)
+        if snapshot.positions is None:
+            logger.error("Skipping entry cycle because open positions could not be fetched.")
+            return
+        with timed_stage('entry', 'indicators'):
+            # Band states persist between runs, so only the bars closed since the last run are read
+            signal_by_pair = advance_signals(PAIRS, MAIN_TIMEFRAME, snapshot.rates)
+        signals = []
+        signals_start = perf_counter()
+
         for pair in PAIRS:            
             logger.info(f"Checking {pair} for open positions.")
-            if have_open_positions_in_symbol(pair):
+            if have_open_positions_in_symbol(pair, snapshot=snapshot):
                 logger.info(f"Skipping {pair} because it has open positions.")
                 continue
 
-            if not is_market_open(pair):
+            # Single-row frame, empty when the bridge had no tick for the pair
+            tick_info = snapshot.tick(pair)
+
+            if not is_market_open(pair, snapshot=snapshot):
                 logger.info(f"Skipping {pair} because the market is not open.")
                 continue
                 
-            df = fetch_data_pos(pair, MAIN_TIMEFRAME, 10)
-            if df is None or df.empty:
+            signal = signal_by_pair.get(pair)
+            if signal is None:
                 logger.info(f"Skipping {pair} because there is no data.")
                 continue
-            
-            df['mean_reversion'] = mean_reversion(df)
-            last_row = df.iloc[-2]
 
-            tick_info = symbol_info_tick(pair)
-            if tick_info is None or tick_info.empty:
+            if tick_info.empty:
                 logger.info(f"Skipping {pair} because there is no tick info.")
                 continue
 
             order_capital = CAPITAL_PER_TRADE
-            order_type = 'BUY' if last_row['mean_reversion'] == 'bottom' else 'SELL'
+            order_type = 'BUY' if signal == SIGNAL_BOTTOM else 'SELL'
             last_tick_price = tick_info['ask'].iloc[0] if order_type == 'BUY' else tick_info['bid'].iloc[0]
             price_decimals = len(str(last_tick_price).split('.')[-1])
             order_size_usd = calculate_order_size_usd(order_capital, LEVERAGE)
-            order_volume_lots = convert_usd_to_lots(pair, order_size_usd, order_type)
+            order_volume_lots = convert_usd_to_lots(pair, order_size_usd, order_type, price=last_tick_price, snapshot=snapshot)
 
             # Validate that 'order_volume_lots' is a float
             if isinstance(order_volume_lots, (pd.Series, pd.DataFrame)):
@@ -67,7 +85,7 @@ def entry_algorithm():
             desired_sl_pnl = order_capital * SL_PNL_MULTIPLIER
             commission = calculate_commission(order_size_usd, pair)
 
-            if last_row['mean_reversion'] in ['top', 'bottom']:
+            if signal in (SIGNAL_TOP, SIGNAL_BOTTOM):
                 sl_including_commission, sl_excluding_commission = get_price_at_pnl(
                     desired_pnl=desired_sl_pnl,
                     commission=commission,
@@ -88,91 +106,45 @@ def entry_algorithm():
                         logger.error({'error_msg': error_msg, 'sl_including_commission': sl_including_commission, 'tick_info': tick_info})
                         continue
                 
-                order = send_market_order(
-                    symbol=pair,
-                    volume=order_volume_lots,
-                    order_type=order_type,
-                    sl=round(sl_including_commission, price_decimals),
-                    deviation=DEVIATION,
-                    type_filling="ORDER_FILLING_FOK",
-                    position_size_usd=order_size_usd,
-                    commission=commission,
-                    capital=order_capital,
-                    leverage=LEVERAGE
-                )
-
-                if order is not None:
-                    trade_info = {
-                        'event': 'trade_opened',
+                # Queue the order; all signals of this cycle are sent together below
+                signals.append({
+                    'pair': pair,
+                    'order': {
                         'symbol': pair,
-                        'entry_condition': f"{last_row['mean_reversion'].upper()} MEAN REVERSION DETECTED",
-                        'order_capital': f"${order_capital:.5f}",
-                        'order_size_usd': f"${order_size_usd:.5f}",
-                        'sl_pnl_multiplier': f"{SL_PNL_MULTIPLIER * 100}%",
-                        'desired_sl_pnl': f"${desired_sl_pnl:.5f}",
-                        'commission': f"${commission:.5f}",
-                        'order_info': {
-                            'order': order,  # Include the entire order response
-                            'type': order_type,
-                            "sl": sl_including_commission,
-                        },
-                        'tick_info': tick_info,
-                        'sl_including_commission': {
-                            'sl_including_commission': f"${sl_including_commission:.5f}",
-                            'sl_price_difference_including_commission': f"${(sl_including_commission - last_tick_price):.5f}",
-                            'sl_price_difference_percentage_including_commission': f"{(sl_including_commission / last_tick_price - 1) * 100:.5f}%",
-                            'pnl_at_sl_including_commission': f"${get_pnl_at_price(sl_including_commission, last_tick_price, order_size_usd, LEVERAGE, order_type, commission)[1]:.5f}",
-                        },
-                        'sl_excluding_commission': {
-                            'sl_excluding_commission': f"${sl_excluding_commission:.5f}",
-                            'sl_price_difference_excluding_commission': f"${(sl_excluding_commission - last_tick_price):.5f}",
-                            'sl_price_difference_percentage_excluding_commission': f"{(sl_excluding_commission / last_tick_price - 1) * 100:.5f}%",
-                            'pnl_at_sl_excluding_commission': f"${get_pnl_at_price(sl_excluding_commission, last_tick_price, order_size_usd, LEVERAGE, order_type, commission)[1]:.5f}",
-                        },
-                    }
-
-                    try:
-                        create_trade(order, pair, order_capital, order_size_usd, 
-                                     LEVERAGE, commission, order_type, 'Alpari',
-                                     'FOREX', 'MEAN REVERSION', MAIN_TIMEFRAME, order_volume_lots,
-                                     sl_including_commission, None)
-                    except Exception as e:
-                        error_msg = f"Error creating trade record in DB: {e}\n{traceback.format_exc()}"
-                        logger.error(error_msg)
-
-                    info_msg = f"Order placed successfully for {pair}"
-                    logger.info(info_msg, order, trade_info)
-                else:
-                    trade_info = {
-                        'event': 'trade_failed_to_open',
-                        'entry_condition': f"{last_row['mean_reversion'].upper()} MEAN REVERSION DETECTED",
-                        'symbol': pair,
-                        'type': order_type,
-                        'order_capital': f"${order_capital:.5f}",
-                        'order_volume_lots': f"{order_volume_lots} lots",
-                        'order_size_usd': f"${order_size_usd:.5f}",
-                        'sl_pnl_multiplier': f"{SL_PNL_MULTIPLIER * 100}%",
-                        'desired_sl_pnl': f"${desired_sl_pnl:.5f}",
-                        'commission': f"${commission:.5f}",
-                        'tick_info': tick_info,
-                        'sl_including_commission': {
-                            'sl_including_commission': f"${sl_including_commission:.5f}",
-                            'sl_price_difference_including_commission': f"${(sl_including_commission - last_tick_price):.5f}",
-                            'sl_price_difference_percentage_including_commission': f"{(sl_including_commission / last_tick_price - 1) * 100:.5f}%",
-                            'pnl_at_sl_including_commission': f"${get_pnl_at_price(sl_including_commission, last_tick_price, order_size_usd, LEVERAGE, order_type, commission)[1]:.5f}",
-                        },
-                        'sl_excluding_commission': {
-                            'sl_excluding_commission': f"${sl_excluding_commission:.5f}",
-                            'sl_price_difference_excluding_commission': f"${(sl_excluding_commission - last_tick_price):.5f}",
-                            'sl_price_difference_percentage_excluding_commission': f"{(sl_excluding_commission / last_tick_price - 1) * 100:.5f}%",
-                            'pnl_at_sl_excluding_commission': f"${get_pnl_at_price(sl_excluding_commission, last_tick_price, order_size_usd, LEVERAGE, order_type, commission)[1]:.5f}",
-                        },
-                    }
-                    error_msg = f"Order failed to open for {pair}"
-                    logger.error(error_msg, order, trade_info)
+                        'volume': order_volume_lots,
+                        'order_type': order_type,
+                        'sl': round(sl_including_commission, price_decimals),
+                        'deviation': DEVIATION,
+                        'type_filling': "ORDER_FILLING_FOK",
+                    },
+                    'entry_condition': f"{SIGNAL_NAMES[signal].upper()} MEAN REVERSION DETECTED",
+                    'order_type': order_type,
+                    'order_capital': order_capital,
+                    'order_size_usd': order_size_usd,
+                    'order_volume_lots': order_volume_lots,
+                    'desired_sl_pnl': desired_sl_pnl,
+                    'commission': commission,
+                    'last_tick_price': last_tick_price,
+                    'tick_info': tick_info,
+                    'sl_including_commission': sl_including_commission,
+                    'sl_excluding_commission': sl_excluding_commission,
+                })
             else:
                 message = f"No mean reversion detected for {pair}."
                 logger.info(message)
+        stage_duration.labels('entry', 'signals').observe(perf_counter() - signals_start)
+
+        if signals:
+            # One round trip for every entry of this cycle, executed back-to-back by the bridge
+            with timed_stage('entry', 'orders'):
+                orders = send_market_orders([signal['order'] for signal in signals]) or [None] * len(signals)
+            orders_done = perf_counter()
+            with timed_stage('entry', 'record'):
+                for signal, order in zip(signals, orders):
+                    orders_sent.labels(signal['pair'], signal['order_type'], 'opened' if order is not None else 'failed').inc()
+                    if order is not None:
+                        signal_to_order.labels(signal['pair']).observe(orders_done - cycle_start)
+                    open_trade(signal, order)
         
     except requests.RequestException as e:
         error_msg = f"Error fetching MT5 data: {str(e)}"
@@ -181,3 +153,88 @@ def entry_algorithm():
         error_msg = f"Exception in entry_algorithm: {e}\n{traceback.format_exc()}"
         logger.error(error_msg)
 
+
+def open_trade(signal, order):
+    """Record and log the outcome of a queued entry signal; ``order`` is None if it failed to open."""
+    pair = signal['pair']
+    entry_condition = signal['entry_condition']
+    order_type = signal['order_type']
+    order_capital = signal['order_capital']
+    order_size_usd = signal['order_size_usd']
+    order_volume_lots = signal['order_volume_lots']
+    desired_sl_pnl = signal['desired_sl_pnl']
+    commission = signal['commission']
+    last_tick_price = signal['last_tick_price']
+    tick_info = signal['tick_info']
+    sl_including_commission = signal['sl_including_commission']
+    sl_excluding_commission = signal['sl_excluding_commission']
+
+    if order is not None:
+        trade_info = {
+            'event': 'trade_opened',
+            'symbol': pair,
+            'entry_condition': entry_condition,
+            'order_capital': f"${order_capital:.5f}",
+            'order_size_usd': f"${order_size_usd:.5f}",
+            'sl_pnl_multiplier': f"{SL_PNL_MULTIPLIER * 100}%",
+            'desired_sl_pnl': f"${desired_sl_pnl:.5f}",
+            'commission': f"${commission:.5f}",
+            'order_info': {
+                'order': order,  # Include the entire order response
+                'type': order_type,
+                "sl": sl_including_commission,
+            },
+            'tick_info': tick_info,
+            'sl_including_commission': {
+                'sl_including_commission': f"${sl_including_commission:.5f}",
+                'sl_price_difference_including_commission': f"${(sl_including_commission - last_tick_price):.5f}",
+                'sl_price_difference_percentage_including_commission': f"{(sl_including_commission / last_tick_price - 1) * 100:.5f}%",
+                'pnl_at_sl_including_commission': f"${get_pnl_at_price(sl_including_commission, last_tick_price, order_size_usd, LEVERAGE, order_type, commission)[1]:.5f}",
+            },
+            'sl_excluding_commission': {
+                'sl_excluding_commission': f"${sl_excluding_commission:.5f}",
+                'sl_price_difference_excluding_commission': f"${(sl_excluding_commission - last_tick_price):.5f}",
+                'sl_price_difference_percentage_excluding_commission': f"{(sl_excluding_commission / last_tick_price - 1) * 100:.5f}%",
+                'pnl_at_sl_excluding_commission': f"${get_pnl_at_price(sl_excluding_commission, last_tick_price, order_size_usd, LEVERAGE, order_type, commission)[1]:.5f}",
+            },
+        }
+
+        try:
+            create_trade(order, pair, order_capital, order_size_usd, 
+                         LEVERAGE, commission, order_type, 'Alpari',
+                         'FOREX', 'MEAN REVERSION', MAIN_TIMEFRAME, order_volume_lots,
+                         sl_including_commission, None)
+        except Exception as e:
+            error_msg = f"Error creating trade record in DB: {e}\n{traceback.format_exc()}"
+            logger.error(error_msg)
+
+        info_msg = f"Order placed successfully for {pair}"
+        logger.info(info_msg, order, trade_info)
+    else:
+        trade_info = {
+            'event': 'trade_failed_to_open',
+            'entry_condition': entry_condition,
+            'symbol': pair,
+            'type': order_type,
+            'order_capital': f"${order_capital:.5f}",
+            'order_volume_lots': f"{order_volume_lots} lots",
+            'order_size_usd': f"${order_size_usd:.5f}",
+            'sl_pnl_multiplier': f"{SL_PNL_MULTIPLIER * 100}%",
+            'desired_sl_pnl': f"${desired_sl_pnl:.5f}",
+            'commission': f"${commission:.5f}",
+            'tick_info': tick_info,
+            'sl_including_commission': {
+                'sl_including_commission': f"${sl_including_commission:.5f}",
+                'sl_price_difference_including_commission': f"${(sl_including_commission - last_tick_price):.5f}",
+                'sl_price_difference_percentage_including_commission': f"{(sl_including_commission / last_tick_price - 1) * 100:.5f}%",
+                'pnl_at_sl_including_commission': f"${get_pnl_at_price(sl_including_commission, last_tick_price, order_size_usd, LEVERAGE, order_type, commission)[1]:.5f}",
+            },
+            'sl_excluding_commission': {
+                'sl_excluding_commission': f"${sl_excluding_commission:.5f}",
+                'sl_price_difference_excluding_commission': f"${(sl_excluding_commission - last_tick_price):.5f}",
+                'sl_price_difference_percentage_excluding_commission': f"{(sl_excluding_commission / last_tick_price - 1) * 100:.5f}%",
+                'pnl_at_sl_excluding_commission': f"${get_pnl_at_price(sl_excluding_commission, last_tick_price, order_size_usd, LEVERAGE, order_type, commission)[1]:.5f}",
+            },
+        }
+        error_msg = f"Order failed to open for {pair}"
+        logger.error(error_msg, order, trade_info)
@@ -22,11 +22,12 @@ from app.utils.arithmetics import (
 )
 from app.utils.constants import MT5Timeframe, TIMEZONE
 from app.utils.api.data import fetch_data_pos, symbol_info_tick
-from app.utils.api.positions import get_positions
-from app.utils.api.order import modify_sl_tp
+from app.utils.api.positions import positions_view
+from app.utils.api.order import modify_sl_tp_batch
 from app.utils.api.ticket import get_order_from_ticket, get_deal_from_ticket
 from app.utils.db.mutation import mutate_trade
 from app.utils.db.get import get_trade_with_mutations
+from app.utils.metrics import timed_stage, stage_duration, sl_moves
 from app.quant.algorithms.mean_reversion.config import (
     PAIRS,
     MAIN_TIMEFRAME,
@@ -53,12 +54,15 @@ def trailing_stop_algorithm():
 
     try:
         current_time = datetime.now(TIMEZONE).replace(microsecond=0)
-        positions = get_positions()
+        with timed_stage('trailing', 'positions'):
+            positions = positions_view.refresh()
 
         if positions.empty:
             logger.info('No positions found')
             return
 
+        pending_modifications = []
+
         for index, position in positions.iterrows():
             logger.info('Starting position timer')
             position_start_time = perf_counter()  # Start timing for the position
@@ -141,7 +145,7 @@ def trailing_stop_algorithm():
                                 'capital_used': f"${trade.capital:.5f}",
                                 'position_size': f"${trade.position_size_usd:.5f}",
                                 'deduced_volume': f"${calculate_trade_volume(position.price_open, position.price_current, position.profit, trade.leverage):.5f}",
-                                'deduced_volume_lots': f"${convert_usd_to_lots(position.symbol, trade.position_size_usd, trade.type):.5f}",
+                                'deduced_volume_lots': f"${convert_usd_to_lots(position.symbol, trade.position_size_usd, trade.type, price=position.price_current):.5f}",
                                 'commission': f"${trade.order_commission:.5f}",
                             },
                             'trigger_data': {
@@ -170,19 +174,8 @@ def trailing_stop_algorithm():
                             }
                         }
 
-                        # Modify the Stop Loss and Take Profit
-                        modify_request = modify_sl_tp(position, new_sl_price)
-                        if modify_request is not None:
-                            logger.info({'message': 'successfully modified sl from mt5 api', 'modify_request': modify_request, 'sl_info': sl_info})
-
-                            # Create a mutation record in the database
-                            mutation = mutate_trade(position, current_time, new_sl_price, pnl_at_new_sl)
-                            if mutation is not None:
-                                logger.info({'message': 'mutation created', 'mutation': mutation})
-                            else:
-                                logger.info({'message': 'mutation creation failed', 'sl_info': sl_info})
-                        else:
-                            logger.info({'message': 'failed to modify sl from mt5 api', 'sl_info': sl_info})
+                        # Queue the SL move; every position's move is sent in one batch below
+                        pending_modifications.append((position, new_sl_price, pnl_at_new_sl, sl_info))
                         
                         # End timing for the trailing step
                         trailing_end_time = perf_counter()
@@ -199,6 +192,27 @@ def trailing_stop_algorithm():
             position_end_time = perf_counter()
             position_duration = position_end_time - position_start_time
             logger.info(f"Processed position {position.ticket} in {position_duration:.4f} seconds.")
+            stage_duration.labels('trailing', 'position').observe(position_duration)
+
+        if pending_modifications:
+            with timed_stage('trailing', 'modify'):
+                results = modify_sl_tp_batch(
+                    (position.ticket, new_sl_price, None) for position, new_sl_price, _, _ in pending_modifications
+                ) or {}
+            for position, new_sl_price, pnl_at_new_sl, sl_info in pending_modifications:
+                modify_request = results.get(position.ticket)
+                sl_moves.labels(position.symbol, 'modified' if modify_request is not None else 'failed').inc()
+                if modify_request is not None:
+                    logger.info({'message': 'successfully modified sl from mt5 api', 'modify_request': modify_request, 'sl_info': sl_info})
+
+                    # Create a mutation record in the database
+                    mutation = mutate_trade(position, current_time, new_sl_price, pnl_at_new_sl)
+                    if mutation is not None:
+                        logger.info({'message': 'mutation created', 'mutation': mutation})
+                    else:
+                        logger.info({'message': 'mutation creation failed', 'sl_info': sl_info})
+                else:
+                    logger.info({'message': 'failed to modify sl from mt5 api', 'sl_info': sl_info})
 
     except Exception as e:
         error_msg = f"Exception in trailing_stop_algorithm: {e}\n{traceback.format_exc()}"
@@ -0,0 +1,187 @@
+import math
+import logging
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from django.core.cache import cache
+
+from app.utils.constants import MT5Timeframe
+from app.utils.api.data import fetch_data_pos_batch
+from app.quant.indicators.mean_reversion import SIGNAL_NONE, SIGNAL_TOP, SIGNAL_BOTTOM
+
+logger = logging.getLogger(__name__)
+
+STATE_TTL = 7 * 24 * 60 * 60  # seconds; a state unused for longer is rebuilt from history
+# Sliding updates accumulate rounding error; the sums are recomputed from the window this often
+RECOMPUTE_EVERY = 1000
+
+
+def _epoch_seconds(times: pd.Series) -> np.ndarray:
+    if pd.api.types.is_datetime64_any_dtype(times):
+        # dtype= also converts tz-aware times (UTC) instead of returning Timestamp objects
+        return times.to_numpy(dtype='datetime64[s]').astype(np.int64)
+    return times.to_numpy().astype(np.int64)
+
+
+class BollingerState:
+    """
+    Rolling Bollinger Bands of one (symbol, timeframe), advanced one closed bar at a time.
+
+    Keeps the last ``window`` closes in a ring buffer with their mean and sum of squared
+    deviations (Welford's algorithm, with the sliding-window update once the buffer is full),
+    so each bar costs O(1). Signals are the same as ``mean_reversion()``: the close crossing
+    above the upper band (SIGNAL_TOP) or below the lower band (SIGNAL_BOTTOM).
+    """
+
+    def __init__(self, window: int = 20, num_std_dev: float = 2):
+        self.window = window
+        self.num_std_dev = num_std_dev
+        self.closes = deque(maxlen=window)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.updates = 0
+        self.last_time = None  # open time (epoch seconds) of the last bar consumed
+        self.previous = None  # (close, upper, lower) of the last bar consumed
+        self.signal = SIGNAL_NONE  # signal of the last bar consumed
+
+    def _recompute(self):
+        closes = np.fromiter(self.closes, dtype=np.float64)
+        self.mean = float(closes.mean()) if len(closes) else 0.0
+        self.m2 = float(((closes - self.mean) ** 2).sum())
+
+    def _push(self, close: float):
+        if len(self.closes) < self.window:
+            self.closes.append(close)
+            delta = close - self.mean
+            self.mean += delta / len(self.closes)
+            self.m2 += delta * (close - self.mean)
+        else:
+            dropped = self.closes[0]
+            self.closes.append(close)
+            previous_mean = self.mean
+            self.mean += (close - dropped) / self.window
+            self.m2 += (close - dropped) * (close - self.mean + dropped - previous_mean)
+        self.updates += 1
+        if self.updates % RECOMPUTE_EVERY == 0:
+            self._recompute()
+
+    def bands(self):
+        """(upper, lower) over the current window, or (nan, nan) until it is full."""
+        if len(self.closes) < self.window:
+            return math.nan, math.nan
+        std = math.sqrt(max(self.m2, 0.0) / (self.window - 1))
+        return self.mean + std * self.num_std_dev, self.mean - std * self.num_std_dev
+
+    def update(self, time: int, close: float) -> int:
+        """Consume one closed bar and return its signal."""
+        self._push(close)
+        upper, lower = self.bands()
+
+        self.signal = SIGNAL_NONE
+        if self.previous is not None:
+            previous_close, previous_upper, previous_lower = self.previous
+            # Comparisons with NaN bands are False, as in mean_reversion()
+            if previous_close <= previous_upper and close > upper:
+                self.signal = SIGNAL_TOP
+            elif previous_close >= previous_lower and close < lower:
+                self.signal = SIGNAL_BOTTOM
+
+        self.previous = (close, upper, lower)
+        self.last_time = time
+        return self.signal
+
+    @property
+    def warm(self) -> bool:
+        return len(self.closes) == self.window
+
+    def advance(self, bars: pd.DataFrame) -> bool:
+        """
+        Consume the closed bars of ``bars`` newer than the last one consumed. The last row is
+        the bar still forming and is ignored.
+
+        :return: False when ``bars`` does not reach back to the last bar consumed, i.e. bars
+                 were missed and the state must be rebuilt from a longer history.
+        """
+        closed = bars.iloc[:-1]
+        times = _epoch_seconds(closed['time'])
+        closes = closed['close'].to_numpy(dtype=np.float64)
+
+        if self.last_time is not None and len(times):
+            if times[0] > self.last_time:
+                return False
+            new = times > self.last_time
+            times, closes = times[new], closes[new]
+
+        for time, close in zip(times.tolist(), closes.tolist()):
+            self.update(time, close)
+        return True
+
+    def to_dict(self) -> Dict:
+        return {
+            'window': self.window, 'num_std_dev': self.num_std_dev, 'closes': list(self.closes),
+            'mean': self.mean, 'm2': self.m2, 'updates': self.updates, 'last_time': self.last_time,
+            'previous': self.previous, 'signal': self.signal,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'BollingerState':
+        state = cls(data['window'], data['num_std_dev'])
+        state.closes.extend(data['closes'])
+        state.mean = data['mean']
+        state.m2 = data['m2']
+        state.updates = data['updates']
+        state.last_time = data['last_time']
+        state.previous = tuple(data['previous']) if data['previous'] is not None else None
+        state.signal = data['signal']
+        return state
+
+
+def _state_key(symbol: str, timeframe: MT5Timeframe, window: int, num_std_dev: float) -> str:
+    return f"bollinger:{symbol}:{timeframe.value}:{window}:{num_std_dev}"
+
+
+def advance_signals(symbols: List[str], timeframe: MT5Timeframe, rates_by_symbol: Dict[str, pd.DataFrame],
+                    window: int = 20, num_std_dev: float = 2) -> Dict[str, Optional[int]]:
+    """
+    Mean reversion signal of the last closed bar of each symbol, from band states kept in the
+    default Django cache between runs (per process unless CACHES points it to a shared store).
+
+    ``rates_by_symbol`` only needs the latest few bars (the tail since the previous run plus
+    the forming bar). Symbols without a state, or whose tail does not reach the last bar
+    consumed, are rebuilt from ``window`` + tail bars fetched in one batch request.
+
+    :return: The signal per symbol, or None while its bands are not warmed up yet.
+    """
+    keys = {symbol: _state_key(symbol, timeframe, window, num_std_dev) for symbol in symbols}
+    stored = cache.get_many(list(keys.values()))
+
+    states = {}
+    rebuild = []
+    for symbol in symbols:
+        bars = rates_by_symbol.get(symbol)
+        if bars is None or bars.empty:
+            continue
+        data = stored.get(keys[symbol])
+        state = BollingerState.from_dict(data) if data is not None else None
+        if state is not None and state.advance(bars):
+            states[symbol] = state
+        else:
+            rebuild.append(symbol)
+
+    if rebuild:
+        tail = max(len(rates_by_symbol[symbol]) for symbol in rebuild)
+        history = fetch_data_pos_batch(rebuild, timeframe, window + tail) or {}
+        for symbol in rebuild:
+            bars = history.get(symbol)
+            if bars is None or bars.empty:
+                logger.error(f"No history to rebuild the Bollinger state of {symbol} on {timeframe}")
+                continue
+            state = BollingerState(window, num_std_dev)
+            state.advance(bars)
+            states[symbol] = state
+        logger.info(f"Rebuilt Bollinger states on {timeframe} for: {rebuild}")
+
+    cache.set_many({keys[symbol]: state.to_dict() for symbol, state in states.items()}, STATE_TTL)
+    return {symbol: (state.signal if state.warm else None) for symbol, state in states.items()}
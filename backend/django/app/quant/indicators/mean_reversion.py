@@ -1,58 +1,48 @@
 import pandas as pd
 import numpy as np
 
+# Signal values of mean_reversion()
+SIGNAL_NONE = 0
+SIGNAL_TOP = 1  # close crossed above the upper band: potential reversion to the downside
+SIGNAL_BOTTOM = -1  # close crossed below the lower band: potential reversion to the upside
+SIGNAL_NAMES = {SIGNAL_NONE: 'none', SIGNAL_TOP: 'top', SIGNAL_BOTTOM: 'bottom'}
+
 def mean_reversion(data, window=20, num_std_dev=2):
     """
     Calculates the Mean Reversion signals based on Bollinger Bands.
 
     Parameters:
     - data (pd.DataFrame): DataFrame containing at least a 'close' column with closing prices.
+      It is not modified.
     - window (int): The rolling window size for calculating the moving average and standard deviation.
     - num_std_dev (int): Number of standard deviations to set the upper and lower bands.
 
     Returns:
-    - pd.Series: A series with 'top', 'bottom', or 0 indicating potential reversal points.
+    - pd.Series: An int8 series aligned with ``data``: SIGNAL_TOP, SIGNAL_BOTTOM or SIGNAL_NONE
+      indicating potential reversal points (SIGNAL_NAMES maps them to 'top'/'bottom').
     """
 
     # Ensure the DataFrame has a 'close' column
     if 'close' not in data.columns:
         raise ValueError("DataFrame must contain a 'close' column.")
 
-    # Calculate the rolling mean and standard deviation
-    rolling_mean = data['close'].rolling(window=window).mean()
-    rolling_std = data['close'].rolling(window=window).std()
-
-    # Calculate Bollinger Bands
-    data['bollinger_upper'] = rolling_mean + (rolling_std * num_std_dev)
-    data['bollinger_lower'] = rolling_mean - (rolling_std * num_std_dev)
-
-    # Initialize the mean_reversion column with 0
-    data['mean_reversion'] = 0
-
-    # Generate signals
-    for idx in range(1, len(data)):
-        previous_close = data['close'].iloc[idx - 1]
-        current_close = data['close'].iloc[idx]
-        previous_upper = data['bollinger_upper'].iloc[idx - 1]
-        current_upper = data['bollinger_upper'].iloc[idx]
-        previous_lower = data['bollinger_lower'].iloc[idx - 1]
-        current_lower = data['bollinger_lower'].iloc[idx]
-
-        # Check for price crossing above the upper band (potential mean reversion to the downside)
-        if (previous_close <= previous_upper) and (current_close > current_upper):
-            data.at[data.index[idx], 'mean_reversion'] = 'top'
-
-        # Check for price crossing below the lower band (potential mean reversion to the upside)
-        elif (previous_close >= previous_lower) and (current_close < current_lower):
-            data.at[data.index[idx], 'mean_reversion'] = 'bottom'
-
-        # Optionally, you can add conditions for crossing back within the bands
-        # to reset signals or confirm reversals.
-
-    # Replace NaN values with 0
-    data['mean_reversion'].fillna(0, inplace=True)
-
-    # Clean up intermediate columns if not needed
-    data.drop(['bollinger_upper', 'bollinger_lower'], axis=1, inplace=True)
-
-    return data['mean_reversion']
+    # Calculate the rolling mean and standard deviation, then the Bollinger Bands
+    close = data['close'].astype(np.float64)
+    rolling = close.rolling(window=window)
+    rolling_mean = rolling.mean().to_numpy()
+    rolling_std = rolling.std().to_numpy()
+    upper = rolling_mean + rolling_std * num_std_dev
+    lower = rolling_mean - rolling_std * num_std_dev
+    close = close.to_numpy()
+
+    # Each bar is compared with the previous one; comparisons with NaN bands (the first
+    # window - 1 bars) are False, so those bars get no signal
+    previous_close, current_close = close[:-1], close[1:]
+    crossed_up = (previous_close <= upper[:-1]) & (current_close > upper[1:])
+    crossed_down = (previous_close >= lower[:-1]) & (current_close < lower[1:]) & ~crossed_up
+
+    signals = np.zeros(len(close), dtype=np.int8)
+    signals[1:][crossed_up] = SIGNAL_TOP
+    signals[1:][crossed_down] = SIGNAL_BOTTOM
+
+    return pd.Series(signals, index=data.index, name='mean_reversion')
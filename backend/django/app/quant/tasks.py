@@ -7,6 +7,7 @@ from celery.exceptions import SoftTimeLimitExceeded
 from app.quant.algorithms.mean_reversion.entry import entry_algorithm
 from app.quant.algorithms.mean_reversion.trailing import trailing_stop_algorithm
 from app.quant.algorithms.close.close import close_algorithm
+from app.utils.metrics import timed_task
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +15,8 @@ logger = logging.getLogger(__name__)
 def run_quant_entry_algorithm():
     try:
         logger.info("Starting quant entry algorithm...")
-        entry_algorithm()
+        with timed_task('entry'):
+            entry_algorithm()
     except SoftTimeLimitExceeded:
         logger.error("Task timed out.")
     except Exception as e:
@@ -24,7 +26,8 @@ def run_quant_entry_algorithm():
 def run_quant_trailing_stop_algorithm():
     try:
         logger.info("Starting quant trailing stop algorithm...")
-        trailing_stop_algorithm()
+        with timed_task('trailing_stop'):
+            trailing_stop_algorithm()
     except SoftTimeLimitExceeded:
         logger.error("Task timed out during trailing stop algorithm.")
     except Exception as e:
@@ -34,7 +37,8 @@ def run_quant_trailing_stop_algorithm():
 def run_quant_close_algorithm():
     try:
         logger.info("Starting quant close algorithm...")
-        close_algorithm()
+        with timed_task('close'):
+            close_algorithm()
     except SoftTimeLimitExceeded:
         logger.error("Task timed out.")
     except Exception as e:
@@ -4,6 +4,8 @@ from django.urls import path, include
 from django.http import HttpResponse
 from django.shortcuts import render
 
+from app.utils.metrics import metrics_view
+
 def home_view(request):
     return HttpResponse("""
     <html>
@@ -36,4 +38,5 @@ urlpatterns = [
     path('', home_view, name='home'),  # ✅ Nueva línea
     path('admin/', admin.site.urls),
     path('v1/', include('app.nexus.urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]
\ No newline at end of file
@@ -6,8 +6,12 @@ from app.utils.api.positions import get_positions
 
 logger = logging.getLogger(__name__)
 
-def have_open_positions_in_symbol(symbol):
+def have_open_positions_in_symbol(symbol, snapshot=None):
+    """Whether any position is open in ``symbol``; read from ``snapshot`` (a MarketSnapshot) when given."""
     try:
+        if snapshot is not None and snapshot.open_symbols is not None:
+            return symbol in snapshot.open_symbols
+
         positions = get_positions()
         # Handle empty DataFrame case
         if not isinstance(positions, pd.DataFrame):
@@ -0,0 +1,99 @@
+import os
+import asyncio
+import logging
+import traceback
+from typing import Dict, List
+
+import httpx
+
+from app.utils.constants import MT5Timeframe
+from app.utils.api.client import READ_RETRIES, BRIDGE_POOL_SIZE, auth_headers, timeout_for
+from app.utils.api.columnar import ACCEPT_COLUMNAR
+from app.utils.api.data import _batch_frames, _cached_specs, _store_specs, _ticks_frame
+from app.utils.api.positions import _positions_frame
+from app.utils.metrics import observe_bridge_response
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = os.getenv('MT5_API_URL')
+# Bridge requests in flight at once; the bridge serializes terminal calls, so more mostly queue there
+ASYNC_CONCURRENCY = int(os.getenv('MT5_API_CONCURRENCY', BRIDGE_POOL_SIZE))
+
+
+class AsyncBridgeClient:
+    """
+    asyncio client for the MT5 bridge: one httpx connection pool, and at most ``concurrency``
+    requests in flight however many coroutines share it. Use it as an async context manager.
+
+    Timeouts, the Bearer token and the latency metrics are the same as for the blocking
+    session in ``client``; connection failures are retried, responses are not.
+    """
+
+    def __init__(self, concurrency: int = ASYNC_CONCURRENCY):
+        self._semaphore = asyncio.Semaphore(concurrency)
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        self._client = httpx.AsyncClient(
+            headers=auth_headers(), transport=httpx.AsyncHTTPTransport(limits=limits, retries=READ_RETRIES))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._client.aclose()
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        connect, read = timeout_for(url)
+        kwargs.setdefault('timeout', httpx.Timeout(read, connect=connect))
+        async with self._semaphore:
+            response = await self._client.get(url, **kwargs)
+        observe_bridge_response(response)
+        return response
+
+
+async def _fetch(name: str, request, parse):
+    try:
+        response = await request
+        response.raise_for_status()
+        return parse(response)
+    except Exception as e:
+        logger.error(f"Exception prefetching {name}: {e}\n{traceback.format_exc()}")
+
+
+async def _symbol_specs(bridge: AsyncBridgeClient, symbols: List[str]) -> Dict[str, Dict]:
+    specs = _cached_specs(symbols)
+
+    missing = [symbol for symbol in symbols if symbol not in specs]
+    fetched = await asyncio.gather(*(
+        _fetch(f"symbol spec for {symbol}", bridge.get(f"{BASE_URL}/symbol_spec/{symbol}"), lambda r: r.json())
+        for symbol in missing
+    ))
+    fetched = {symbol: spec for symbol, spec in zip(missing, fetched) if spec is not None}
+    if fetched:
+        _store_specs(fetched)
+    specs.update(fetched)
+    return specs
+
+
+async def prefetch_market_data(symbols: List[str], timeframe: MT5Timeframe, bars: int,
+                               concurrency: int = ASYNC_CONCURRENCY) -> Dict:
+    """
+    Fetch everything an entry cycle reads from the bridge, concurrently: open positions,
+    the latest ``bars`` bars and tick of every symbol, and the specs missing from the cache
+    (which are stored there, so later symbol_spec() calls do not hit the bridge).
+
+    :return: A dict with 'positions' (DataFrame), 'rates' (dict of DataFrames by symbol),
+             'ticks' (DataFrame indexed by symbol) and 'specs' (dict by symbol). A value is
+             None when its request failed.
+    """
+    params = {'symbols': ','.join(symbols), 'timeframe': timeframe.value, 'num_bars': bars}
+    async with AsyncBridgeClient(concurrency) as bridge:
+        positions, rates, ticks, specs = await asyncio.gather(
+            _fetch("positions", bridge.get(f"{BASE_URL}/get_positions"), _positions_frame),
+            _fetch(f"rates for {symbols}",
+                   bridge.get(f"{BASE_URL}/fetch_data_pos/batch", params=params, headers={'Accept': ACCEPT_COLUMNAR}),
+                   lambda response: _batch_frames(response, timeframe)),
+            _fetch(f"ticks for {symbols}",
+                   bridge.get(f"{BASE_URL}/symbol_info_ticks", params={'symbols': params['symbols']}), _ticks_frame),
+            _symbol_specs(bridge, symbols),
+        )
+    return {'positions': positions, 'rates': rates, 'ticks': ticks, 'specs': specs}
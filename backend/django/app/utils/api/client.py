@@ -0,0 +1,241 @@
+import os
+import copy
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import requests
+import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.utils.api.columnar import COLUMNAR_STREAM_MIMETYPE, decode_columns, iter_stream_frames
+from app.utils.metrics import bridge_endpoint, observe_bridge_response
+
+logger = logging.getLogger(__name__)
+
+# Keep-alive connections to the bridge per process; a cycle makes dozens of calls
+BRIDGE_POOL_SIZE = int(os.getenv('MT5_API_POOL_SIZE', 10))
+CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 10
+# Read timeout per bridge endpoint (see metrics.bridge_endpoint)
+READ_TIMEOUTS = {
+    'symbol_info_tick': 5,
+    'symbol_info_ticks': 5,
+    'send_market_order': 10,
+    'modify_sl_tp': 10,
+    'orders/batch': 30,
+    'modify_sl_tp/batch': 30,
+    'fetch_data_pos/batch': 30,
+    'fetch_data_range': 60,
+    'history_deals_get': 30,
+    'history_orders_get': 30,
+}
+# Idempotent reads are retried on connection errors and gateway errors; orders are never
+# resent, they are only retried when the connection could not be established at all
+READ_RETRIES = 2
+RETRY_BACKOFF = 0.1  # seconds, doubled per retry
+RETRY_JITTER = 0.1  # seconds of random delay added to each backoff
+RETRY_STATUSES = (502, 503, 504)
+
+# Validators remembered per process; the least recently used URL is forgotten first
+CONDITIONAL_CACHE_MAX = 512
+NDJSON_MIMETYPE = 'application/x-ndjson'
+STREAM_RETRIES = 3  # consecutive failed attempts before a paged stream gives up
+STREAM_READ_TIMEOUT = 60  # seconds without data before the connection is considered dead
+
+
+_session = None
+_session_pid = None
+_token = os.getenv('MT5_API_TOKEN')
+_session_lock = threading.Lock()
+
+
+def _new_session() -> requests.Session:
+    retry = Retry(
+        total=READ_RETRIES, connect=READ_RETRIES, read=READ_RETRIES, status=READ_RETRIES,
+        allowed_methods=frozenset({'GET', 'HEAD'}), status_forcelist=RETRY_STATUSES,
+        backoff_factor=RETRY_BACKOFF, backoff_jitter=RETRY_JITTER, raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=BRIDGE_POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.hooks['response'].append(observe_bridge_response)
+    session.headers.update(auth_headers())
+    return session
+
+
+def session() -> requests.Session:
+    """
+    The process's bridge session. Sessions are not shared across fork (Celery prefork
+    children, gunicorn workers): a child gets its own pool on first use.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                _session = _new_session()
+                _session_pid = pid
+    return _session
+
+
+def auth_headers() -> Dict[str, str]:
+    return {'Authorization': f'Bearer {_token}'} if _token else {}
+
+
+def set_token(token: Optional[str]):
+    """Send ``Authorization: Bearer <token>`` on every bridge request of this process (None removes it)."""
+    global _token
+    _token = token
+    if token:
+        session().headers['Authorization'] = f'Bearer {token}'
+    else:
+        session().headers.pop('Authorization', None)
+
+
+def timeout_for(url: str) -> Tuple[float, float]:
+    return CONNECT_TIMEOUT, READ_TIMEOUTS.get(bridge_endpoint(url), DEFAULT_READ_TIMEOUT)
+
+
+def bridge_request(method: str, url: str, **kwargs) -> requests.Response:
+    """A bridge request on the pooled session, with the endpoint's timeout unless one is given."""
+    kwargs.setdefault('timeout', timeout_for(url))
+    return session().request(method, url, **kwargs)
+
+
+def bridge_get(url: str, **kwargs) -> requests.Response:
+    return bridge_request('GET', url, **kwargs)
+
+
+def bridge_post(url: str, **kwargs) -> requests.Response:
+    return bridge_request('POST', url, **kwargs)
+
+
+class ConditionalCache:
+    """
+    Last parsed body and ETag per request, used to revalidate bridge reads with If-None-Match.
+
+    On a 304 the bridge skips serialization and the worker skips parsing; the caller gets a
+    copy of the body parsed from the last 200, so it can modify it freely.
+    """
+
+    def __init__(self, max_entries: int = CONDITIONAL_CACHE_MAX):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, etag: str, body):
+        with self._lock:
+            self._entries[key] = (etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+conditional_cache = ConditionalCache()
+
+
+def _copy(body):
+    if isinstance(body, (pd.DataFrame, pd.Series)):
+        return body.copy()
+    return copy.deepcopy(body)
+
+
+def conditional_get(url: str, parse: Callable[[requests.Response], Any], params: Dict = None,
+                    headers: Dict = None, **kwargs):
+    """
+    GET ``url`` with If-None-Match set from the previous response to the same request.
+
+    :param parse: Turns a 200 response into the value to return (and remember).
+    :return: ``parse(response)``, or a copy of the remembered value when the bridge answers 304.
+    :raises requests.HTTPError: On error statuses, like ``response.raise_for_status()``.
+    """
+    headers = dict(headers or {})
+    key = (url, tuple(sorted((params or {}).items())), headers.get('Accept'))
+
+    entry = conditional_cache.get(key)
+    if entry is not None:
+        headers['If-None-Match'] = entry[0]
+
+    response = bridge_get(url, params=params, headers=headers, **kwargs)
+    if response.status_code == 304 and entry is not None:
+        return _copy(entry[1])
+    response.raise_for_status()
+
+    body = parse(response)
+    etag = response.headers.get('ETag')
+    if etag and body is not None:
+        conditional_cache.set(key, etag, body)
+        return _copy(body)
+    return body
+
+
+class IncompleteStream(requests.exceptions.RequestException):
+    """A paged stream could not be read up to its last page."""
+
+
+def _stream_pages(response, accept: str) -> Iterator:
+    if accept == COLUMNAR_STREAM_MIMETYPE:
+        for frame in iter_stream_frames(response.iter_content(chunk_size=None)):
+            columns, meta = decode_columns(frame)
+            yield meta, columns
+    else:
+        for line in response.iter_lines():
+            if line:
+                page = json.loads(line)
+                yield page, page
+
+
+def paged_stream(url: str, params: Dict, accept: str, cursor_param: str,
+                 format_cursor: Callable[[int], str], retries: int = STREAM_RETRIES) -> Iterator:
+    """
+    Read a bridge stream paginated by time cursor, one page at a time.
+
+    If the connection drops or the bridge fails a page, the request is sent again starting
+    at the last cursor received, so pages are neither lost nor repeated.
+
+    :param accept: NDJSON_MIMETYPE or COLUMNAR_STREAM_MIMETYPE.
+    :param cursor_param: The query parameter that sets where the range starts.
+    :param format_cursor: Turns a cursor (epoch seconds) into that parameter's value.
+    :return: An iterator of (page metadata, payload) tuples; for NDJSON the payload is the
+             page itself, for columnar streams it is the decoded columns.
+    :raises IncompleteStream: After ``retries`` consecutive failed attempts.
+    """
+    params = dict(params)
+    failures = 0
+    while True:
+        try:
+            with bridge_get(url, params=params, headers={'Accept': accept},
+                            stream=True, timeout=(CONNECT_TIMEOUT, STREAM_READ_TIMEOUT)) as response:
+                response.raise_for_status()
+                for meta, payload in _stream_pages(response, accept):
+                    if meta.get('error'):
+                        params[cursor_param] = format_cursor(meta['cursor'])
+                        raise IncompleteStream(meta['error'])
+                    failures = 0
+                    yield meta, payload
+                    if meta['cursor'] is None:
+                        return
+                    params[cursor_param] = format_cursor(meta['cursor'])
+            raise IncompleteStream("Stream ended before its last page")
+        except (IncompleteStream, requests.exceptions.ConnectionError,
+                requests.exceptions.ChunkedEncodingError, requests.exceptions.Timeout) as e:
+            failures += 1
+            if failures > retries:
+                raise
+            logger.error(f"Paged stream from {url} interrupted, resuming at {params.get(cursor_param)}: {e}")
@@ -0,0 +1,101 @@
+import json
+import struct
+from typing import Dict, Iterable, Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Decoder for the MT5 bridge columnar format (see backend/mt5/app/columnar.py).
+COLUMNAR_MIMETYPE = 'application/vnd.mt5.columnar'
+COLUMNAR_STREAM_MIMETYPE = 'application/vnd.mt5.columnar-stream'
+ACCEPT_COLUMNAR = f"{COLUMNAR_MIMETYPE}, application/json;q=0.5"
+MAGIC = b'MT5C'
+VERSION = 1
+PREFIX = struct.Struct('<4sB3xI')
+ALIGNMENT = 8
+FRAME_LENGTH = struct.Struct('<Q')
+# dtype of the 'time' column, whichever format the bridge answered in
+TIME_DTYPE = 'datetime64[ns, UTC]'
+
+
+def is_columnar(response) -> bool:
+    return response.headers.get('Content-Type', '').startswith(COLUMNAR_MIMETYPE)
+
+
+def decode_columns(buffer) -> Tuple[Dict[str, np.ndarray], Dict]:
+    """
+    Decode a columnar frame into numpy arrays.
+
+    The arrays are read-only views over ``buffer``; nothing is copied.
+
+    :param buffer: The raw response body.
+    :return: A tuple of (columns by name, frame metadata).
+    :raises ValueError: If the buffer is not a supported columnar frame.
+    """
+    magic, version, header_length = PREFIX.unpack_from(buffer, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Unsupported columnar frame (magic={magic!r}, version={version}).")
+
+    offset = PREFIX.size
+    header = json.loads(bytes(buffer[offset:offset + header_length]))
+    offset += header_length
+
+    rows = header['rows']
+    columns = {}
+    for name, dtype_str in header['columns']:
+        dtype = np.dtype(dtype_str)
+        columns[name] = np.frombuffer(buffer, dtype=dtype, count=rows, offset=offset)
+        offset += dtype.itemsize * rows
+        offset += -offset % ALIGNMENT
+
+    return columns, header.get('meta', {})
+
+
+def utc_times(values) -> pd.DatetimeIndex:
+    """
+    Bar times as TIME_DTYPE: naive values (the columnar datetime64[s] column) are taken as UTC,
+    ISO strings with an offset (the JSON responses) are converted to it.
+    """
+    return pd.DatetimeIndex(pd.to_datetime(values, utc=True)).as_unit('ns')
+
+
+def columns_frame(columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """DataFrame on top of decoded columns, with 'time' (if any) converted by utc_times; other columns are not copied."""
+    if 'time' in columns:
+        columns = {name: utc_times(values) if name == 'time' else values for name, values in columns.items()}
+    return pd.DataFrame(columns, copy=False)
+
+
+def decode_frame(buffer) -> pd.DataFrame:
+    """Build a DataFrame straight on top of the decoded columns (no consolidation, only 'time' is copied)."""
+    columns, _ = decode_columns(buffer)
+    return columns_frame(columns)
+
+
+def split_columns(columns: Dict[str, np.ndarray], meta: Dict) -> Dict[str, pd.DataFrame]:
+    """Split a concatenated multi-series frame into one DataFrame per meta['symbols'] entry, sharing memory (see columns_frame)."""
+    frames = {}
+    start = 0
+    for symbol, count in zip(meta['symbols'], meta['counts']):
+        stop = start + count
+        frames[symbol] = columns_frame({name: values[start:stop] for name, values in columns.items()})
+        start = stop
+    return frames
+
+
+def iter_stream_frames(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Split a columnar stream (length-prefixed frames) into frames as the bytes arrive.
+
+    A trailing partial frame, left by a dropped connection, is discarded.
+    """
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= FRAME_LENGTH.size:
+            (length,) = FRAME_LENGTH.unpack_from(buffer, 0)
+            end = FRAME_LENGTH.size + length
+            if len(buffer) < end:
+                break
+            yield bytes(buffer[FRAME_LENGTH.size:end])
+            del buffer[:end]
@@ -1,23 +1,29 @@
 import os
 import requests
 import traceback
-from typing import List, Dict
+from typing import Iterator, List, Dict, Union
+import numpy as np
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 import logging
+from django.core.cache import caches
 
-from app.utils.constants import MT5Timeframe
+from app.utils.constants import MT5Timeframe, TIMEZONE
+from app.utils.api.client import bridge_get, bridge_post, conditional_get, paged_stream
+from app.utils.api.columnar import ACCEPT_COLUMNAR, COLUMNAR_STREAM_MIMETYPE, is_columnar, decode_frame, decode_columns, split_columns, columns_frame, utc_times
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
 BASE_URL = os.getenv('MT5_API_URL')
+SYMBOL_SPEC_CACHE_TTL = int(os.getenv('SYMBOL_SPEC_CACHE_TTL', 3600))  # seconds
+SYMBOL_SPEC_CACHE = 'symbol_specs'  # alias in settings.CACHES
 
 def symbol_info_tick(symbol: str) -> pd.DataFrame:
     try:
         url = f"{BASE_URL}/symbol_info_tick/{symbol}"
-        response = requests.get(url)
+        response = bridge_get(url)
         response.raise_for_status()
         
         data = response.json()
@@ -28,47 +34,225 @@ def symbol_info_tick(symbol: str) -> pd.DataFrame:
         error_msg = f"Exception fetching symbol info tick for {symbol}: {e}\n{traceback.format_exc()}"
         logger.error(error_msg)
 
+def symbol_info_ticks(symbols: List[str]) -> pd.DataFrame:
+    """
+    Fetch the latest tick for several symbols in one round trip.
+
+    :param symbols: The symbols to fetch.
+    :return: A DataFrame indexed by symbol with one row per tick (symbols the bridge has no
+             tick for are omitted), or None on request failure. ``ticks.loc[[symbol]]`` gives
+             the same single-row frame as ``symbol_info_tick``.
+    """
+    try:
+        url = f"{BASE_URL}/symbol_info_ticks"
+        response = bridge_get(url, params={'symbols': ','.join(symbols)})
+        response.raise_for_status()
+        return _ticks_frame(response)
+    except Exception as e:
+        error_msg = f"Exception fetching symbol info ticks for {symbols}: {e}\n{traceback.format_exc()}"
+        logger.error(error_msg)
+
+def _ticks_frame(response) -> pd.DataFrame:
+    data = response.json()
+    missing = data.pop('missing', [])
+    if missing:
+        logger.error(f"No tick info for: {missing}")
+
+    return pd.DataFrame(data).set_index('symbols').rename_axis('symbol')
+
 def symbol_info(symbol) -> pd.DataFrame:
     try:
         url = f"{BASE_URL}/symbol_info/{symbol}"
-        response = requests.get(url)
-        response.raise_for_status()
-        
-        data = response.json()
-        df = pd.DataFrame([data])
-        return df
+        return conditional_get(url, lambda response: pd.DataFrame([response.json()]))
     except Exception as e:
         error_msg = f"Exception fetching symbol info for {symbol}: {e}\n{traceback.format_exc()}"
         logger.error(error_msg)
 
-def fetch_data_pos(symbol: str, timeframe: MT5Timeframe, bars: int) -> pd.DataFrame:
+def _symbol_spec_key(symbol: str) -> str:
+    # v2: specs no longer carry tick values, swaps or margin rates
+    return f"mt5:symbol_spec:v2:{symbol}"
+
+def _cached_specs(symbols: List[str]) -> Dict[str, Dict]:
+    """Specs of ``symbols`` found in the spec cache; empty (so they are fetched) if the cache is down."""
+    keys = {symbol: _symbol_spec_key(symbol) for symbol in symbols}
+    try:
+        cached = caches[SYMBOL_SPEC_CACHE].get_many(list(keys.values()))
+    except Exception as e:
+        logger.error(f"Symbol spec cache unavailable, reading specs from the bridge: {e}")
+        return {}
+    return {symbol: cached[key] for symbol, key in keys.items() if key in cached}
+
+def _store_specs(specs: Dict[str, Dict]):
     try:
-        url = f"{BASE_URL}/fetch_data_pos?symbol={symbol}&timeframe={timeframe.value}&bars={bars}"
-        response = requests.get(url)
+        caches[SYMBOL_SPEC_CACHE].set_many({_symbol_spec_key(symbol): spec for symbol, spec in specs.items()},
+                                           SYMBOL_SPEC_CACHE_TTL)
+    except Exception as e:
+        logger.error(f"Failed to cache symbol specs for {list(specs)}: {e}")
+
+def symbol_spec(symbol: str) -> Dict:
+    """
+    Static specification of a symbol (contract size, volume limits, digits, filling modes...).
+
+    Specs are shared by every worker through the 'symbol_specs' cache (Redis), so only the
+    first lookup per SYMBOL_SPEC_CACHE_TTL pays the HTTP round trip; while Redis is down they
+    are read from the bridge. Use symbol_info_tick for prices and symbol_info for tick
+    values, swaps and margin rates, which change during the day.
+
+    :return: The spec as a dict, or None on failure.
+    """
+    try:
+        spec = _cached_specs([symbol]).get(symbol)
+        if spec is not None:
+            return spec
+
+        url = f"{BASE_URL}/symbol_spec/{symbol}"
+        response = bridge_get(url)
         response.raise_for_status()
-        
-        data = response.json()
-        df = pd.DataFrame(data)
-        return df
+
+        spec = response.json()
+        _store_specs({symbol: spec})
+        return spec
+    except Exception as e:
+        error_msg = f"Exception fetching symbol spec for {symbol}: {e}\n{traceback.format_exc()}"
+        logger.error(error_msg)
+
+def symbol_select(symbol: str, enable: bool = True) -> bool:
+    """Add a symbol to (or remove it from) Market Watch, dropping its cached spec."""
+    try:
+        cache.delete(_symbol_spec_key(symbol))
+        url = f"{BASE_URL}/symbol_select"
+        response = bridge_post(url, json={'symbol': symbol, 'enable': enable})
+        response.raise_for_status()
+        return True
+    except Exception as e:
+        error_msg = f"Exception selecting symbol {symbol}: {e}\n{traceback.format_exc()}"
+        logger.error(error_msg)
+        return False
+
+def _rates_frame(response) -> pd.DataFrame:
+    if is_columnar(response):
+        return decode_frame(response.content)
+
+    df = pd.DataFrame(response.json())
+    if not df.empty:
+        df['time'] = utc_times(df['time'])
+    return df
+
+def _naive_utc_isoformat(value: datetime) -> str:
+    # The bridge localizes the parsed timestamps to UTC itself, so it expects naive ISO strings
+    if value.tzinfo is not None:
+        value = value.astimezone(TIMEZONE).replace(tzinfo=None)
+    return value.isoformat()
+
+def fetch_data_pos(symbol: str, timeframe: MT5Timeframe, bars: int) -> pd.DataFrame:
+    try:
+        url = f"{BASE_URL}/fetch_data_pos"
+        params = {
+            'symbol': symbol,
+            'timeframe': timeframe.value,
+            'num_bars': bars
+        }
+        return conditional_get(url, _rates_frame, params=params, headers={'Accept': ACCEPT_COLUMNAR})
     except Exception as e:
         error_msg = f"Exception fetching data for {symbol} on {timeframe}: {e}\n{traceback.format_exc()}"
         logger.error(error_msg)
 
+def _batch_frames(response, timeframe: MT5Timeframe, multiindex: bool = False) -> Union[Dict[str, pd.DataFrame], pd.DataFrame]:
+    if is_columnar(response):
+        columns, meta = decode_columns(response.content)
+        errors = meta.get('errors', {})
+        if multiindex:
+            index = pd.MultiIndex.from_arrays([np.repeat(meta['symbols'], meta['counts']), utc_times(columns['time'])],
+                                              names=['symbol', 'time'])
+            frames = pd.DataFrame({name: values for name, values in columns.items() if name != 'time'},
+                                  index=index, copy=False)
+        else:
+            frames = split_columns(columns, meta)
+    else:
+        payload = response.json()
+        errors = payload.get('errors', {})
+        frames = {}
+        for symbol, records in payload['data'].items():
+            df = pd.DataFrame(records)
+            df['time'] = utc_times(df['time'])
+            frames[symbol] = df
+        if multiindex:
+            frames = pd.concat({symbol: df.set_index('time') for symbol, df in frames.items()}, names=['symbol'])
+
+    if errors:
+        logger.error(f"Failed to fetch data on {timeframe} for: {errors}")
+
+    return frames
+
+def fetch_data_pos_batch(symbols: List[str], timeframe: MT5Timeframe, bars: int,
+                         multiindex: bool = False) -> Union[Dict[str, pd.DataFrame], pd.DataFrame]:
+    """
+    Fetch the latest bars for several symbols in one round trip.
+
+    :param symbols: The symbols to fetch.
+    :param timeframe: The timeframe shared by every series.
+    :param bars: The number of bars per symbol.
+    :param multiindex: Return a single frame indexed by (symbol, time) instead of a dict.
+    :return: A dict of DataFrames keyed by symbol (symbols the bridge failed on are omitted),
+             or a MultiIndex DataFrame. None on request failure.
+    """
+    try:
+        url = f"{BASE_URL}/fetch_data_pos/batch"
+        params = {
+            'symbols': ','.join(symbols),
+            'timeframe': timeframe.value,
+            'num_bars': bars
+        }
+        response = bridge_get(url, params=params, headers={'Accept': ACCEPT_COLUMNAR})
+        response.raise_for_status()
+        return _batch_frames(response, timeframe, multiindex)
+    except Exception as e:
+        error_msg = f"Exception fetching batch data for {symbols} on {timeframe}: {e}\n{traceback.format_exc()}"
+        logger.error(error_msg)
+
 def fetch_data_range(symbol: str, timeframe: MT5Timeframe, from_date: datetime, to_date: datetime) -> pd.DataFrame:
     try:
-        url = f"{BASE_URL}/copy_rates_range"
+        url = f"{BASE_URL}/fetch_data_range"
         params = {
             'symbol': symbol,
             'timeframe': timeframe.value,
-            'from_date': from_date,
-            'to_date': to_date
+            'start': _naive_utc_isoformat(from_date),
+            'end': _naive_utc_isoformat(to_date)
         }
-        response = requests.post(url, params=params)
+        response = bridge_get(url, params=params, headers={'Accept': ACCEPT_COLUMNAR})
         response.raise_for_status()
         
-        data = response.json()
-        df = pd.DataFrame(data)
-        return df
+        return _rates_frame(response)
     except Exception as e:
         error_msg = f"Exception fetching data for {symbol} on {timeframe}: {e}\n{traceback.format_exc()}"
         logger.error(error_msg)
+
+
+def iter_data_range(symbol: str, timeframe: MT5Timeframe, from_date: datetime, to_date: datetime) -> Iterator[pd.DataFrame]:
+    """
+    Stream the bars of a date range, however long, as a series of DataFrames.
+
+    Each frame is one bridge page (STREAM_PAGE_BARS nominal bars) in the same shape as
+    fetch_data_range, so memory stays flat for multi-year backfills; a dropped connection
+    resumes where it left off. Pages of a range with no trading (weekends) may be empty.
+
+    :return: An iterator of DataFrames, oldest first.
+    :raises requests.RequestException: If the range could not be read to the end.
+    """
+    params = {
+        'symbol': symbol,
+        'timeframe': timeframe.value,
+        'start': _naive_utc_isoformat(from_date),
+        'end': _naive_utc_isoformat(to_date)
+    }
+
+    def format_cursor(cursor: int) -> str:
+        return datetime.fromtimestamp(cursor, tz=timezone.utc).replace(tzinfo=None).isoformat()
+
+    try:
+        for _, columns in paged_stream(f"{BASE_URL}/fetch_data_range", params, COLUMNAR_STREAM_MIMETYPE, 'start', format_cursor):
+            yield columns_frame(columns)
+    except Exception as e:
+        error_msg = f"Exception streaming data for {symbol} on {timeframe}: {e}\n{traceback.format_exc()}"
+        logger.error(error_msg)
+        raise
@@ -8,6 +8,7 @@ from dotenv import load_dotenv
 import logging
 
 from app.utils.constants import MT5Timeframe
+from app.utils.api.client import bridge_get
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -17,7 +18,7 @@ BASE_URL = os.getenv('MT5_API_URL')
 def last_error() -> Dict:
     try:
         url = f"{BASE_URL}/last_error"
-        response = requests.get(url)
+        response = bridge_get(url)
         response.raise_for_status()
         
         data = response.json()
@@ -29,7 +30,7 @@ def last_error() -> Dict:
 def last_error_str() -> Dict:
     try:
         url = f"{BASE_URL}/last_error_str"
-        response = requests.get(url)
+        response = bridge_get(url)
         response.raise_for_status()
         
         data = response.json()
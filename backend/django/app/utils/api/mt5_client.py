@@ -6,6 +6,8 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from dataclasses import dataclass
 
+from app.utils.metrics import observe_bridge_response
+
 logger = logging.getLogger(__name__)
 
 class MT5Client:
@@ -19,6 +21,7 @@ class MT5Client:
         
         # Configurar sesión HTTP
         self.session = requests.Session()
+        self.session.hooks['response'].append(observe_bridge_response)
     
     def login(self, login: int, password: str, server: str) -> Dict:
         """
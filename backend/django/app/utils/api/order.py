@@ -1,7 +1,7 @@
 import os
 import requests
 import traceback
-from typing import List, Dict
+from typing import List, Dict, Iterable, Optional, Tuple
 import pandas as pd
 from datetime import datetime
 from dotenv import load_dotenv
@@ -11,6 +11,7 @@ from app.utils.constants import MT5Timeframe
 from app.utils.api.data import symbol_info_tick
 from app.nexus.models import Trade, TradeClosePricesMutation  # Import models
 from app.utils.arithmetics import get_pnl_at_price, calculate_commission, get_price_at_pnl, calculate_order_capital, calculate_order_size_usd
+from app.utils.api.client import bridge_post
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -45,7 +46,7 @@ def send_market_order(symbol: str, volume: float, order_type: str, sl: float, tp
         logger.info(f"Sending market order: {request}")
 
         url = f"{BASE_URL}/send_market_order"
-        response = requests.post(url, json=request, timeout=10)
+        response = bridge_post(url, json=request)
         response.raise_for_status()
 
         response_data = response.json()
@@ -72,6 +73,65 @@ def send_market_order(symbol: str, volume: float, order_type: str, sl: float, tp
         error_msg = f"Exception sending market order for {symbol}: {str(e)}\n{traceback.format_exc()}"
         logger.error(error_msg)
     
+def send_market_orders(orders: List[Dict]) -> List[Dict]:
+    """
+    Send several market orders in one round trip; the bridge executes them back-to-back.
+
+    :param orders: One dict per order with the keyword arguments of send_market_order
+                   (symbol, volume, order_type, sl, and optionally tp, deviation, comment,
+                   magic, type_filling).
+    :return: One entry per order, in order: the MT5 order result for fills, None for
+             orders that failed. None if the request itself failed.
+    """
+    try:
+        payload = []
+        for order in orders:
+            order_type = order['order_type']
+            request = {
+                "symbol": order['symbol'],
+                "volume": float(order['volume']),
+                "type": order_type if isinstance(order_type, str) else order_type.name,
+                "sl": float(order['sl']),
+                "deviation": int(order.get('deviation', 20)),
+                "magic": int(order.get('magic', 234000)),
+                "comment": str(order.get('comment', 'From Django Server')),
+                "type_filling": order.get('type_filling', 'ORDER_FILLING_FOK'),
+            }
+            if order.get('tp') is not None:
+                request["tp"] = float(order['tp'])
+            payload.append(request)
+
+        logger.info(f"Sending {len(payload)} market orders: {payload}")
+
+        url = f"{BASE_URL}/orders/batch"
+        response = bridge_post(url, json={'orders': payload})
+        response.raise_for_status()
+
+        response_data = response.json()
+        logger.info(f"Batch of {len(payload)} orders done in {response_data['elapsed_ms']:.1f} ms "
+                    f"({response_data['succeeded']} filled, {response_data['failed']} failed)")
+
+        results = []
+        for entry in response_data['results']:
+            if entry['success']:
+                results.append(entry['result'])
+            else:
+                logger.error(f"Order failed for {entry['symbol']}: {entry.get('error')}")
+                results.append(None)
+        return results
+
+    except requests.exceptions.HTTPError as e:
+        error_msg = f"HTTP error sending market orders: {e.response.text}"
+        logger.error(error_msg)
+
+    except requests.exceptions.Timeout:
+        error_msg = "Timeout sending market orders"
+        logger.error(error_msg)
+
+    except Exception as e:
+        error_msg = f"Exception sending market orders: {str(e)}\n{traceback.format_exc()}"
+        logger.error(error_msg)
+
 def modify_sl_tp(position, sl: float, tp: float = None) -> Dict:
     try:
         request = {
@@ -87,7 +147,7 @@ def modify_sl_tp(position, sl: float, tp: float = None) -> Dict:
         logger.info(f"Sending modify SL/TP request: {request}")
 
         url = f"{BASE_URL}/modify_sl_tp"
-        response = requests.post(url, json=request, timeout=10)
+        response = bridge_post(url, json=request)
         response.raise_for_status()
 
         response_data = response.json()
@@ -117,4 +177,55 @@ def modify_sl_tp(position, sl: float, tp: float = None) -> Dict:
     
     except Exception as e:
         error_msg = f"Exception sending modify SL/TP for {position.ticket}: {str(e)}\n{traceback.format_exc()}"
-        logger.error(error_msg)
\ No newline at end of file
+        logger.error(error_msg)
+
+def modify_sl_tp_batch(modifications: Iterable[Tuple[int, Optional[float], Optional[float]]]) -> Dict[int, Dict]:
+    """
+    Apply many SL/TP changes in one round trip.
+
+    :param modifications: (ticket, sl, tp) tuples; None for sl or tp keeps the current level.
+    :return: The MT5 result for each ticket, or None for tickets that failed. None if the
+             request itself failed.
+    """
+    modifications = list(modifications)
+    try:
+        payload = []
+        for ticket, sl, tp in modifications:
+            modification = {"position": int(ticket)}
+            if sl is not None:
+                modification["sl"] = float(sl)
+            if tp is not None:
+                modification["tp"] = float(tp)
+            payload.append(modification)
+
+        logger.info(f"Sending {len(payload)} SL/TP modifications: {payload}")
+
+        url = f"{BASE_URL}/modify_sl_tp/batch"
+        response = bridge_post(url, json={'modifications': payload})
+        response.raise_for_status()
+
+        response_data = response.json()
+        logger.info(f"Batch of {len(payload)} SL/TP modifications done in {response_data['elapsed_ms']:.1f} ms "
+                    f"({response_data['succeeded']} applied, {response_data['failed']} failed)")
+
+        results = {}
+        for entry in response_data['results']:
+            ticket = payload[entry['index']]['position']
+            if entry['success']:
+                results[ticket] = entry['result']
+            else:
+                logger.error(f"Modify SL/TP failed for {ticket}: {entry.get('error')}")
+                results[ticket] = None
+        return results
+
+    except requests.exceptions.HTTPError as e:
+        error_msg = f"HTTP error sending SL/TP modifications: {e.response.text}"
+        logger.error(error_msg)
+
+    except requests.exceptions.Timeout:
+        error_msg = "Timeout sending SL/TP modifications"
+        logger.error(error_msg)
+
+    except Exception as e:
+        error_msg = f"Exception sending SL/TP modifications: {str(e)}\n{traceback.format_exc()}"
+        logger.error(error_msg)
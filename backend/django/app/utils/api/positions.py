@@ -10,6 +10,7 @@ import pandas as pd
 from dotenv import load_dotenv
 
 from app.utils.constants import MT5Timeframe
+from app.utils.api.client import bridge_get, conditional_get
 
 logger = logging.getLogger(__name__)
 load_dotenv()
@@ -22,27 +23,28 @@ empty_df = pd.DataFrame(columns=[
     'price_current', 'swap', 'profit', 'symbol', 'comment', 'external_id'
 ])
 
+def _positions_frame(response) -> pd.DataFrame:
+    data = response.json()
+
+    df = pd.DataFrame(data if isinstance(data, list) else [])
+
+    if df.empty:
+        return empty_df
+
+    df['time'] = pd.to_datetime(df['time'], unit='s', utc=True)
+    df['time_update'] = pd.to_datetime(df['time_update'], unit='s', utc=True)
+
+    return df
+
 def get_positions() -> pd.DataFrame:
     try:
         url = f"{BASE_URL}/get_positions"
         start_time = time.time()  # Start timing
-        response = requests.get(url, timeout=10)
+        df = conditional_get(url, _positions_frame)
         end_time = time.time()    # End timing
         duration = end_time - start_time
         logger.info(f"Fetched positions in {duration:.2f} seconds")
 
-        response.raise_for_status()
-        
-        data = response.json()
-
-        df = pd.DataFrame(data if isinstance(data, list) else [])
-
-        if df.empty:
-            return empty_df
-
-        df['time'] = pd.to_datetime(df['time'], unit='s', utc=True)
-        df['time_update'] = pd.to_datetime(df['time_update'], unit='s', utc=True)
-
         return df
     
     except requests.exceptions.Timeout:
@@ -54,3 +56,76 @@ def get_positions() -> pd.DataFrame:
         error_msg = f"Exception fetching positions: {e}\n{traceback.format_exc()}"
         logger.error(error_msg)
         return empty_df
+
+class PositionsView:
+    """
+    Client-side materialized view of the open positions, kept current through the
+    bridge's /get_positions delta mode.
+
+    Each refresh transfers only the positions opened, modified or closed since the previous
+    one, plus price/profit/swap marks for every ticket, so it can be polled often even with
+    hundreds of positions open. Views are per process; the first refresh is a full snapshot.
+    """
+
+    def __init__(self):
+        self.cursor = ''
+        self._positions = {}
+
+    def refresh(self) -> pd.DataFrame:
+        """
+        Bring the view up to date and return it in the same shape as get_positions().
+
+        :return: The open positions, or an empty frame if the bridge could not be reached.
+        """
+        try:
+            url = f"{BASE_URL}/get_positions"
+            start_time = time.time()
+            response = bridge_get(url, params={'cursor': self.cursor})
+            duration = time.time() - start_time
+            response.raise_for_status()
+
+            delta = response.json()
+            if delta['full']:
+                self._positions = {}
+            for ticket in delta['removed']:
+                self._positions.pop(ticket, None)
+            for position in delta['added'] + delta['changed']:
+                self._positions[position['ticket']] = position
+
+            marks = delta['marks']
+            for i, ticket in enumerate(marks['ticket']):
+                position = self._positions.get(ticket)
+                if position is not None:
+                    position['price_current'] = marks['price_current'][i]
+                    position['profit'] = marks['profit'][i]
+                    position['swap'] = marks['swap'][i]
+
+            self.cursor = delta['cursor']
+            logger.info(f"Refreshed positions view in {duration:.2f} seconds "
+                        f"(+{len(delta['added'])} ~{len(delta['changed'])} -{len(delta['removed'])}"
+                        f"{', full' if delta['full'] else ''})")
+
+            return self.frame()
+
+        except requests.exceptions.Timeout:
+            error_msg = f"Timeout refreshing positions view from {url}"
+            logger.error(error_msg)
+            return empty_df
+
+        except Exception as e:
+            error_msg = f"Exception refreshing positions view: {e}\n{traceback.format_exc()}"
+            logger.error(error_msg)
+            return empty_df
+
+    def frame(self) -> pd.DataFrame:
+        """The current view as a DataFrame, without contacting the bridge."""
+        if not self._positions:
+            return empty_df
+
+        df = pd.DataFrame(list(self._positions.values()))
+        df['time'] = pd.to_datetime(df['time'], unit='s', utc=True)
+        df['time_update'] = pd.to_datetime(df['time_update'], unit='s', utc=True)
+        return df
+
+# Shared by the algorithms running in this process
+positions_view = PositionsView()
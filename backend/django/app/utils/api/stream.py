@@ -0,0 +1,87 @@
+import os
+import json
+import time
+import requests
+import traceback
+from typing import Dict, Iterator, List, Optional
+from dotenv import load_dotenv
+import logging
+
+from app.utils.api.client import CONNECT_TIMEOUT, bridge_get
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+BASE_URL = os.getenv('MT5_API_URL')
+RECONNECT_DELAY = 1.0  # seconds, until the server suggests otherwise with a retry: field
+READ_TIMEOUT = 60  # seconds without data (keepalives included) before the connection is considered dead
+
+
+def _parse_events(response) -> Iterator[Dict]:
+    """Yield {'id', 'event', 'data', 'retry'} dicts from a text/event-stream response."""
+    event = {}
+    data = []
+    for line in response.iter_lines(decode_unicode=True):
+        if line is None:
+            continue
+        if not line:
+            if data or 'retry' in event:
+                event['data'] = '\n'.join(data)
+                yield event
+            event, data = {}, []
+            continue
+        if line.startswith(':'):
+            continue
+        field, _, value = line.partition(':')
+        value = value[1:] if value.startswith(' ') else value
+        if field == 'data':
+            data.append(value)
+        elif field in ('id', 'event', 'retry'):
+            event[field] = value
+
+
+def stream_events(symbols: Optional[List[str]] = None, types: Optional[List[str]] = None,
+                  last_event_id: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Subscribe to the bridge's /stream endpoint and yield events as they arrive.
+
+    Reconnects on its own and resumes from the last event received, so no event is lost
+    or repeated across a dropped connection. An event of type 'reset' means the bridge could
+    not resume (it restarted, or this consumer fell too far behind); anything derived from
+    earlier events should then be reloaded from the regular endpoints.
+
+    :param symbols: Symbols to receive ticks for (the bridge polls them while subscribed).
+    :param types: Event types to receive ('tick', 'position', 'deal'); all by default.
+    :param last_event_id: Resume after this event id instead of starting with live events.
+    :return: An endless iterator of events: {'id', 'seq', 'type', 'time_msc', 'data'}.
+    """
+    params = {}
+    if symbols:
+        params['symbols'] = ','.join(symbols)
+    if types:
+        params['types'] = ','.join(types)
+
+    delay = RECONNECT_DELAY
+    while True:
+        headers = {'Accept': 'text/event-stream'}
+        if last_event_id:
+            headers['Last-Event-ID'] = last_event_id
+        try:
+            with bridge_get(f"{BASE_URL}/stream", params=params, headers=headers,
+                            stream=True, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)) as response:
+                response.raise_for_status()
+                for event in _parse_events(response):
+                    if 'retry' in event:
+                        delay = int(event['retry']) / 1000
+                    if not event['data']:
+                        continue
+                    last_event_id = event.get('id', last_event_id)
+                    payload = json.loads(event['data'])
+                    if event.get('event') == 'reset':
+                        yield {'id': last_event_id, 'seq': payload['seq'], 'type': 'reset', 'time_msc': None, 'data': payload}
+                    else:
+                        yield dict(payload, id=last_event_id)
+        except Exception as e:
+            error_msg = f"Exception in event stream, reconnecting in {delay}s: {e}\n{traceback.format_exc()}"
+            logger.error(error_msg)
+        time.sleep(delay)
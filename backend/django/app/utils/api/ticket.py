@@ -1,13 +1,14 @@
 import os
 import requests
-from typing import Dict
+from typing import Dict, Iterator
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 import logging
 import traceback
 from app.utils.constants import MT5Timeframe
 from app.utils.constants import TIMEZONE
+from app.utils.api.client import NDJSON_MIMETYPE, conditional_get, paged_stream
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -25,23 +26,46 @@ def history_deals_get(from_date: datetime, to_date: datetime, position: int = No
             params['position'] = position
             
         url = f"{BASE_URL}/history_deals_get"
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        
-        return response.json()
+        return conditional_get(url, lambda response: response.json(), params=params)
     except Exception as e:
         error_msg = f"Exception fetching history deals: {e}\n{traceback.format_exc()}"
         logger.error(error_msg)
 
+def iter_history_deals(from_date: datetime, to_date: datetime, position: int = None) -> Iterator[Dict]:
+    """
+    Stream the deals of a date range, however long, one bridge page at a time.
+
+    Only one page (STREAM_PAGE_SECONDS on the bridge) is held in memory at once, and a
+    dropped connection resumes where it left off.
+
+    :param position: Only yield the deals of this position.
+    :return: An iterator of deal dicts, oldest page first.
+    :raises requests.RequestException: If the range could not be read to the end.
+    """
+    params = {
+        'from_date': from_date.isoformat(),
+        'to_date': to_date.isoformat()
+    }
+    if position is not None:
+        params['position'] = position
+
+    def format_cursor(cursor: int) -> str:
+        return datetime.fromtimestamp(cursor, tz=timezone.utc).isoformat()
+
+    try:
+        for page, _ in paged_stream(f"{BASE_URL}/history_deals_get", params, NDJSON_MIMETYPE, 'from_date', format_cursor):
+            yield from page['deals']
+    except Exception as e:
+        error_msg = f"Exception streaming history deals: {e}\n{traceback.format_exc()}"
+        logger.error(error_msg)
+        raise
+
 def history_orders_get(ticket: int) -> Dict:
     try:
         params = {'ticket': ticket}
             
         url = f"{BASE_URL}/history_orders_get"
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        
-        return response.json()
+        return conditional_get(url, lambda response: response.json(), params=params)
     except Exception as e:
         error_msg = f"Exception fetching history orders for ticket {ticket}: {e}\n{traceback.format_exc()}"
         logger.error(error_msg)
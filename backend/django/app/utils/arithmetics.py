@@ -3,7 +3,7 @@ import logging
 import pandas as pd
 
 from app.utils.constants import MT5Timeframe, METALS, OILS, CURRENCY_PAIRS, CRYPTOCURRENCIES
-from app.utils.api.data import symbol_info
+from app.utils.api.data import symbol_spec, symbol_info_tick
 
 logger = logging.getLogger(__name__)
 
@@ -82,76 +82,78 @@ def calculate_trade_volume(open_price: float, current_price: float, current_pnl:
     trade_volume = abs(current_pnl / (price_change * leverage))
     return trade_volume
 
-def calculate_order_capital(symbol, volume_lots, leverage, price_open):
-    order_size_usd = convert_lots_to_usd(symbol, volume_lots, price_open)
+def _spec(symbol, snapshot=None):
+    spec = snapshot.spec(symbol) if snapshot is not None else None
+    return spec if spec is not None else symbol_spec(symbol)
+
+def calculate_order_capital(symbol, volume_lots, leverage, price_open, snapshot=None):
+    order_size_usd = convert_lots_to_usd(symbol, volume_lots, price_open, snapshot=snapshot)
     capital_used = order_size_usd / leverage
     return capital_used
 
-def convert_lots_to_usd(symbol, lots, price_open):
+def convert_lots_to_usd(symbol, lots, price_open, snapshot=None):
     """
     Convert volume size from lots to USD amount.
     
     :param symbol: The trading symbol (e.g., 'BITCOIN', 'ETHEREUM')
     :param lots: The volume size in lots
+    :param snapshot: A MarketSnapshot to read the spec from.
     :return: The equivalent USD amount
     """
     # Get the contract size for the symbol
-    symbol_info_data = symbol_info(symbol)
-    if symbol_info_data is None:
+    spec = _spec(symbol, snapshot)
+    if spec is None:
         raise ValueError(f"Symbol {symbol} not found in MetaTrader 5")
     
-    contract_size = symbol_info_data.get('trade_contract_size', 100000)
+    contract_size = spec.get('trade_contract_size', 100000)
     
     # Calculate the USD amount using the opening price
     usd_amount = lots * contract_size * price_open
     
     return usd_amount
 
-def convert_usd_to_lots(symbol: str, usd_amount: float, type: str) -> float:
+def convert_usd_to_lots(symbol: str, usd_amount: float, type: str, price: float = None, snapshot=None) -> float:
     """
     Convert USD amount to lots for a given symbol.
 
     :param symbol: The trading symbol (e.g., 'BITCOIN', 'ETHEREUM')
     :param usd_amount: The amount in USD to convert
     :param type: The type of order ('BUY' or 'SELL')
+    :param price: The price to convert at. Callers that already hold a quote should pass it;
+                  otherwise the current ask (BUY) or bid (SELL) is taken from ``snapshot`` or fetched.
+    :param snapshot: A MarketSnapshot to read the spec and quote from.
     :return: The equivalent amount in lots
     """
     try:
-        # Get the symbol information
-        symbol_info_data = symbol_info(symbol)
-        if symbol_info_data is None:
+        # Contract size and lot step come from the cached spec, so only a missing price costs a request
+        spec = _spec(symbol, snapshot)
+        if spec is None:
             raise ValueError(f"Symbol {symbol} not found in MetaTrader 5")
-        
-        # Ensure that 'ask' and 'bid' are scalar values
-        ask_price = symbol_info_data.ask.iloc[0] if isinstance(symbol_info_data.ask, pd.Series) else symbol_info_data.ask
-        bid_price = symbol_info_data.bid.iloc[0] if isinstance(symbol_info_data.bid, pd.Series) else symbol_info_data.bid
-        
-        price_dict = {
-            'BUY': ask_price,
-            'SELL': bid_price
-        }
+
+        if price is None and snapshot is not None:
+            price = snapshot.price(symbol, type)
+        if price is None:
+            tick = symbol_info_tick(symbol)
+            if tick is None or tick.empty:
+                raise ValueError(f"No tick available for {symbol}")
+            price = tick['ask'].iloc[0] if type == 'BUY' else tick['bid'].iloc[0]
         
         # Get the contract size and calculate lots
-        contract_size = symbol_info_data.get('trade_contract_size', 100000)
-        lots = usd_amount / (contract_size * price_dict[type])
+        contract_size = spec.get('trade_contract_size', 100000)
+        lots = usd_amount / (contract_size * float(price))
         
         # Round to the nearest lot step
-        lot_step = symbol_info_data.get('volume_step', 0.01)
+        lot_step = spec.get('volume_step', 0.01)
         lots = round(lots / lot_step) * lot_step
-        
-        symbol_info_dict = {
-            'ask': float(symbol_info_data.ask),
-            'bid': float(symbol_info_data.bid),
-            'spread': float(symbol_info_data.spread),
-            'volume': float(symbol_info_data.volume),
-            'trade_contract_size': contract_size,
-            'volume_step': lot_step
-        }
 
         logger.info({
             'message': 'Lots converted from USD to lots',
             'symbol': symbol,
-            'symbol_info': symbol_info_dict,
+            'symbol_info': {
+                'price': float(price),
+                'trade_contract_size': contract_size,
+                'volume_step': lot_step
+            },
             'usd_amount': usd_amount,
             'type': type,
             'lots': float(lots)  # Convert to float for proper JSON serialization
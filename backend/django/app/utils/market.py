@@ -3,12 +3,16 @@ from datetime import datetime, timedelta
 from app.utils.constants import CRYPTOCURRENCIES, TIMEZONE
 from app.utils.api.data import fetch_data_pos, symbol_info_tick
 
-def is_market_open(symbol):
+def is_market_open(symbol, tick=None, snapshot=None):
     if symbol in CRYPTOCURRENCIES:
         return True
     else:
-        # Check whether the market is open, if it's a crypto then market doesn't close
-        tick = symbol_info_tick(symbol)
+        # Check whether the market is open, if it's a crypto then market doesn't close.
+        # Callers that already hold the tick (e.g. from symbol_info_ticks or a MarketSnapshot) skip the request.
+        if tick is None and snapshot is not None:
+            tick = snapshot.tick(symbol)
+        if tick is None:
+            tick = symbol_info_tick(symbol)
         if tick is not None and not tick.empty:
             # Extract the first timestamp from the Series
             tick_time = datetime.fromtimestamp(tick.time.iloc[0], tz=TIMEZONE)
@@ -20,4 +24,4 @@ def is_market_open(symbol):
             else:
                 return True
         else:
-            return False
\ No newline at end of file
+            return False
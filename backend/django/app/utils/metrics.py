@@ -0,0 +1,121 @@
+import os
+import glob
+import shutil
+import time
+import logging
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from django.http import HttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+logger = logging.getLogger(__name__)
+
+# Gunicorn workers and Celery prefork children each write their samples to files in this
+# directory (it must be set before prometheus_client is imported, i.e. in the environment).
+# Every container gets its own directory because PIDs, which name the files, repeat across
+# containers; /metrics merges the directories found under PROMETHEUS_MULTIPROC_ROOT.
+PROMETHEUS_MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+PROMETHEUS_MULTIPROC_ROOT = os.environ.get(
+    'PROMETHEUS_MULTIPROC_ROOT', os.path.dirname(PROMETHEUS_MULTIPROC_DIR.rstrip('/')) if PROMETHEUS_MULTIPROC_DIR else None)
+if PROMETHEUS_MULTIPROC_DIR:
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+
+# Task cycles are scheduled every few seconds and hard-limited to 30 s
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 20.0, 30.0)
+BRIDGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+task_duration = Histogram(
+    'quant_task_duration_seconds', 'Duration of a trading algorithm run', ['task'], buckets=DURATION_BUCKETS)
+stage_duration = Histogram(
+    'quant_stage_duration_seconds', 'Duration of a stage of a trading algorithm run', ['task', 'stage'],
+    buckets=DURATION_BUCKETS)
+signal_to_order = Histogram(
+    'quant_signal_to_order_seconds', 'Time from the start of the entry run that found a signal to the bridge order response',
+    ['symbol'], buckets=DURATION_BUCKETS)
+bridge_request_duration = Histogram(
+    'mt5_bridge_client_request_duration_seconds', 'Latency of MT5 bridge requests until the response headers arrive',
+    ['method', 'endpoint', 'status'], buckets=BRIDGE_BUCKETS)
+orders_sent = Counter('quant_orders_sent_total', 'Entry orders sent to the bridge', ['symbol', 'type', 'outcome'])
+sl_moves = Counter('quant_sl_moves_total', 'Trailing stop loss modifications sent to the bridge', ['symbol', 'outcome'])
+closes_detected = Counter('quant_closes_detected_total', 'Positions found closed by the close algorithm', ['symbol'])
+
+
+@contextmanager
+def timed_task(task: str):
+    """Observe the duration of a whole algorithm run."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        task_duration.labels(task).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def timed_stage(task: str, stage: str):
+    """Observe the duration of one stage of an algorithm run."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_duration.labels(task, stage).observe(time.perf_counter() - start)
+
+
+# Bridge routes spanning several path segments; any other path is reduced to its first segment
+BRIDGE_BATCH_ROUTES = frozenset({'fetch_data_pos/batch', 'orders/batch', 'modify_sl_tp/batch'})
+
+
+def bridge_endpoint(url: str) -> str:
+    """
+    Bridge endpoint of a request URL, as used for metric labels and read timeouts: batch
+    routes keep their full path, per-symbol routes (e.g. /symbol_info/EURUSD) collapse to
+    their first segment.
+    """
+    path = urlparse(url).path.strip('/')
+    return path if path in BRIDGE_BATCH_ROUTES else path.split('/')[0] or '/'
+
+
+def observe_bridge_response(response, *args, **kwargs):
+    """``requests`` response hook, also called with httpx responses; labelled by bridge_endpoint()."""
+    try:
+        bridge_request_duration.labels(response.request.method, bridge_endpoint(str(response.url)),
+                                       str(response.status_code)).observe(response.elapsed.total_seconds())
+    except Exception as e:
+        logger.error(f"Error recording bridge request metrics: {str(e)}")
+    return response
+
+
+def _container_dirs():
+    return [path for path in glob.glob(os.path.join(PROMETHEUS_MULTIPROC_ROOT, '*')) if os.path.isdir(path)]
+
+
+class _SharedMultiProcessCollector:
+    """Merges the multiprocess files of every container directory into one set of series."""
+
+    def collect(self):
+        files = []
+        for path in _container_dirs():
+            files.extend(glob.glob(os.path.join(path, '*.db')))
+        return multiprocess.MultiProcessCollector.merge(files, accumulate=True)
+
+
+def reset_process_dir():
+    """Drop samples left by a previous run; call once per container, before workers start."""
+    if PROMETHEUS_MULTIPROC_DIR:
+        shutil.rmtree(PROMETHEUS_MULTIPROC_DIR, ignore_errors=True)
+        os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+
+
+def mark_process_dead(pid: int):
+    if PROMETHEUS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid, PROMETHEUS_MULTIPROC_DIR)
+
+
+def metrics_view(request):
+    if PROMETHEUS_MULTIPROC_ROOT:
+        registry = CollectorRegistry()
+        registry.register(_SharedMultiProcessCollector())
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
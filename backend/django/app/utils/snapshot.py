@@ -0,0 +1,53 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from app.utils.constants import MT5Timeframe, TIMEZONE
+from app.utils.api.async_client import prefetch_market_data
+
+logger = logging.getLogger(__name__)
+
+
+class MarketSnapshot:
+    """
+    Bridge state for one algorithm run: open positions, the latest tick and bars of each
+    symbol, and symbol specs, fetched once at the start of the run.
+
+    Utilities in ``account``, ``market`` and ``arithmetics`` take it as ``snapshot=`` and read
+    from it instead of calling the bridge; without one they fetch as before.
+    """
+
+    def __init__(self, positions: Optional[pd.DataFrame] = None, ticks: Optional[pd.DataFrame] = None,
+                 specs: Optional[Dict[str, Dict]] = None, rates: Optional[Dict[str, pd.DataFrame]] = None):
+        self.positions = positions
+        self.ticks = ticks if ticks is not None else pd.DataFrame()
+        self.specs = specs or {}
+        self.rates = rates or {}
+        self.taken_at = datetime.now(TIMEZONE)
+        self.open_symbols = set(positions['symbol']) if positions is not None else None
+
+    @classmethod
+    def capture(cls, symbols: List[str], timeframe: MT5Timeframe, bars: int) -> 'MarketSnapshot':
+        """Fetch the snapshot of ``symbols``, with concurrent bridge requests (see prefetch_market_data)."""
+        market = asyncio.run(prefetch_market_data(symbols, timeframe, bars))
+        return cls(positions=market['positions'], ticks=market['ticks'], specs=market['specs'], rates=market['rates'])
+
+    def tick(self, symbol: str) -> pd.DataFrame:
+        """Single-row frame like symbol_info_tick(), empty when the bridge had no tick for the symbol."""
+        return self.ticks.loc[[symbol]] if symbol in self.ticks.index else pd.DataFrame()
+
+    def price(self, symbol: str, type: str) -> Optional[float]:
+        """The ask for a BUY, the bid for a SELL, or None without a tick."""
+        tick = self.tick(symbol)
+        if tick.empty:
+            return None
+        return tick['ask'].iloc[0] if type == 'BUY' else tick['bid'].iloc[0]
+
+    def spec(self, symbol: str) -> Optional[Dict]:
+        return self.specs.get(symbol)
+
+    def bars(self, symbol: str) -> Optional[pd.DataFrame]:
+        return self.rates.get(symbol)
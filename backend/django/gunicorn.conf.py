@@ -0,0 +1,13 @@
+# backend/django/gunicorn.conf.py
+# Loaded automatically by gunicorn from the working directory.
+
+
+def on_starting(server):
+    # Drop metrics samples left by the previous run before any worker writes new ones
+    from app.utils.metrics import reset_process_dir
+    reset_process_dir()
+
+
+def child_exit(server, worker):
+    from app.utils.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
@@ -1,11 +1,17 @@
 import logging
 import os
-from flask import Flask
+from flask import Flask, jsonify, request
 from dotenv import load_dotenv
-import MetaTrader5 as mt5
 from flasgger import Swagger
 from werkzeug.middleware.proxy_fix import ProxyFix
 from swagger import swagger_config
+from tick_board import tick_board
+from connection import connection
+from executor import MT5CallTimeout
+from history_store import history_store
+from json_provider import OrjsonProvider
+from compression import compress_response
+from metrics import start_timer, observe_request
 
 # Import routes
 from routes.health import health_bp
@@ -16,11 +22,13 @@ from routes.order import order_bp
 from routes.history import history_bp
 from routes.error import error_bp
 from routes.auth import auth_bp  # ✅ Nueva importación
+from routes.stream import stream_bp
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.config['PREFERRED_URL_SCHEME'] = 'https'
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-super-secret-key-change-in-production')  # ✅ Configuración JWT
 
@@ -35,10 +43,35 @@ app.register_blueprint(position_bp)
 app.register_blueprint(order_bp)
 app.register_blueprint(history_bp)
 app.register_blueprint(error_bp)
+app.register_blueprint(stream_bp)
+
+# Blueprints that must answer even while the terminal is down; 'auth' because /login is how
+# the terminal gets an account again (after /logout, for instance)
+CONNECTION_EXEMPT_BLUEPRINTS = {'health', 'error', 'flasgger', 'auth'}
+
+@app.before_request
+def require_connection():
+    if request.blueprint in CONNECTION_EXEMPT_BLUEPRINTS or request.endpoint in (None, 'static'):
+        return None
+    if not connection.connected:
+        return jsonify({"error": "MT5 terminal is not connected", "connection": connection.state()}), 503
+
+@app.errorhandler(MT5CallTimeout)
+def mt5_call_timeout(error):
+    return jsonify({"error": str(error), "connection": connection.state()}), 504
+
+# Route latency histograms; registered first so the timer starts before any other hook
+app.before_request_funcs.setdefault(None, []).insert(0, start_timer)
+app.after_request(observe_request)
+
+# Gzip/zstd for large bodies, negotiated on Accept-Encoding
+app.after_request(compress_response)
 
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 
 if __name__ == '__main__':
-    if not mt5.initialize():
-        logger.error("Failed to initialize MT5.")
-    app.run(host='0.0.0.0', port=int(os.environ.get('MT5_API_PORT')))
\ No newline at end of file
+    connection.start()
+    tick_board.start()
+    history_store.start()
+    # Threaded so open /stream connections don't block other requests
+    app.run(host='0.0.0.0', port=int(os.environ.get('MT5_API_PORT')), threaded=True)
\ No newline at end of file
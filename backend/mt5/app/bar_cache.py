@@ -0,0 +1,102 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from executor import mt5
+
+logger = logging.getLogger(__name__)
+
+BAR_CACHE_MAX_BARS = int(os.environ.get('BAR_CACHE_MAX_BARS', 20000))
+BAR_CACHE_MAX_SERIES = int(os.environ.get('BAR_CACHE_MAX_SERIES', 64))
+
+# Bars requested on the first tail refresh; grows geometrically until it overlaps the cached bars
+INITIAL_TAIL_BARS = 2
+
+
+class BarCache:
+    """
+    In-process store of closed candles keyed by (symbol, timeframe).
+
+    A closed bar never changes, so once a series is cached only the forming bar and any
+    bars closed since the previous call are read from the terminal. Each series keeps at
+    most ``max_bars`` closed bars; once ``max_series`` series are cached the least recently
+    used one is evicted.
+    """
+
+    def __init__(self, max_bars: int = BAR_CACHE_MAX_BARS, max_series: int = BAR_CACHE_MAX_SERIES):
+        self.max_bars = max_bars
+        self.max_series = max_series
+        self._series = OrderedDict()
+        self._lock = threading.Lock()
+
+    def copy_rates_from_pos(self, symbol: str, timeframe: int, count: int):
+        """
+        Cached equivalent of ``mt5.copy_rates_from_pos(symbol, timeframe, 0, count)``.
+
+        :return: A structured array of the latest ``count`` bars (oldest first, forming bar
+                 last), or None if the terminal could not provide them.
+        """
+        if count <= 1 or count - 1 > self.max_bars:
+            return mt5.copy_rates_from_pos(symbol, timeframe, 0, count)
+
+        key = (symbol, timeframe)
+        with self._lock:
+            closed = self._series.get(key)
+
+        if closed is None or len(closed) < count - 1:
+            rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, count)
+            if rates is None:
+                return None
+            self._store(key, rates[:-1], replace=True)
+            return rates
+
+        tail = self._fetch_tail(symbol, timeframe, closed['time'][-1], count)
+        if tail is None:
+            return None
+        if len(tail) == count and tail['time'][0] > closed['time'][-1]:
+            # More than a full window closed since the last call: start the series over
+            self._store(key, tail[:-1], replace=True)
+            return tail
+
+        closed = self._store(key, tail[:-1])
+        return np.concatenate((closed[-(count - 1):], tail[-1:]))
+
+    def _fetch_tail(self, symbol, timeframe, last_closed_time, count):
+        size = min(INITIAL_TAIL_BARS, count)
+        while True:
+            tail = mt5.copy_rates_from_pos(symbol, timeframe, 0, size)
+            if tail is None or len(tail) < size or size == count or tail['time'][0] <= last_closed_time:
+                return tail
+            size = min(size * 4, count)
+
+    def _store(self, key, bars, replace=False):
+        with self._lock:
+            closed = self._series.get(key)
+            if not replace and closed is not None and len(closed):
+                bars = np.concatenate((closed, bars[bars['time'] > closed['time'][-1]]))
+            closed = bars[-self.max_bars:]
+            self._series[key] = closed
+            self._series.move_to_end(key)
+            while len(self._series) > self.max_series:
+                evicted, _ = self._series.popitem(last=False)
+                logger.info(f"Evicted bar cache series {evicted}")
+            return closed
+
+    def invalidate(self, symbol: str = None):
+        with self._lock:
+            for key in [key for key in self._series if symbol is None or key[0] == symbol]:
+                del self._series[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'series': len(self._series),
+                'bars': sum(len(closed) for closed in self._series.values()),
+                'max_series': self.max_series,
+                'max_bars': self.max_bars,
+            }
+
+
+bar_cache = BarCache()
@@ -0,0 +1,75 @@
+import json
+import struct
+from typing import Dict, Optional
+
+import numpy as np
+from flask import Response, request
+
+# Binary columnar wire format shared with app.utils.api.columnar on the Django side.
+#
+#   [prefix]  4s magic b'MT5C' | u8 version | 3 pad bytes | u32 LE header length
+#   [header]  UTF-8 JSON {"rows": n, "columns": [[name, numpy dtype str], ...], "meta": {...}}
+#             space-padded so the first column starts on an 8-byte boundary
+#   [columns] each column's little-endian bytes in header order, padded to 8 bytes
+#
+# A columnar stream is a sequence of such frames, each preceded by its u64 LE byte length.
+COLUMNAR_MIMETYPE = 'application/vnd.mt5.columnar'
+COLUMNAR_STREAM_MIMETYPE = 'application/vnd.mt5.columnar-stream'
+MAGIC = b'MT5C'
+VERSION = 1
+PREFIX = struct.Struct('<4sB3xI')
+ALIGNMENT = 8
+FRAME_LENGTH = struct.Struct('<Q')
+
+
+def _padding(size: int) -> int:
+    return -size % ALIGNMENT
+
+
+def encode_columns(columns: Dict[str, np.ndarray], meta: Optional[Dict] = None) -> bytes:
+    """Encode equally sized 1-D arrays into a single columnar frame."""
+    rows = len(next(iter(columns.values()))) if columns else 0
+    arrays = []
+    for name, values in columns.items():
+        if len(values) != rows:
+            raise ValueError(f"Column '{name}' has {len(values)} rows, expected {rows}.")
+        arrays.append((name, np.ascontiguousarray(values, dtype=values.dtype.newbyteorder('<'))))
+
+    header = json.dumps({
+        'rows': rows,
+        'columns': [[name, values.dtype.str] for name, values in arrays],
+        'meta': meta or {},
+    }).encode('utf-8')
+    header += b' ' * _padding(PREFIX.size + len(header))
+
+    parts = [PREFIX.pack(MAGIC, VERSION, len(header)), header]
+    for _, values in arrays:
+        parts.append(memoryview(values.view(np.uint8)))
+        parts.append(b'\0' * _padding(values.nbytes))
+    return b''.join(parts)
+
+
+def rates_columns(rates: np.ndarray) -> Dict[str, np.ndarray]:
+    """Split a copy_rates_* structured array into columns, tagging 'time' as datetime64[s]."""
+    columns = {name: rates[name] for name in rates.dtype.names}
+    columns['time'] = columns['time'].astype('<i8', copy=False).view('<M8[s]')
+    return columns
+
+
+def encode_rates(rates: np.ndarray, meta: Optional[Dict] = None) -> bytes:
+    return encode_columns(rates_columns(rates), meta)
+
+
+def encode_stream_frame(columns: Dict[str, np.ndarray], meta: Optional[Dict] = None) -> bytes:
+    """One length-prefixed frame of a columnar stream."""
+    frame = encode_columns(columns, meta)
+    return FRAME_LENGTH.pack(len(frame)) + frame
+
+
+def wants_columnar() -> bool:
+    """True when the client's Accept header prefers the columnar format over JSON."""
+    return request.accept_mimetypes.best_match(['application/json', COLUMNAR_MIMETYPE]) == COLUMNAR_MIMETYPE
+
+
+def columnar_response(rates: np.ndarray, meta: Optional[Dict] = None) -> Response:
+    return Response(encode_rates(rates, meta), mimetype=COLUMNAR_MIMETYPE)
@@ -0,0 +1,105 @@
+import os
+import zlib
+import logging
+from typing import Iterable, Iterator, Optional
+
+from flask import Response, request
+
+try:
+    import zstandard
+except ImportError:  # zstd is only offered when the package is installed
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))  # bytes; smaller bodies are sent as is
+GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+ZSTD_LEVEL = int(os.environ.get('COMPRESSION_ZSTD_LEVEL', 3))
+
+# Server preference when the client accepts several with the same quality
+ENCODINGS = ['zstd', 'gzip'] if zstandard is not None else ['gzip']
+# Event streams must reach the client event by event
+UNCOMPRESSED_MIMETYPES = {'text/event-stream'}
+
+
+def negotiate_encoding() -> Optional[str]:
+    return request.accept_encodings.best_match(ENCODINGS)
+
+
+def _gzip():
+    return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    compressor = _gzip()
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """
+    Compress a streamed body chunk by chunk. Every chunk is flushed on its own, so a client
+    reading a paginated stream can decode each page as soon as it arrives.
+    """
+    if encoding == 'zstd':
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+    else:
+        compressor = _gzip()
+        block = zlib.Z_SYNC_FLUSH
+
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if chunk:
+                yield compressor.compress(chunk) + compressor.flush(block)
+        yield compressor.flush()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+def _weaken_etag(response: Response):
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+def compress_response(response: Response) -> Response:
+    """
+    ``after_request`` hook: compress the body with the best encoding the client accepts.
+
+    Buffered bodies below COMPRESSION_MIN_SIZE are left alone; streamed bodies are always
+    compressed since their size is not known up front. A strong ETag is made weak, as the
+    compressed bytes differ from the representation it was computed on.
+    """
+    if (response.status_code < 200 or response.status_code == 204
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype in UNCOMPRESSED_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+
+    if response.status_code == 304:
+        # Carry the same validator the compressed 200 would have
+        _weaken_etag(response)
+        return response
+
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESSION_MIN_SIZE:
+            return response
+        response.set_data(compress(data, encoding))
+
+    response.headers['Content-Encoding'] = encoding
+    _weaken_etag(response)
+    return response
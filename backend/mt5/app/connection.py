@@ -0,0 +1,143 @@
+import os
+import random
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict
+
+from executor import mt5, executor, MT5CallTimeout
+
+logger = logging.getLogger(__name__)
+
+CONNECTION_CHECK_INTERVAL = float(os.environ.get('CONNECTION_CHECK_INTERVAL', 5))  # seconds between terminal_info probes
+RECONNECT_BACKOFF_MIN = float(os.environ.get('RECONNECT_BACKOFF_MIN', 1))  # seconds
+RECONNECT_BACKOFF_MAX = float(os.environ.get('RECONNECT_BACKOFF_MAX', 60))  # seconds
+# Reported as last_error when a call times out (RES_E_INTERNAL_FAIL_TIMEOUT, the package's IPC timeout)
+CALL_TIMEOUT_ERROR = -10005
+
+
+class ConnectionManager:
+    """
+    Owns the terminal connection: initializes it once, then probes ``terminal_info()`` in the
+    background and re-initializes with exponential backoff (and jitter) while it is down.
+
+    Request handlers read the cached state (``connected``, ``state()``) instead of calling
+    ``mt5.initialize()`` themselves. A call that times out in the executor marks the terminal
+    disconnected until a probe answers again.
+    """
+
+    def __init__(self, check_interval: float = CONNECTION_CHECK_INTERVAL,
+                 backoff_min: float = RECONNECT_BACKOFF_MIN, backoff_max: float = RECONNECT_BACKOFF_MAX):
+        self.check_interval = check_interval
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self.initialized = False
+        self.connected = False
+        self.terminal_info = None
+        self.last_error = None
+        self.last_check = None
+        self.since = None
+        self.reconnect_attempts = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self) -> bool:
+        """Connect once in the caller's thread, then keep the connection monitored in the background."""
+        self._connect()
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='mt5-connection', daemon=True)
+            self._thread.start()
+        return self.connected
+
+    def shutdown(self):
+        """Close the terminal connection; the monitor reconnects on its next cycle."""
+        mt5.shutdown()
+        self._set_state(initialized=False, connected=False, terminal_info=None)
+        self._wake.set()
+
+    def on_call_timeout(self, error: MT5CallTimeout):
+        """Executor timeout listener: a hung terminal is reported as down."""
+        self._set_state(connected=False, terminal_info=None, last_error=(CALL_TIMEOUT_ERROR, str(error)))
+
+    def check(self) -> bool:
+        """Probe the terminal now and update the cached state."""
+        try:
+            info, error = mt5.call_with_error('terminal_info')
+        except MT5CallTimeout:
+            # on_call_timeout has already recorded it
+            return False
+        if info is None:
+            self._set_state(connected=False, terminal_info=None, last_error=error)
+        else:
+            self._set_state(connected=bool(info.connected), terminal_info=info._asdict())
+        return self.connected
+
+    def _connect(self) -> bool:
+        try:
+            initialized, error = mt5.call_with_error('initialize')
+        except MT5CallTimeout as e:
+            # The terminal may still be starting; the monitor retries with backoff
+            initialized, error = False, (CALL_TIMEOUT_ERROR, str(e))
+        if not initialized:
+            self._set_state(initialized=False, connected=False, last_error=error)
+            logger.error(f"Failed to initialize MT5: {self.last_error}")
+            return False
+        self._set_state(initialized=True)
+        return self.check()
+
+    def _set_state(self, **state):
+        with self._lock:
+            was_connected = self.connected
+            for name, value in state.items():
+                setattr(self, name, value)
+            self.last_check = datetime.now(timezone.utc)
+            if self.connected != was_connected or self.since is None:
+                self.since = self.last_check
+            if self.connected:
+                self.reconnect_attempts = 0
+        if was_connected and not self.connected:
+            logger.error(f"Lost connection to MT5 terminal: {self.last_error}")
+        elif self.connected and not was_connected:
+            logger.info("Connected to MT5 terminal")
+
+    def _backoff(self) -> float:
+        delay = min(self.backoff_max, self.backoff_min * 2 ** self.reconnect_attempts)
+        return delay * random.uniform(0.5, 1.0)
+
+    def _run(self):
+        while True:
+            delay = self.check_interval if self.connected else self._backoff()
+            self._wake.wait(delay)
+            self._wake.clear()
+            try:
+                if self.connected:
+                    self.check()
+                elif self.initialized and self.check():
+                    # The terminal came back on its own
+                    continue
+                else:
+                    self.reconnect_attempts += 1
+                    logger.info(f"Reconnecting to MT5 (attempt {self.reconnect_attempts})")
+                    self._connect()
+            except Exception as e:
+                logger.error(f"Error checking MT5 connection: {str(e)}")
+
+    def state(self) -> Dict:
+        with self._lock:
+            return {
+                'connected': self.connected,
+                'initialized': self.initialized,
+                'since': self.since.isoformat() if self.since else None,
+                'last_check': self.last_check.isoformat() if self.last_check else None,
+                'reconnect_attempts': self.reconnect_attempts,
+                'last_error': list(self.last_error) if self.last_error else None,
+                'terminal': {
+                    'name': self.terminal_info.get('name'),
+                    'trade_allowed': self.terminal_info.get('trade_allowed'),
+                } if self.terminal_info else None,
+            }
+
+
+connection = ConnectionManager()
+executor.add_timeout_listener(connection.on_call_timeout)
@@ -1,5 +1,5 @@
 from enum import Enum
-import MetaTrader5 as mt5
+from executor import mt5
 
 class MT5Timeframe(Enum):
     M1 = mt5.TIMEFRAME_M1       # 1-minute
@@ -12,6 +12,19 @@ class MT5Timeframe(Enum):
     W1 = mt5.TIMEFRAME_W1       # weekly
     MN1 = mt5.TIMEFRAME_MN1     # monthly
 
+# Nominal bar length per timeframe name, used to size time windows (MN1 taken as 31 days)
+TIMEFRAME_SECONDS = {
+    'M1': 60,
+    'M5': 5 * 60,
+    'M15': 15 * 60,
+    'M30': 30 * 60,
+    'H1': 60 * 60,
+    'H4': 4 * 60 * 60,
+    'D1': 24 * 60 * 60,
+    'W1': 7 * 24 * 60 * 60,
+    'MN1': 31 * 24 * 60 * 60,
+}
+
 TRADE_RETCODE_DESCRIPTION = {
     mt5.TRADE_RETCODE_REQUOTE: "Requote",
     mt5.TRADE_RETCODE_REJECT: "Request rejected",
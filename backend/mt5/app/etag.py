@@ -0,0 +1,39 @@
+import hashlib
+from typing import Callable
+
+from flask import Response, make_response, request
+
+
+def content_etag(*parts) -> str:
+    """
+    Cheap content version for a read endpoint's response.
+
+    ``parts`` are the raw MT5 results the body is built from (bytes, numpy arrays, named tuples,
+    DataFrames...), hashed before any serialization takes place. Callers should include
+    anything else that changes the representation, such as the negotiated mimetype.
+    """
+    digest = hashlib.blake2b(digest_size=12)
+    for part in parts:
+        if hasattr(part, 'tobytes'):
+            digest.update(part.tobytes())
+        elif isinstance(part, bytes):
+            digest.update(part)
+        else:
+            digest.update(repr(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def conditional_response(etag: str, build: Callable) -> Response:
+    """
+    Answer ``304 Not Modified`` when the request's If-None-Match matches ``etag``; otherwise
+    call ``build()`` for the full response and tag it.
+
+    Matching is weak (RFC 9110 section 13.1.2) so validators survive content-coding changes.
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = make_response(build())
+    response.set_etag(etag)
+    return response
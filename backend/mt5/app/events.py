@@ -0,0 +1,71 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+from itertools import islice
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+EVENT_BUFFER_SIZE = int(os.environ.get('EVENT_BUFFER_SIZE', 10000))  # events kept for resuming clients
+
+
+class EventBus:
+    """
+    In-process publish/subscribe channel for bridge events (ticks, position and deal changes).
+
+    Every event gets a strictly increasing ``seq``. The last ``buffer_size`` events are kept so
+    a client that reconnects with the last ``seq`` it saw receives exactly what it missed; if it
+    fell further behind than the buffer, ``since`` reports the gap instead. ``epoch`` changes
+    whenever the bridge restarts, which is when sequence numbers start over.
+    """
+
+    def __init__(self, buffer_size: int = EVENT_BUFFER_SIZE):
+        self.epoch = int(time.time() * 1000)
+        self._events = deque(maxlen=buffer_size)
+        self._seq = 0
+        self._condition = threading.Condition()
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the latest published event (0 before the first one)."""
+        with self._condition:
+            return self._seq
+
+    def publish(self, type: str, data: Dict) -> Dict:
+        with self._condition:
+            self._seq += 1
+            event = {'seq': self._seq, 'type': type, 'time_msc': int(time.time() * 1000), 'data': data}
+            self._events.append(event)
+            self._condition.notify_all()
+        return event
+
+    def since(self, seq: int) -> Optional[List[Dict]]:
+        """
+        Buffered events with a sequence number greater than ``seq``.
+
+        :return: The events in order, or None if some of them were already dropped from the buffer
+                 (or ``seq`` was never issued).
+        """
+        with self._condition:
+            return self._since(seq)
+
+    def wait(self, seq: int, timeout: float) -> Optional[List[Dict]]:
+        """Like ``since``, but blocks up to ``timeout`` seconds until there is something newer than ``seq``."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._seq > seq, timeout=timeout)
+            return self._since(seq)
+
+    def _since(self, seq):
+        if seq > self._seq:
+            return None
+        if seq == self._seq:
+            return []
+        if self._events[0]['seq'] > seq + 1:
+            return None
+        # Sequence numbers are contiguous, so the offset into the buffer is arithmetic
+        return list(islice(self._events, seq + 1 - self._events[0]['seq'], None))
+
+
+event_bus = EventBus()
@@ -0,0 +1,282 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from functools import wraps
+from itertools import count
+from queue import PriorityQueue
+
+import MetaTrader5 as _mt5
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_TRADE = 0
+PRIORITY_READ = 1
+PRIORITY_BULK = 2
+PRIORITY_NAMES = {PRIORITY_TRADE: 'trade', PRIORITY_READ: 'read', PRIORITY_BULK: 'bulk'}
+
+# Calls not listed here run at PRIORITY_READ
+CALL_PRIORITY = {
+    'initialize': PRIORITY_TRADE,
+    'login': PRIORITY_TRADE,
+    'shutdown': PRIORITY_TRADE,
+    'order_send': PRIORITY_TRADE,
+    'order_check': PRIORITY_TRADE,
+    'copy_rates_from': PRIORITY_BULK,
+    'copy_rates_range': PRIORITY_BULK,
+    'copy_ticks_from': PRIORITY_BULK,
+    'copy_ticks_range': PRIORITY_BULK,
+    'history_deals_get': PRIORITY_BULK,
+    'history_orders_get': PRIORITY_BULK,
+}
+
+# Seconds a caller waits for its call, queue wait included, before giving up with MT5CallTimeout
+CALL_TIMEOUTS = {
+    PRIORITY_TRADE: float(os.environ.get('MT5_TRADE_CALL_TIMEOUT', 30)),
+    PRIORITY_READ: float(os.environ.get('MT5_CALL_TIMEOUT', 15)),
+    PRIORITY_BULK: float(os.environ.get('MT5_BULK_CALL_TIMEOUT', 120)),
+}
+
+
+class MT5CallTimeout(TimeoutError):
+    """
+    A MetaTrader5 call did not complete within its priority's timeout. A call still queued is
+    dropped; one already running on the executor thread may still complete.
+    """
+
+    def __init__(self, name: str, priority: int, timeout: float, started: bool):
+        self.name = name
+        self.priority = priority
+        self.timeout = timeout
+        self.started = started
+        state = 'running' if started else 'queued'
+        super().__init__(f"MT5 call {name} timed out after {timeout}s ({state})")
+
+
+class MT5Executor:
+    """
+    Runs every MetaTrader5 call on a single owner thread.
+
+    The terminal API is one IPC channel, so calls from request threads are queued and executed
+    one at a time in priority order: trade operations first, then ordinary reads, then bulk
+    history/rate reads; equal priorities run in arrival order. Calls made from the owner
+    thread itself run inline.
+
+    A call that hangs holds up everything queued behind it, so callers wait at most
+    ``timeouts[priority]`` seconds and then get MT5CallTimeout; timeout listeners (the
+    connection monitor) are told so the bridge stops reporting the terminal as healthy.
+    """
+
+    def __init__(self, timeouts: dict = CALL_TIMEOUTS):
+        self.timeouts = timeouts
+        self._timeout_listeners = []
+        self._running = None
+        self._queue = PriorityQueue()
+        self._order = count()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats = {priority: {'pending': 0, 'calls': 0, 'timeouts': 0, 'wait_total': 0.0, 'wait_max': 0.0,
+                                  'run_total': 0.0}
+                       for priority in PRIORITY_NAMES}
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                thread = threading.Thread(target=self._run, name='mt5-executor', daemon=True)
+                thread.start()
+                self._thread = thread
+
+    def call(self, name: str, *args, **kwargs):
+        """Run ``MetaTrader5.<name>(*args, **kwargs)`` on the owner thread and return its result."""
+        return self._submit(name, args, kwargs, with_error=False)
+
+    def call_with_error(self, name: str, *args, **kwargs):
+        """
+        Like ``call``, but ``last_error()`` is read right after the function in the same queued
+        task, before a call from another thread can overwrite it.
+
+        :return: A tuple of (result, last error); the result is None when the function failed.
+                 An exception raised by the function carries the error as ``mt5_error``.
+        """
+        return self._submit(name, args, kwargs, with_error=True)
+
+    def _submit(self, name: str, args, kwargs, with_error: bool):
+        function = getattr(_mt5, name)
+        if threading.current_thread() is self._thread:
+            return self._execute(function, args, kwargs, with_error)[0]
+
+        priority = getattr(self._local, 'priority', None)
+        if priority is None:
+            priority = CALL_PRIORITY.get(name, PRIORITY_READ)
+
+        self._ensure_started()
+        future = Future()
+        with self._stats_lock:
+            self._stats[priority]['pending'] += 1
+        self._queue.put((priority, next(self._order), time.monotonic(), future, function, args, kwargs, with_error))
+        try:
+            return future.result(timeout=self.timeouts[priority])
+        except FutureTimeout:
+            # A call still in the queue is cancelled, so the executor skips it
+            started = not future.cancel()
+            if started and future.done():
+                # It completed just as the wait ran out
+                return future.result()
+            raise self._timed_out(name, priority, started) from None
+
+    def add_timeout_listener(self, listener):
+        """Call ``listener(error)`` with the MT5CallTimeout of every call that times out."""
+        self._timeout_listeners.append(listener)
+
+    def _timed_out(self, name: str, priority: int, started: bool) -> MT5CallTimeout:
+        error = MT5CallTimeout(name, priority, self.timeouts[priority], started)
+        logger.error(str(error))
+        with self._stats_lock:
+            self._stats[priority]['timeouts'] += 1
+        try:
+            metrics.observe_mt5_timeout(name, PRIORITY_NAMES[priority])
+        except Exception as e:
+            logger.error(f"Error recording metrics for {name}: {str(e)}")
+        for listener in self._timeout_listeners:
+            try:
+                listener(error)
+            except Exception as e:
+                logger.error(f"Error notifying MT5 call timeout: {str(e)}")
+        return error
+
+    @staticmethod
+    def _execute(function, args, kwargs, with_error: bool):
+        """Run ``function`` and return (value for the caller, raw result)."""
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as e:
+            if with_error:
+                e.mt5_error = _mt5.last_error()
+            raise
+        if with_error:
+            return (result, _mt5.last_error()), result
+        return result, result
+
+    @contextmanager
+    def priority(self, priority: int):
+        """Run every MT5 call made by this thread inside the block at ``priority``."""
+        previous = getattr(self._local, 'priority', None)
+        self._local.priority = priority
+        try:
+            yield
+        finally:
+            self._local.priority = previous
+
+    def _run(self):
+        while True:
+            priority, _, queued_at, future, function, args, kwargs, with_error = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                # Its caller timed out while it was queued
+                with self._stats_lock:
+                    self._stats[priority]['pending'] -= 1
+                continue
+            started_at = time.monotonic()
+            with self._stats_lock:
+                self._running = (function.__name__, priority, started_at)
+            result = None
+            failed = False
+            try:
+                value, result = self._execute(function, args, kwargs, with_error)
+                future.set_result(value)
+            except BaseException as e:
+                failed = True
+                future.set_exception(e)
+            finished_at = time.monotonic()
+
+            wait = started_at - queued_at
+            with self._stats_lock:
+                self._running = None
+                stats = self._stats[priority]
+                stats['pending'] -= 1
+                stats['calls'] += 1
+                stats['wait_total'] += wait
+                stats['wait_max'] = max(stats['wait_max'], wait)
+                stats['run_total'] += finished_at - started_at
+            try:
+                metrics.observe_mt5_call(function.__name__, PRIORITY_NAMES[priority], wait,
+                                         finished_at - started_at, result, failed)
+            except Exception as e:
+                logger.error(f"Error recording metrics for {function.__name__}: {str(e)}")
+
+    def stats(self) -> dict:
+        """
+        Queue depth, timeouts and wait/run times per priority class, and the call running on the
+        executor thread, if any (times in milliseconds).
+        """
+        with self._stats_lock:
+            running = None
+            if self._running is not None:
+                name, priority, started_at = self._running
+                running = {'function': name, 'priority': PRIORITY_NAMES[priority],
+                           'running_ms': (time.monotonic() - started_at) * 1000}
+            by_priority = {}
+            for priority, stats in self._stats.items():
+                calls = stats['calls']
+                by_priority[PRIORITY_NAMES[priority]] = {
+                    'pending': stats['pending'],
+                    'calls': calls,
+                    'timeouts': stats['timeouts'],
+                    'wait_avg_ms': stats['wait_total'] / calls * 1000 if calls else 0.0,
+                    'wait_max_ms': stats['wait_max'] * 1000,
+                    'run_avg_ms': stats['run_total'] / calls * 1000 if calls else 0.0,
+                }
+        return {
+            'queue_depth': sum(stats['pending'] for stats in by_priority.values()),
+            'running': running,
+            'priorities': by_priority,
+        }
+
+
+class MT5Proxy:
+    """
+    Drop-in stand-in for the ``MetaTrader5`` module: functions are routed through the
+    executor, constants (TIMEFRAME_*, ORDER_TYPE_*, ...) are read straight from the module.
+
+    A separate ``mt5.last_error()`` is queued like any other call, so it may report the error of
+    another thread's call; use ``call_with_error`` when the error of a failed call matters.
+    """
+
+    def __init__(self, executor: MT5Executor):
+        self._executor = executor
+
+    def call_with_error(self, name: str, *args, **kwargs):
+        """``MetaTrader5.<name>(*args, **kwargs)`` and its ``last_error()``; see MT5Executor.call_with_error."""
+        return self._executor.call_with_error(name, *args, **kwargs)
+
+    def __getattr__(self, name):
+        attribute = getattr(_mt5, name)
+        if not callable(attribute):
+            return attribute
+
+        def call(*args, **kwargs):
+            return self._executor.call(name, *args, **kwargs)
+        call.__name__ = name
+        # Cache the wrapper so later lookups skip __getattr__
+        setattr(self, name, call)
+        return call
+
+
+executor = MT5Executor()
+mt5 = MT5Proxy(executor)
+
+
+def trade_priority(f):
+    """Run every MT5 call of the decorated handler at trade priority, including its reads."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        with executor.priority(PRIORITY_TRADE):
+            return f(*args, **kwargs)
+    return decorated_function
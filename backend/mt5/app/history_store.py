@@ -0,0 +1,262 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from executor import mt5
+from connection import connection
+from streaming import time_windows
+
+logger = logging.getLogger(__name__)
+
+# /config is the container's persistent volume
+HISTORY_DB_PATH = os.environ.get('HISTORY_DB_PATH', '/config/history.sqlite3')
+HISTORY_SYNC_INTERVAL = float(os.environ.get('HISTORY_SYNC_INTERVAL', 60))  # seconds between incremental syncs
+HISTORY_BACKFILL_DAYS = int(os.environ.get('HISTORY_BACKFILL_DAYS', 365))  # history loaded on the first sync
+HISTORY_PAGE_SECONDS = 30 * 24 * 60 * 60  # backfill window per terminal call
+# Re-read this much before the cursor on every sync, for late deals and orders finished in the same second
+HISTORY_SYNC_OVERLAP = 60
+# Deal and order times are terminal server time, so sync windows reach this far past the local clock
+SERVER_TIME_PADDING = 24 * 60 * 60
+
+DEAL_COLUMNS = [
+    ('ticket', 'INTEGER PRIMARY KEY'), ('order', 'INTEGER'), ('time', 'INTEGER'), ('time_msc', 'INTEGER'),
+    ('type', 'INTEGER'), ('entry', 'INTEGER'), ('magic', 'INTEGER'), ('position_id', 'INTEGER'),
+    ('reason', 'INTEGER'), ('volume', 'REAL'), ('price', 'REAL'), ('commission', 'REAL'), ('swap', 'REAL'),
+    ('profit', 'REAL'), ('fee', 'REAL'), ('symbol', 'TEXT'), ('comment', 'TEXT'), ('external_id', 'TEXT'),
+]
+ORDER_COLUMNS = [
+    ('ticket', 'INTEGER PRIMARY KEY'), ('time_setup', 'INTEGER'), ('time_setup_msc', 'INTEGER'),
+    ('time_done', 'INTEGER'), ('time_done_msc', 'INTEGER'), ('time_expiration', 'INTEGER'), ('type', 'INTEGER'),
+    ('type_time', 'INTEGER'), ('type_filling', 'INTEGER'), ('state', 'INTEGER'), ('magic', 'INTEGER'),
+    ('position_id', 'INTEGER'), ('position_by_id', 'INTEGER'), ('reason', 'INTEGER'), ('volume_initial', 'REAL'),
+    ('volume_current', 'REAL'), ('price_open', 'REAL'), ('sl', 'REAL'), ('tp', 'REAL'), ('price_current', 'REAL'),
+    ('price_stoplimit', 'REAL'), ('symbol', 'TEXT'), ('comment', 'TEXT'), ('external_id', 'TEXT'),
+]
+INDEXES = [
+    'CREATE INDEX IF NOT EXISTS deals_position ON deals (position_id, time_msc)',
+    'CREATE INDEX IF NOT EXISTS deals_order ON deals ("order")',
+    'CREATE INDEX IF NOT EXISTS deals_time ON deals (time_msc)',
+    'CREATE INDEX IF NOT EXISTS orders_position ON orders (position_id)',
+    'CREATE INDEX IF NOT EXISTS orders_time ON orders (time_done_msc)',
+]
+TABLE_COLUMNS = {'deals': DEAL_COLUMNS, 'orders': ORDER_COLUMNS}
+# Per table: the column the incremental cursor follows
+CURSOR_COLUMNS = {'deals': 'time_msc', 'orders': 'time_done_msc'}
+
+
+def _create_table(name: str, columns) -> str:
+    return f'CREATE TABLE IF NOT EXISTS {name} ({", ".join(f""""{column}" {kind}""" for column, kind in columns)})'
+
+
+def _upsert(name: str, columns) -> str:
+    names = ', '.join(f'"{column}"' for column, _ in columns)
+    return f'INSERT OR REPLACE INTO {name} ({names}) VALUES ({", ".join("?" * len(columns))})'
+
+
+def _is_closed(deals: List[Dict]) -> bool:
+    volume_in = sum(deal['volume'] for deal in deals if deal['entry'] in (mt5.DEAL_ENTRY_IN, mt5.DEAL_ENTRY_INOUT))
+    volume_out = sum(deal['volume'] for deal in deals if deal['entry'] in (mt5.DEAL_ENTRY_OUT, mt5.DEAL_ENTRY_OUT_BY))
+    return volume_out > 0 and round(volume_out - volume_in, 8) >= 0
+
+
+class HistoryStore:
+    """
+    Local SQLite copy of the account's deal and order history.
+
+    The first sync loads HISTORY_BACKFILL_DAYS of history; later syncs only ask the terminal
+    for what is newer than the stored time_msc cursor. Lookups by position, order ticket or
+    time are then indexed local reads that return every deal of a position however long it
+    was open. The store is dropped when the terminal is logged into a different account.
+    """
+
+    def __init__(self, path: str = HISTORY_DB_PATH, interval: float = HISTORY_SYNC_INTERVAL,
+                 backfill_days: int = HISTORY_BACKFILL_DAYS):
+        self.path = path
+        self.interval = interval
+        self.backfill_days = backfill_days
+        self.last_sync = None
+        self._db = None
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.row_factory = sqlite3.Row
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            db.execute(_create_table('deals', DEAL_COLUMNS))
+            db.execute(_create_table('orders', ORDER_COLUMNS))
+            db.execute('CREATE TABLE IF NOT EXISTS sync_state (name TEXT PRIMARY KEY, value INTEGER)')
+            for statement in INDEXES:
+                db.execute(statement)
+            db.commit()
+            self._db = db
+        return self._db
+
+    def _get_state(self, name: str) -> Optional[int]:
+        row = self._connect().execute('SELECT value FROM sync_state WHERE name = ?', (name,)).fetchone()
+        return row['value'] if row else None
+
+    def _set_state(self, name: str, value: int):
+        self._connect().execute('INSERT OR REPLACE INTO sync_state (name, value) VALUES (?, ?)', (name, value))
+
+    def _insert(self, table: str, records: Iterable, advance_cursor: bool = False) -> int:
+        columns = TABLE_COLUMNS[table]
+        rows = []
+        latest = 0
+        for record in records:
+            record = record._asdict() if hasattr(record, '_asdict') else record
+            rows.append(tuple(record.get(column) for column, _ in columns))
+            latest = max(latest, record.get(CURSOR_COLUMNS[table]) or 0)
+        if not rows:
+            return 0
+        with self._lock:
+            db = self._connect()
+            db.executemany(_upsert(table, columns), rows)
+            if advance_cursor and latest > (self._get_state(table) or 0):
+                self._set_state(table, latest)
+            db.commit()
+        return len(rows)
+
+    def add_deals(self, deals: Iterable) -> int:
+        """
+        Store deals already read from the terminal (TradeDeal tuples or dicts). The sync
+        cursor is left alone, so this never makes a sync skip older history.
+        """
+        return self._insert('deals', deals)
+
+    def add_orders(self, orders: Iterable) -> int:
+        """Store historical orders already read from the terminal (TradeOrder tuples or dicts)."""
+        return self._insert('orders', orders)
+
+    def _check_account(self):
+        account = mt5.account_info()
+        if account is None:
+            return
+        with self._lock:
+            login = self._get_state('login')
+            if login != account.login:
+                if login is not None:
+                    logger.info(f"Account changed from {login} to {account.login}, dropping stored history")
+                db = self._connect()
+                db.execute('DELETE FROM deals')
+                db.execute('DELETE FROM orders')
+                db.execute('DELETE FROM sync_state')
+                self._set_state('login', account.login)
+                db.commit()
+
+    def _sync_table(self, table: str, fetch) -> int:
+        with self._lock:
+            cursor_msc = self._get_state(table)
+        now = int(time.time())
+        end = now + SERVER_TIME_PADDING
+        if cursor_msc is None:
+            start = now - self.backfill_days * 24 * 60 * 60
+        else:
+            start = cursor_msc // 1000 - HISTORY_SYNC_OVERLAP
+
+        stored = 0
+        for window_from, window_to, _ in time_windows(start, end, HISTORY_PAGE_SECONDS):
+            records = fetch(window_from, window_to)
+            if records is None:
+                logger.error(f"Failed to sync {table} history for {window_from}-{window_to}: {mt5.last_error()}")
+                return stored
+            stored += self._insert(table, records, advance_cursor=True)
+
+        if cursor_msc is None and not stored:
+            # Nothing in the backfill window: start the cursor there so the next sync is incremental
+            with self._lock:
+                self._set_state(table, start * 1000)
+                self._connect().commit()
+        return stored
+
+    def sync(self) -> Dict:
+        """Pull new deals and orders from the terminal. Returns the number of records stored per table."""
+        self._check_account()
+        result = {
+            'deals': self._sync_table('deals', mt5.history_deals_get),
+            'orders': self._sync_table('orders', mt5.history_orders_get),
+        }
+        self.last_sync = time.time()
+        return result
+
+    def wake(self):
+        """Sync now instead of at the next interval (e.g. right after a trade)."""
+        self._wake.set()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='history-sync', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            if connection.connected:
+                try:
+                    self.sync()
+                except Exception as e:
+                    logger.error(f"Error syncing history: {str(e)}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def _query(self, sql: str, params=()) -> List[Dict]:
+        with self._lock:
+            return [dict(row) for row in self._connect().execute(sql, params).fetchall()]
+
+    def deals_for_position(self, position_id: int) -> List[Dict]:
+        """Every stored deal of a position, oldest first."""
+        return self._query('SELECT * FROM deals WHERE position_id = ? ORDER BY time_msc, ticket', (position_id,))
+
+    def position_deals(self, position_id: int) -> List[Dict]:
+        """
+        Every deal of a position, oldest first, read from the store when it holds the whole
+        position (its exit deals cover its entry volume). A position that is still open, or closed
+        since the last sync, is read from the terminal instead and the result stored.
+        """
+        deals = self.deals_for_position(position_id)
+        if deals and _is_closed(deals):
+            return deals
+
+        fetched = mt5.history_deals_get(position=position_id)
+        if not fetched:
+            return deals
+        self.add_deals(fetched)
+        return sorted((deal._asdict() for deal in fetched), key=lambda deal: (deal['time_msc'], deal['ticket']))
+
+    def deals_for_order(self, order: int) -> List[Dict]:
+        return self._query('SELECT * FROM deals WHERE "order" = ? ORDER BY time_msc, ticket', (order,))
+
+    def deals_between(self, from_msc: int, to_msc: int) -> List[Dict]:
+        return self._query('SELECT * FROM deals WHERE time_msc BETWEEN ? AND ? ORDER BY time_msc, ticket',
+                           (from_msc, to_msc))
+
+    def order(self, ticket: int) -> Optional[Dict]:
+        """A historical order, read from the terminal (and stored) when it is not in the store yet."""
+        orders = self._query('SELECT * FROM orders WHERE ticket = ?', (ticket,))
+        if orders:
+            return orders[0]
+
+        fetched = mt5.history_orders_get(ticket=ticket)
+        if not fetched:
+            return None
+        self.add_orders(fetched)
+        return fetched[0]._asdict()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            db = self._connect()
+            return {
+                'deals': db.execute('SELECT COUNT(*) FROM deals').fetchone()[0],
+                'orders': db.execute('SELECT COUNT(*) FROM orders').fetchone()[0],
+                'deals_cursor_msc': self._get_state('deals'),
+                'orders_cursor_msc': self._get_state('orders'),
+                'last_sync': self.last_sync,
+            }
+
+
+history_store = HistoryStore()
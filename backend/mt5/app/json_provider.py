@@ -0,0 +1,86 @@
+import decimal
+from datetime import date, datetime, timezone
+
+import numpy as np
+import orjson
+import pandas as pd
+from flask.json.provider import JSONProvider
+
+# Naive datetimes (MT5 times, datetime64 bars) are UTC and are written as ISO 8601 with +00:00
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    """Types orjson does not encode natively."""
+    if hasattr(obj, '_asdict'):
+        # MT5 results (TradePosition, TradeDeal, OrderSendResult...) are named tuples
+        return obj._asdict()
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.names:
+            # Structured arrays (copy_rates_*, copy_ticks_*) are written as records
+            names = obj.dtype.names
+            return [dict(zip(names, row)) for row in zip(*(obj[name].tolist() for name in names))]
+        # Dtypes orjson has no native path for (object, float16, strings...)
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if obj is pd.NaT:
+        return None
+    if isinstance(obj, datetime):
+        # pandas Timestamps and other datetime subclasses
+        if obj.tzinfo is None:
+            obj = obj.replace(tzinfo=timezone.utc)
+        return obj.isoformat()
+    if isinstance(obj, date):
+        return obj.isoformat()
+    if isinstance(obj, pd.DataFrame):
+        # Column-wise tolist() is far cheaper than to_dict(orient='records')
+        columns = [str(column) for column in obj.columns]
+        return [dict(zip(columns, row)) for row in zip(*(obj.iloc[:, i].tolist() for i in range(obj.shape[1])))]
+    if isinstance(obj, pd.Series):
+        return obj.to_numpy()
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def datetime_view(records: np.ndarray, field: str = 'time') -> np.ndarray:
+    """
+    View of a copy_rates_* / copy_ticks_* array with the epoch-seconds ``field`` retyped as
+    datetime64[s], so it is written as an ISO timestamp. Nothing is copied.
+    """
+    dtype = records.dtype
+    fields = [dtype.fields[name] for name in dtype.names]
+    return records.view(np.dtype({
+        'names': list(dtype.names),
+        'formats': [np.dtype('<M8[s]') if name == field else format for name, (format, _) in zip(dtype.names, fields)],
+        'offsets': [offset for _, offset in fields],
+        'itemsize': dtype.itemsize,
+    }))
+
+
+def dumps_bytes(obj) -> bytes:
+    return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+
+    Besides the usual JSON types it encodes numpy arrays and scalars, structured arrays (as a
+    list of records), MT5 named tuples (as objects), DataFrames (as records) and datetimes
+    (as ISO 8601, naive ones taken as UTC), so routes can hand MT5 results to ``jsonify``
+    without converting them row by row first.
+    """
+
+    mimetype = 'application/json'
+
+    def dumps(self, obj, **kwargs) -> str:
+        return dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
@@ -1,8 +1,10 @@
-import MetaTrader5 as mt5
-from datetime import datetime, timedelta
+from executor import mt5
+from datetime import datetime, timezone
 from typing import List, Dict
 import pandas as pd
 from constants import MT5Timeframe
+from tick_board import tick_board
+from history_store import history_store
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,6 +18,100 @@ def get_timeframe(timeframe_str: str) -> MT5Timeframe:
             f"Invalid timeframe: '{timeframe_str}'. Valid options are: {valid_timeframes}."
         )
 
+ORDER_TYPES = {
+    'BUY': mt5.ORDER_TYPE_BUY,
+    'SELL': mt5.ORDER_TYPE_SELL
+}
+
+FILLING_TYPES = {
+    'ORDER_FILLING_FOK': mt5.ORDER_FILLING_FOK,
+    'ORDER_FILLING_IOC': mt5.ORDER_FILLING_IOC,
+    'ORDER_FILLING_RETURN': mt5.ORDER_FILLING_RETURN
+}
+
+def get_order_type(order_type) -> int:
+    """Resolve 'BUY'/'SELL' or an mt5.ORDER_TYPE_* value to the MT5 constant."""
+    if isinstance(order_type, str) and order_type.upper() in ORDER_TYPES:
+        return ORDER_TYPES[order_type.upper()]
+    if not isinstance(order_type, str) and order_type in ORDER_TYPES.values():
+        return order_type
+    raise ValueError(f"Invalid order type: '{order_type}'. Valid options are: {', '.join(ORDER_TYPES)}.")
+
+def get_type_filling(type_filling) -> int:
+    """Resolve an ORDER_FILLING_* name or value to the MT5 constant (IOC when not given)."""
+    if type_filling is None:
+        return mt5.ORDER_FILLING_IOC
+    if isinstance(type_filling, str) and type_filling.upper() in FILLING_TYPES:
+        return FILLING_TYPES[type_filling.upper()]
+    if not isinstance(type_filling, str) and type_filling in FILLING_TYPES.values():
+        return type_filling
+    raise ValueError(f"Invalid type_filling: '{type_filling}'. Valid options are: {', '.join(FILLING_TYPES)}.")
+
+def build_market_order(order: Dict, tick: Dict) -> Dict:
+    """
+    Build the mt5.order_send request for a market order.
+
+    :param order: The order as posted to /order (symbol, volume, type and optional
+                  deviation, magic, comment, type_filling, sl, tp).
+    :param tick: The tick to price the order from (ask for BUY, bid for SELL).
+    :raises ValueError: If the order is incomplete or invalid, or there is no tick.
+    """
+    missing = [field for field in ('symbol', 'volume', 'type') if field not in order]
+    if missing:
+        raise ValueError(f"Missing required fields: {', '.join(missing)}")
+
+    order_type = get_order_type(order['type'])
+    if tick is None:
+        raise ValueError("Failed to get symbol price")
+
+    request = {
+        "action": mt5.TRADE_ACTION_DEAL,
+        "symbol": order['symbol'],
+        "volume": float(order['volume']),
+        "type": order_type,
+        "price": tick['ask'] if order_type == mt5.ORDER_TYPE_BUY else tick['bid'],
+        "deviation": int(order.get('deviation', 20)),
+        "magic": int(order.get('magic', 0)),
+        "comment": order.get('comment', ''),
+        "type_time": mt5.ORDER_TIME_GTC,
+        "type_filling": get_type_filling(order.get('type_filling')),
+    }
+
+    # Add optional SL/TP if provided
+    if order.get('sl') is not None:
+        request["sl"] = float(order['sl'])
+    if order.get('tp') is not None:
+        request["tp"] = float(order['tp'])
+
+    return request
+
+
+def build_sltp_request(modification: Dict, position: Dict = None) -> Dict:
+    """
+    Build the mt5.order_send request that moves a position's SL/TP.
+
+    :param modification: {'position' (or 'ticket'), 'sl', 'tp'}; a missing or null sl/tp
+                         keeps the position's current level.
+    :param position: The open position (positions_get record as a dict), used for the
+                     symbol and the levels that are not being changed.
+    :raises ValueError: If the ticket is missing or the position is not open.
+    """
+    ticket = modification.get('position', modification.get('ticket'))
+    if ticket is None:
+        raise ValueError("Position ticket is required")
+    if position is None:
+        raise ValueError(f"Position {ticket} not found")
+
+    sl = modification.get('sl')
+    tp = modification.get('tp')
+    return {
+        "action": mt5.TRADE_ACTION_SLTP,
+        "position": int(ticket),
+        "symbol": position['symbol'],
+        "sl": float(sl) if sl is not None else position['sl'],
+        "tp": float(tp) if tp is not None else position['tp'],
+    }
+
 
 def close_position(position, deviation=20, magic=0, comment='', type_filling=mt5.ORDER_FILLING_IOC):
     if 'type' not in position or 'ticket' not in position:
@@ -32,14 +128,14 @@ def close_position(position, deviation=20, magic=0, comment='', type_filling=mt5
         logger.error(f"Unknown position type: {position_type}")
         return None
 
-    tick = mt5.symbol_info_tick(position['symbol'])
+    tick = tick_board.get(position['symbol'])
     if tick is None:
         logger.error(f"Failed to get tick for symbol: {position['symbol']}")
         return None
 
     price_dict = {
-        0: tick.ask,  # Buy order uses Ask price
-        1: tick.bid   # Sell order uses Bid price
+        0: tick['ask'],  # Buy order uses Ask price
+        1: tick['bid']   # Sell order uses Bid price
     }
 
     price = price_dict[position_type]
@@ -72,10 +168,7 @@ def close_position(position, deviation=20, magic=0, comment='', type_filling=mt5
 
 
 def close_all_positions(order_type='all', magic=None, type_filling=mt5.ORDER_FILLING_IOC):
-    order_type_dict = {
-        'BUY': mt5.ORDER_TYPE_BUY,
-        'SELL': mt5.ORDER_TYPE_SELL
-    }
+    order_type_dict = ORDER_TYPES
 
     if mt5.positions_total() > 0:
         positions = mt5.positions_get()
@@ -115,11 +208,6 @@ def close_all_positions(order_type='all', magic=None, type_filling=mt5.ORDER_FIL
         return []
 
 def get_positions(magic=None):
-    # First check if MT5 is initialized
-    if not mt5.initialize():
-        logger.error("Failed to initialize MT5.")
-        return pd.DataFrame()
-
     total_positions = mt5.positions_total()
     if total_positions is None:
         logger.error("Failed to get positions total.")
@@ -149,23 +237,21 @@ def get_deal_from_ticket(ticket, from_date=None, to_date=None):
         logger.error("Ticket must be an integer.")
         return None
 
-    # Define default date range if not provided
-    if from_date is None or to_date is None:
-        to_date = datetime.now(mt5.TIMEZONE)
-        from_date = to_date - timedelta(minutes=15)  # Adjust based on polling interval
+    # Every deal of the position, from the local history store
+    deals = history_store.position_deals(ticket)
 
-    # Convert datetime to MT5 time (integer)
-    from_timestamp = int(from_date.timestamp())
-    to_timestamp = int(to_date.timestamp())
+    # Optionally restrict to a date range
+    if from_date is not None and to_date is not None:
+        from_timestamp = int(from_date.timestamp())
+        to_timestamp = int(to_date.timestamp())
+        deals = [deal for deal in deals if from_timestamp <= deal['time'] <= to_timestamp]
 
-    # Retrieve deals using the specified date range and position
-    deals = mt5.history_deals_get(from_timestamp, to_timestamp, position=ticket)
     if not deals:
-        logger.error(f"No deal history found for position ticket {ticket} between {from_date} and {to_date}.")
+        logger.error(f"No deal history found for position ticket {ticket}.")
         return None
 
     # Convert deals to a DataFrame for easier processing
-    deals_df = pd.DataFrame([deal._asdict() for deal in deals])
+    deals_df = pd.DataFrame(deals)
 
     # Optional: Verify that all deals belong to the same symbol
     if not deals_df.empty and not all(deal == deals_df['symbol'].iloc[0] for deal in deals_df['symbol']):
@@ -177,10 +263,10 @@ def get_deal_from_ticket(ticket, from_date=None, to_date=None):
         deal_details = {
             'ticket': ticket,
             'symbol': deals_df['symbol'].iloc[0],
-            'type': 'BUY' if deals_df['type'].iloc[0] == 'DEAL_TYPE_BUY' else 'SELL',
+            'type': 'BUY' if deals_df['type'].iloc[0] == mt5.DEAL_TYPE_BUY else 'SELL',
             'volume': deals_df['volume'].sum(),
-            'open_time': datetime.fromtimestamp(deals_df['time'].min(), tz=mt5.TIMEZONE),
-            'close_time': datetime.fromtimestamp(deals_df['time'].max(), tz=mt5.TIMEZONE),
+            'open_time': datetime.fromtimestamp(deals_df['time'].min(), tz=timezone.utc),
+            'close_time': datetime.fromtimestamp(deals_df['time'].max(), tz=timezone.utc),
             'open_price': deals_df['price'].iloc[0],
             'close_price': deals_df['price'].iloc[-1],
             'profit': deals_df['profit'].sum(),
@@ -198,13 +284,10 @@ def get_order_from_ticket(ticket):
         logger.error("Ticket must be an integer.")
         return None
 
-    # Get the order history
-    order = mt5.history_orders_get(ticket=ticket)
-    if order is None or len(order) == 0:
+    # Get the order from the local history store
+    order_dict = history_store.order(ticket)
+    if order_dict is None:
         logger.error(f"No order history found for ticket {ticket}")
         return None
 
-    # Convert order to a dictionary
-    order_dict = order[0]._asdict()
-
     return order_dict
@@ -0,0 +1,80 @@
+import time
+
+from flask import Response, g, request
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# Terminal IPC answers in well under a millisecond for cached reads, while order_send waits
+# for the broker (tens of ms to seconds), so the buckets are dense between 0.5 ms and 1 s.
+MT5_CALL_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.35, 0.5, 1.0, 2.5, 5.0, 10.0)
+HTTP_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.35, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Calls whose result carries a trade server retcode
+TRADE_FUNCTIONS = ('order_send', 'order_check')
+
+http_request_duration = Histogram(
+    'mt5_bridge_http_request_duration_seconds', 'Time spent in a bridge route until the response is returned',
+    ['method', 'route', 'status'], buckets=HTTP_BUCKETS)
+mt5_call_duration = Histogram(
+    'mt5_call_duration_seconds', 'Run time of MetaTrader5 API calls on the executor thread',
+    ['function'], buckets=MT5_CALL_BUCKETS)
+mt5_call_queue_wait = Histogram(
+    'mt5_call_queue_wait_seconds', 'Time MetaTrader5 API calls waited for the executor thread',
+    ['priority'], buckets=MT5_CALL_BUCKETS)
+mt5_call_failures = Counter(
+    'mt5_call_failures_total', 'MetaTrader5 API calls that returned None or raised', ['function'])
+mt5_call_timeouts = Counter(
+    'mt5_call_timeouts_total', 'MetaTrader5 API calls whose caller stopped waiting after the call timeout',
+    ['function', 'priority'])
+trade_retcodes = Counter(
+    'mt5_trade_retcodes_total', 'Trade server return codes of order_send / order_check',
+    ['function', 'retcode', 'description'])
+terminal_connected = Gauge('mt5_terminal_connected', '1 while the terminal is connected to the trade server')
+terminal_initialized = Gauge('mt5_terminal_initialized', '1 while the MetaTrader5 package is initialized')
+terminal_reconnect_attempts = Gauge('mt5_terminal_reconnect_attempts', 'Reconnection attempts since the last successful connection')
+terminal_state_seconds = Gauge('mt5_terminal_state_seconds', 'Seconds since the connection state last changed')
+executor_queue_depth = Gauge('mt5_executor_queue_depth', 'MetaTrader5 calls waiting for the executor thread', ['priority'])
+executor_running_seconds = Gauge('mt5_executor_running_call_seconds',
+                                 'How long the call on the executor thread has been running (0 while idle)')
+
+_retcode_descriptions = None
+
+
+def _describe_retcode(retcode: int) -> str:
+    global _retcode_descriptions
+    if _retcode_descriptions is None:
+        # constants imports the executor, which imports this module: resolve on first use
+        from constants import TRADE_RETCODE_DESCRIPTION
+        _retcode_descriptions = TRADE_RETCODE_DESCRIPTION
+    return _retcode_descriptions.get(retcode, 'Unknown')
+
+
+def observe_mt5_call(function: str, priority: str, wait: float, run: float, result, failed: bool = False):
+    """Record one executor call; called from the executor thread."""
+    mt5_call_duration.labels(function).observe(run)
+    mt5_call_queue_wait.labels(priority).observe(wait)
+    if failed or result is None:
+        mt5_call_failures.labels(function).inc()
+    elif function in TRADE_FUNCTIONS and hasattr(result, 'retcode'):
+        trade_retcodes.labels(function, str(result.retcode), _describe_retcode(result.retcode)).inc()
+
+
+def observe_mt5_timeout(function: str, priority: str):
+    """Record a call its caller gave up on; called from the caller's thread."""
+    mt5_call_timeouts.labels(function, priority).inc()
+
+
+def start_timer():
+    """``before_request`` hook."""
+    g.metrics_start = time.perf_counter()
+
+
+def observe_request(response: Response) -> Response:
+    """``after_request`` hook: routes are labelled by their URL rule to keep cardinality bounded."""
+    start = g.pop('metrics_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        http_request_duration.labels(request.method, route, str(response.status_code)).observe(time.perf_counter() - start)
+    return response
+
+
+def metrics_response() -> Response:
+    return Response(generate_latest(), content_type=CONTENT_TYPE_LATEST)
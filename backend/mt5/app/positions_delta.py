@@ -0,0 +1,100 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+from executor import mt5
+
+logger = logging.getLogger(__name__)
+
+# Ticket sets remembered for resolving client cursors; a client whose set was evicted gets a full snapshot
+TICKET_SETS_MAX = 256
+# Fields that move with every tick without touching time_update_msc
+MARK_FIELDS = ('price_current', 'profit', 'swap')
+
+
+def ticket_set_hash(tickets) -> str:
+    return hashlib.blake2b(np.sort(np.fromiter(tickets, dtype=np.int64)).tobytes(), digest_size=8).hexdigest()
+
+
+class PositionsDelta:
+    """
+    Computes open-position deltas against a client cursor.
+
+    A cursor is ``"<max time_update_msc>:<ticket set hash>"``. Tickets missing from the
+    current set are reported as removed, new ones as added, and surviving ones whose
+    ``time_update_msc`` is not older than the cursor as changed. Price, profit and swap move on
+    every tick without bumping ``time_update_msc``, so they are always sent for every ticket
+    as compact "marks" arrays.
+    """
+
+    def __init__(self, max_sets: int = TICKET_SETS_MAX):
+        self.max_sets = max_sets
+        self._ticket_sets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, tickets: frozenset) -> str:
+        digest = ticket_set_hash(tickets)
+        with self._lock:
+            self._ticket_sets[digest] = tickets
+            self._ticket_sets.move_to_end(digest)
+            while len(self._ticket_sets) > self.max_sets:
+                self._ticket_sets.popitem(last=False)
+        return digest
+
+    def _lookup(self, digest: str) -> Optional[frozenset]:
+        with self._lock:
+            tickets = self._ticket_sets.get(digest)
+            if tickets is not None:
+                self._ticket_sets.move_to_end(digest)
+            return tickets
+
+    def delta(self, cursor: str = '', magic: int = None) -> Optional[Dict]:
+        """
+        :param cursor: The cursor returned by the previous call ('' for a first call).
+        :param magic: Only consider positions with this magic number.
+        :return: The delta response, or None if positions could not be retrieved.
+        """
+        positions = mt5.positions_get()
+        if positions is None:
+            logger.error("Failed to retrieve positions.")
+            return None
+
+        current = {position.ticket: position._asdict() for position in positions
+                   if magic is None or position.magic == magic}
+        tickets = frozenset(current)
+        max_update_msc = max((position['time_update_msc'] for position in current.values()), default=0)
+
+        since_msc, _, digest = (cursor or '').partition(':')
+        previous = self._lookup(digest) if digest and since_msc.isdigit() else None
+
+        if previous is None:
+            added = list(current.values())
+            changed = []
+            removed = []
+        else:
+            since_msc = int(since_msc)
+            added = [current[ticket] for ticket in tickets - previous]
+            # >= because another update may land in the same millisecond as the cursor
+            changed = [current[ticket] for ticket in tickets & previous
+                       if current[ticket]['time_update_msc'] >= since_msc]
+            removed = sorted(previous - tickets)
+
+        marks = {"ticket": sorted(current)}
+        for field in MARK_FIELDS:
+            marks[field] = [current[ticket][field] for ticket in marks["ticket"]]
+
+        return {
+            "cursor": f"{max_update_msc}:{self._remember(tickets)}",
+            "full": previous is None,
+            "added": added,
+            "changed": changed,
+            "removed": removed,
+            "marks": marks,
+        }
+
+
+positions_delta = PositionsDelta()
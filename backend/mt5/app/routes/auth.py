@@ -4,7 +4,8 @@ import jwt
 from datetime import datetime, timedelta
 from flask import Blueprint, request, jsonify, current_app
 from flasgger import swag_from
-import MetaTrader5 as mt5
+from executor import mt5, MT5CallTimeout
+from connection import connection
 from functools import wraps
 import logging
 
@@ -119,6 +120,9 @@ def login():
             error_code = mt5.last_error()
             logger.error(f"Error de login MT5: {error_code}")
             return jsonify({'error': 'Credenciales inválidas o error de conexión'}), 401
+
+        # Refrescar el estado de conexión para no esperar al siguiente ciclo del monitor
+        connection.check()
         
         # Obtener info de la cuenta
         account_info = mt5.account_info()
@@ -152,6 +156,8 @@ def login():
             'account_info': account_info._asdict()
         })
         
+    except MT5CallTimeout:
+        raise
     except Exception as e:
         logger.error(f"Error en login: {str(e)}")
         return jsonify({'error': 'Error interno del servidor'}), 500
@@ -182,10 +188,12 @@ def logout():
             del SESSIONS[session_id]
         
         # Desconectar de MT5
-        mt5.shutdown()
+        connection.shutdown()
         
         return jsonify({'message': 'Logout exitoso'})
         
+    except MT5CallTimeout:
+        raise
     except Exception as e:
         logger.error(f"Error en logout: {str(e)}")
         return jsonify({'error': 'Error interno del servidor'}), 500
@@ -233,6 +241,8 @@ def session_info():
             'account_info': session['account_info']
         })
         
+    except MT5CallTimeout:
+        raise
     except Exception as e:
         logger.error(f"Error obteniendo sesión: {str(e)}")
         return jsonify({'error': 'Error interno del servidor'}), 500
\ No newline at end of file
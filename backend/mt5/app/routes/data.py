@@ -1,16 +1,29 @@
 from flask import Blueprint, jsonify, request
-import MetaTrader5 as mt5
+from executor import mt5, MT5CallTimeout
 import logging
 from datetime import datetime
 import pytz
-import pandas as pd
+import numpy as np
 from flasgger import swag_from
 from lib import get_timeframe
+from bar_cache import bar_cache
+from columnar import COLUMNAR_MIMETYPE, COLUMNAR_STREAM_MIMETYPE, wants_columnar, columnar_response
+from json_provider import datetime_view
+from etag import content_etag, conditional_response
+from constants import TIMEFRAME_SECONDS
+from streaming import NDJSON_MIMETYPE, STREAM_PAGE_BARS, wants_stream, ndjson_pages, columnar_pages, stream_response
+from singleflight import singleflight
 from routes.auth import require_auth  # ✅ Importar middleware
 
 data_bp = Blueprint('data', __name__)
 logger = logging.getLogger(__name__)
 
+@data_bp.after_request
+def vary_on_accept(response):
+    # Rate endpoints negotiate JSON vs. columnar on the Accept header
+    response.vary.add('Accept')
+    return response
+
 @data_bp.route('/fetch_data_pos', methods=['GET'])
 @require_auth  # ✅ Añadir protección
 @swag_from({
@@ -39,11 +52,19 @@ logger = logging.getLogger(__name__)
             'required': False,
             'default': 100,
             'description': 'Number of bars to fetch.'
+        },
+        {
+            'name': 'If-None-Match',
+            'in': 'header',
+            'type': 'string',
+            'required': False,
+            'description': 'ETag of a previous response; answered with 304 if no bar changed (including the forming one).'
         }
     ],
+    'produces': ['application/json', COLUMNAR_MIMETYPE],
     'responses': {
         200: {
-            'description': 'Data fetched successfully.',
+            'description': 'Data fetched successfully (JSON records, or a columnar frame when requested via Accept).',
             'schema': {
                 'type': 'array',
                 'items': {
@@ -61,6 +82,9 @@ logger = logging.getLogger(__name__)
                 }
             }
         },
+        304: {
+            'description': 'Bars unchanged since the ETag given in If-None-Match.'
+        },
         400: {
             'description': 'Invalid request parameters.'
         },
@@ -72,6 +96,7 @@ logger = logging.getLogger(__name__)
         }
     }
 })
+@singleflight
 def fetch_data_pos_endpoint():
     """
     Fetch Data from Position
@@ -88,21 +113,134 @@ def fetch_data_pos_endpoint():
 
         mt5_timeframe = get_timeframe(timeframe)
         
-        rates = mt5.copy_rates_from_pos(symbol, mt5_timeframe, 0, num_bars)
+        rates = bar_cache.copy_rates_from_pos(symbol, mt5_timeframe, num_bars)
         if rates is None:
             return jsonify({"error": "Failed to get rates data"}), 404
-        
-        df = pd.DataFrame(rates)
-        df['time'] = pd.to_datetime(df['time'], unit='s')
-        
-        return jsonify(df.to_dict(orient='records'))
+
+        if wants_columnar():
+            etag = content_etag(COLUMNAR_MIMETYPE, rates)
+            return conditional_response(etag, lambda: columnar_response(rates, {'symbol': symbol, 'timeframe': timeframe.upper()}))
+
+        return conditional_response(content_etag('application/json', rates), lambda: jsonify(datetime_view(rates)))
     
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
+    except MT5CallTimeout:
+        raise
     except Exception as e:
         logger.error(f"Error in fetch_data_pos: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
 
+@data_bp.route('/fetch_data_pos/batch', methods=['GET'])
+@require_auth
+@swag_from({
+    'tags': ['Data'],
+    'security': [{'ApiKeyAuth': []}],
+    'parameters': [
+        {
+            'name': 'symbols',
+            'in': 'query',
+            'type': 'string',
+            'required': True,
+            'description': 'Comma-separated symbol names (e.g., EURUSD,USDJPY,XAUUSD).'
+        },
+        {
+            'name': 'timeframe',
+            'in': 'query',
+            'type': 'string',
+            'required': False,
+            'default': 'M1',
+            'description': 'Timeframe for the data (e.g., M1, M5, H1).'
+        },
+        {
+            'name': 'num_bars',
+            'in': 'query',
+            'type': 'integer',
+            'required': False,
+            'default': 100,
+            'description': 'Number of bars to fetch per symbol.'
+        }
+    ],
+    'produces': ['application/json', COLUMNAR_MIMETYPE],
+    'responses': {
+        200: {
+            'description': 'Data fetched for at least one symbol. The columnar format concatenates all series; meta.symbols and meta.counts delimit them.',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'data': {
+                        'type': 'object',
+                        'additionalProperties': {'type': 'array', 'items': {'type': 'object'}}
+                    },
+                    'errors': {
+                        'type': 'object',
+                        'additionalProperties': {'type': 'string'}
+                    }
+                }
+            }
+        },
+        400: {
+            'description': 'Invalid request parameters.'
+        },
+        404: {
+            'description': 'Failed to get rates data for every symbol.'
+        },
+        500: {
+            'description': 'Internal server error.'
+        }
+    }
+})
+@singleflight
+def fetch_data_pos_batch_endpoint():
+    """
+    Fetch Data from Position for Multiple Symbols
+    ---
+    description: Retrieve the latest bars for several symbols on one timeframe in a single round trip.
+    """
+    try:
+        symbols = [s.strip() for s in request.args.get('symbols', '').split(',') if s.strip()]
+        timeframe = request.args.get('timeframe', 'M1')
+        num_bars = int(request.args.get('num_bars', 100))
+
+        if not symbols:
+            return jsonify({"error": "Symbols parameter is required"}), 400
+
+        mt5_timeframe = get_timeframe(timeframe)
+
+        rates_by_symbol = {}
+        errors = {}
+        for symbol in dict.fromkeys(symbols):
+            rates = bar_cache.copy_rates_from_pos(symbol, mt5_timeframe, num_bars)
+            if rates is None:
+                errors[symbol] = "Failed to get rates data"
+            else:
+                rates_by_symbol[symbol] = rates
+
+        if not rates_by_symbol:
+            return jsonify({"error": "Failed to get rates data", "errors": errors}), 404
+
+        if wants_columnar():
+            return columnar_response(np.concatenate(list(rates_by_symbol.values())), {
+                'timeframe': timeframe.upper(),
+                'symbols': list(rates_by_symbol),
+                'counts': [len(rates) for rates in rates_by_symbol.values()],
+                'errors': errors,
+            })
+
+        data = {}
+        for symbol, rates in rates_by_symbol.items():
+            data[symbol] = datetime_view(rates)
+
+        return jsonify({"data": data, "errors": errors})
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except MT5CallTimeout:
+        raise
+    except Exception as e:
+        logger.error(f"Error in fetch_data_pos_batch: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
 @data_bp.route('/fetch_data_range', methods=['GET'])
 @require_auth  # ✅ Añadir protección
 @swag_from({
@@ -141,9 +279,14 @@ def fetch_data_pos_endpoint():
             'description': 'End datetime in ISO format.'
         }
     ],
+    'produces': ['application/json', COLUMNAR_MIMETYPE, NDJSON_MIMETYPE, COLUMNAR_STREAM_MIMETYPE],
     'responses': {
         200: {
-            'description': 'Data fetched successfully.',
+            'description': 'Data fetched successfully (JSON records, or a columnar frame when requested via Accept). '
+                           'With Accept: application/x-ndjson or application/vnd.mt5.columnar-stream the range is '
+                           'streamed in pages of STREAM_PAGE_BARS nominal bars, as one {"from", "to", "cursor", "rates"} '
+                           'line or one length-prefixed frame per page; cursor is where the next page starts (null on '
+                           'the last page) and a failed page ends the stream with an error and the cursor to resume from.',
             'schema': {
                 'type': 'array',
                 'items': {
@@ -172,6 +315,7 @@ def fetch_data_pos_endpoint():
         }
     }
 })
+@singleflight
 def fetch_data_range_endpoint():
     """
     Fetch Data within a Date Range
@@ -193,18 +337,39 @@ def fetch_data_range_endpoint():
         utc = pytz.UTC
         start_date = utc.localize(datetime.fromisoformat(start_str.replace('Z', '+00:00')))
         end_date = utc.localize(datetime.fromisoformat(end_str.replace('Z', '+00:00')))
-        
+
+        stream = wants_stream()
+        if stream:
+            step = STREAM_PAGE_BARS * TIMEFRAME_SECONDS[timeframe.upper()]
+            start, end = int(start_date.timestamp()), int(end_date.timestamp())
+
+            def fetch(window_from, window_to):
+                return mt5.copy_rates_range(symbol, mt5_timeframe, datetime.fromtimestamp(window_from, utc),
+                                            datetime.fromtimestamp(window_to, utc))
+
+            if stream == COLUMNAR_STREAM_MIMETYPE:
+                pages = columnar_pages(fetch, start, end, step, {'symbol': symbol, 'timeframe': timeframe.upper()})
+            else:
+                def fetch_records(window_from, window_to):
+                    rates = fetch(window_from, window_to)
+                    return datetime_view(rates) if rates is not None else None
+                pages = ndjson_pages(fetch_records, start, end, step, 'rates')
+            return stream_response(pages, stream)
+
         rates = mt5.copy_rates_range(symbol, mt5_timeframe, start_date, end_date)
         if rates is None:
             return jsonify({"error": "Failed to get rates data"}), 404
-        
-        df = pd.DataFrame(rates)
-        df['time'] = pd.to_datetime(df['time'], unit='s')
-        
-        return jsonify(df.to_dict(orient='records'))
+
+        if wants_columnar():
+            etag = content_etag(COLUMNAR_MIMETYPE, rates)
+            return conditional_response(etag, lambda: columnar_response(rates, {'symbol': symbol, 'timeframe': timeframe.upper()}))
+
+        return conditional_response(content_etag('application/json', rates), lambda: jsonify(datetime_view(rates)))
     
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
+    except MT5CallTimeout:
+        raise
     except Exception as e:
         logger.error(f"Error in fetch_data_range: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
\ No newline at end of file
@@ -1,6 +1,6 @@
 from flask import Blueprint, jsonify
 import logging
-import MetaTrader5 as mt5
+from executor import mt5, MT5CallTimeout
 from flasgger import swag_from
 
 error_bp = Blueprint('error', __name__)
@@ -34,6 +34,8 @@ def last_error_endpoint():
     try:
         error = mt5.last_error()
         return jsonify({"error_code": error[0], "error_message": error[1]})
+    except MT5CallTimeout:
+        raise
     except Exception as e:
         logger.error(f"Error in last_error: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
@@ -65,6 +67,8 @@ def last_error_str_endpoint():
     try:
         error_code, error_str = mt5.last_error()
         return jsonify({"error_message": error_str})
+    except MT5CallTimeout:
+        raise
     except Exception as e:
         logger.error(f"Error in last_error_str: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
\ No newline at end of file
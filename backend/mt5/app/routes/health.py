@@ -1,6 +1,14 @@
+from datetime import datetime, timezone
 from flask import Blueprint, jsonify
-import MetaTrader5 as mt5
+from executor import executor
+from connection import connection
+from bar_cache import bar_cache
+from history_store import history_store
+from singleflight import single_flight
+import metrics
+from metrics import metrics_response
 from flasgger import swag_from
+from routes.auth import require_auth
 
 health_bp = Blueprint('health', __name__)
 
@@ -15,9 +23,13 @@ health_bp = Blueprint('health', __name__)
                 'properties': {
                     'status': {'type': 'string'},
                     'mt5_connected': {'type': 'boolean'},
-                    'mt5_initialized': {'type': 'boolean'}
+                    'mt5_initialized': {'type': 'boolean'},
+                    'connection': {'type': 'object'}
                 }
             }
+        },
+        503: {
+            'description': 'The MT5 terminal is disconnected; the bridge is reconnecting in the background.'
         }
     }
 })
@@ -30,9 +42,85 @@ def health_check():
       200:
         description: Health check successful
     """
-    initialized = mt5.initialize() if mt5 is not None else False
+    # Cached state kept fresh by the connection manager; probes never touch the terminal
+    state = connection.state()
     return jsonify({
-        "status": "healthy",
-        "mt5_connected": mt5 is not None,
-        "mt5_initialized": initialized
-    }), 200
\ No newline at end of file
+        "status": "healthy" if state['connected'] else "unhealthy",
+        "mt5_connected": state['connected'],
+        "mt5_initialized": state['initialized'],
+        "connection": state
+    }), 200 if state['connected'] else 503
+
+@health_bp.route('/stats')
+@require_auth
+@swag_from({
+    'tags': ['Health'],
+    'security': [{'ApiKeyAuth': []}],
+    'responses': {
+        200: {
+            'description': 'Bridge internals: MT5 call queue depth, timeouts and wait times per priority class, the running call, bar cache usage, history store size and sync cursors, coalesced read requests.',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'executor': {
+                        'type': 'object',
+                        'properties': {
+                            'queue_depth': {'type': 'integer'},
+                            'running': {'type': 'object', 'description': 'Call on the executor thread (function, priority, running_ms), or null.'},
+                            'priorities': {'type': 'object'}
+                        }
+                    },
+                    'bar_cache': {'type': 'object'},
+                    'history': {'type': 'object'},
+                    'singleflight': {'type': 'object'}
+                }
+            }
+        },
+        401: {
+            'description': 'Missing or invalid token.'
+        }
+    }
+})
+def stats():
+    """
+    Bridge Statistics
+    ---
+    description: Report MT5 executor queue, cache and history store statistics.
+    """
+    return jsonify({
+        "executor": executor.stats(),
+        "bar_cache": bar_cache.stats(),
+        "history": history_store.stats(),
+        "singleflight": single_flight.stats()
+    }), 200
+
+
+@health_bp.route('/metrics')
+@swag_from({
+    'tags': ['Health'],
+    'produces': ['text/plain'],
+    'responses': {
+        200: {
+            'description': 'Prometheus metrics: route and MT5 call latency histograms, trade retcode counters, '
+                           'terminal connection and executor queue gauges.'
+        }
+    }
+})
+def prometheus_metrics():
+    """
+    Prometheus Metrics
+    ---
+    description: Expose bridge metrics in the Prometheus text format.
+    """
+    # State gauges are read at scrape time rather than updated on every change
+    metrics.terminal_connected.set(connection.connected)
+    metrics.terminal_initialized.set(connection.initialized)
+    metrics.terminal_reconnect_attempts.set(connection.reconnect_attempts)
+    if connection.since is not None:
+        metrics.terminal_state_seconds.set((datetime.now(timezone.utc) - connection.since).total_seconds())
+    executor_stats = executor.stats()
+    for priority, stats in executor_stats['priorities'].items():
+        metrics.executor_queue_depth.labels(priority).set(stats['pending'])
+    running = executor_stats['running']
+    metrics.executor_running_seconds.set(running['running_ms'] / 1000 if running else 0)
+    return metrics_response()
@@ -1,9 +1,12 @@
 from flask import Blueprint, jsonify, request
-import MetaTrader5 as mt5
+from executor import mt5, MT5CallTimeout
 import logging
 from datetime import datetime
 from flasgger import swag_from
 from lib import get_deal_from_ticket, get_order_from_ticket
+from etag import content_etag, conditional_response
+from streaming import NDJSON_MIMETYPE, STREAM_PAGE_SECONDS, wants_stream, ndjson_pages, stream_response
+from singleflight import singleflight
 from routes.auth import require_auth  # ✅ Importar middleware
 
 history_bp = Blueprint('history', __name__)
@@ -55,11 +58,12 @@ logger = logging.getLogger(__name__)
         }
     }
 })
+@singleflight
 def get_deal_from_ticket_endpoint():
     """
     Get Deal Information from Ticket
     ---
-    description: Retrieve deal information associated with a specific ticket number.
+    description: Summarize every deal of a position (by position ticket), read from the local history store.
     """
     try:
         ticket = request.args.get('ticket')
@@ -75,6 +79,8 @@ def get_deal_from_ticket_endpoint():
     
     except ValueError:
         return jsonify({"error": "Invalid ticket format"}), 400
+    except MT5CallTimeout:
+        raise
     except Exception as e:
         logger.error(f"Error in get_deal_from_ticket: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
@@ -115,11 +121,12 @@ def get_deal_from_ticket_endpoint():
         }
     }
 })
+@singleflight
 def get_order_from_ticket_endpoint():
     """
     Get Order Information from Ticket
     ---
-    description: Retrieve order information associated with a specific ticket number.
+    description: Retrieve a historical order by ticket, read from the local history store.
     """
     try:
         ticket = request.args.get('ticket')
@@ -135,6 +142,8 @@ def get_order_from_ticket_endpoint():
     
     except ValueError:
         return jsonify({"error": "Invalid ticket format"}), 400
+    except MT5CallTimeout:
+        raise
     except Exception as e:
         logger.error(f"Error in get_order_from_ticket: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
@@ -166,12 +175,23 @@ def get_order_from_ticket_endpoint():
             'in': 'query',
             'type': 'integer',
             'required': True,
-            'description': 'Position number to filter deals.'
+            'description': 'Position number to filter deals. Optional when streaming.'
+        },
+        {
+            'name': 'If-None-Match',
+            'in': 'header',
+            'type': 'string',
+            'required': False,
+            'description': 'ETag of a previous response; answered with 304 if the deals are unchanged.'
         }
     ],
+    'produces': ['application/json', NDJSON_MIMETYPE],
     'responses': {
         200: {
-            'description': 'Deals history retrieved successfully.',
+            'description': 'Deals history retrieved successfully. With Accept: application/x-ndjson the range is '
+                           'streamed one page per line, {"from", "to", "cursor", "deals": [...]}, paginated by time; '
+                           'cursor is where the next page starts (null on the last page) and a failed page ends the '
+                           'stream with {"error", "cursor"}.',
             'schema': {
                 'type': 'array',
                 'items': {
@@ -180,6 +200,9 @@ def get_order_from_ticket_endpoint():
                 }
             }
         },
+        304: {
+            'description': 'Deals unchanged since the ETag given in If-None-Match.'
+        },
         400: {
             'description': 'Invalid parameter format or missing parameters.'
         },
@@ -191,6 +214,7 @@ def get_order_from_ticket_endpoint():
         }
     }
 })
+@singleflight
 def history_deals_get_endpoint():
     """
     Get Deals History
@@ -201,26 +225,34 @@ def history_deals_get_endpoint():
         from_date = request.args.get('from_date')
         to_date = request.args.get('to_date')
         position = request.args.get('position')
-        
-        if not all([from_date, to_date, position]):
+        stream = wants_stream(NDJSON_MIMETYPE)
+
+        if not all([from_date, to_date]) or (position is None and not stream):
             return jsonify({"error": "from_date, to_date, and position parameters are required"}), 400
         
         from_date = datetime.fromisoformat(from_date.replace('Z', '+00:00'))
         to_date = datetime.fromisoformat(to_date.replace('Z', '+00:00'))
-        position = int(position)
+        filters = {'position': int(position)} if position is not None else {}
 
         from_timestamp = int(from_date.timestamp())
         to_timestamp = int(to_date.timestamp())
-        deals = mt5.history_deals_get(from_timestamp, to_timestamp, position=position)
+
+        if stream:
+            def fetch(window_from, window_to):
+                return mt5.history_deals_get(window_from, window_to, **filters)
+            return stream_response(ndjson_pages(fetch, from_timestamp, to_timestamp, STREAM_PAGE_SECONDS, 'deals'), stream)
+
+        deals = mt5.history_deals_get(from_timestamp, to_timestamp, **filters)
         
         if deals is None:
             return jsonify({"error": "Failed to get deals history"}), 404
         
-        deals_list = [deal._asdict() for deal in deals]
-        return jsonify(deals_list)
+        return conditional_response(content_etag('application/json', deals), lambda: jsonify(deals))
     
     except ValueError:
         return jsonify({"error": "Invalid parameter format"}), 400
+    except MT5CallTimeout:
+        raise
     except Exception as e:
         logger.error(f"Error in history_deals_get: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
@@ -237,6 +269,13 @@ def history_deals_get_endpoint():
             'type': 'integer',
             'required': True,
             'description': 'Ticket number to retrieve orders history.'
+        },
+        {
+            'name': 'If-None-Match',
+            'in': 'header',
+            'type': 'string',
+            'required': False,
+            'description': 'ETag of a previous response; answered with 304 if the orders are unchanged.'
         }
     ],
     'responses': {
@@ -250,6 +289,9 @@ def history_deals_get_endpoint():
                 }
             }
         },
+        304: {
+            'description': 'Orders unchanged since the ETag given in If-None-Match.'
+        },
         400: {
             'description': 'Invalid ticket format or missing parameter.'
         },
@@ -261,6 +303,7 @@ def history_deals_get_endpoint():
         }
     }
 })
+@singleflight
 def history_orders_get_endpoint():
     """
     Get Orders History
@@ -277,11 +320,12 @@ def history_orders_get_endpoint():
         if orders is None:
             return jsonify({"error": "Failed to get orders history"}), 404
         
-        orders_list = [order._asdict() for order in orders]
-        return jsonify(orders_list)
+        return conditional_response(content_etag('application/json', orders), lambda: jsonify(orders))
     
     except ValueError:
         return jsonify({"error": "Invalid ticket format"}), 400
+    except MT5CallTimeout:
+        raise
     except Exception as e:
         logger.error(f"Error in history_orders_get: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
\ No newline at end of file
@@ -1,8 +1,11 @@
 from flask import Blueprint, jsonify, request
-import MetaTrader5 as mt5
+from executor import mt5, trade_priority, MT5CallTimeout
 import logging
+from time import perf_counter
 from flasgger import swag_from
+from lib import build_market_order
 from routes.auth import require_auth  # ✅ Importar middleware
+from tick_board import tick_board
 
 order_bp = Blueprint('order', __name__)
 logger = logging.getLogger(__name__)
@@ -63,6 +66,7 @@ logger = logging.getLogger(__name__)
         }
     }
 })
+@trade_priority
 def send_market_order_endpoint():
     """
     Send Market Order
@@ -78,43 +82,20 @@ def send_market_order_endpoint():
         if not all(field in data for field in required_fields):
             return jsonify({"error": "Missing required fields"}), 400
 
-        # Prepare the order request
-        request_data = {
-            "action": mt5.TRADE_ACTION_DEAL,
-            "symbol": data['symbol'],
-            "volume": float(data['volume']),
-            "type": data['type'],
-            "deviation": data.get('deviation', 20),
-            "magic": data.get('magic', 0),
-            "comment": data.get('comment', ''),
-            "type_time": mt5.ORDER_TIME_GTC,
-            "type_filling": data.get('type_filling', mt5.ORDER_FILLING_IOC),
-        }
-
-        # Get current price
-        tick = mt5.symbol_info_tick(data['symbol'])
-        if tick is None:
-            return jsonify({"error": "Failed to get symbol price"}), 400
-
-        # Set price based on order type
-        if data['type'] == mt5.ORDER_TYPE_BUY:
-            request_data["price"] = tick.ask
-        elif data['type'] == mt5.ORDER_TYPE_SELL:
-            request_data["price"] = tick.bid
-        else:
-            return jsonify({"error": "Invalid order type"}), 400
-
-        # Add optional SL/TP if provided
-        if 'sl' in data:
-            request_data["sl"] = data['sl']
-        if 'tp' in data:
-            request_data["tp"] = data['tp']
+        # Prepare the order request at the current price
+        try:
+            request_data = build_market_order(data, tick_board.get(data['symbol']))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         # Send order
-        result = mt5.order_send(request_data)
+        result, (error_code, error_str) = mt5.call_with_error('order_send', request_data)
+        if result is None:
+            return jsonify({
+                "error": f"Order failed: {error_str}",
+                "mt5_error": error_str
+            }), 400
         if result.retcode != mt5.TRADE_RETCODE_DONE:
-            error_code, error_str = mt5.last_error()
-            
             return jsonify({
                 "error": f"Order failed: {result.comment}",
                 "mt5_error": error_str,
@@ -126,6 +107,155 @@ def send_market_order_endpoint():
             "result": result._asdict()
         })
     
+    except MT5CallTimeout:
+        raise
     except Exception as e:
         logger.error(f"Error in send_market_order: {str(e)}")
-        return jsonify({"error": "Internal server error"}), 500
\ No newline at end of file
+        return jsonify({"error": "Internal server error"}), 500
+
+@order_bp.route('/orders/batch', methods=['POST'])
+@require_auth
+@swag_from({
+    'tags': ['Order'],
+    'security': [{'ApiKeyAuth': []}],
+    'parameters': [
+        {
+            'name': 'body',
+            'in': 'body',
+            'required': True,
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'orders': {
+                        'type': 'array',
+                        'description': 'Market orders, each with the same fields as /order.',
+                        'items': {
+                            'type': 'object',
+                            'properties': {
+                                'symbol': {'type': 'string'},
+                                'volume': {'type': 'number'},
+                                'type': {'type': 'string', 'enum': ['BUY', 'SELL']},
+                                'deviation': {'type': 'integer', 'default': 20},
+                                'magic': {'type': 'integer', 'default': 0},
+                                'comment': {'type': 'string', 'default': ''},
+                                'type_filling': {'type': 'string', 'enum': ['ORDER_FILLING_IOC', 'ORDER_FILLING_FOK', 'ORDER_FILLING_RETURN']},
+                                'sl': {'type': 'number'},
+                                'tp': {'type': 'number'}
+                            },
+                            'required': ['symbol', 'volume', 'type']
+                        }
+                    }
+                },
+                'required': ['orders']
+            }
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Every order was attempted; results are in request order.',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'results': {
+                        'type': 'array',
+                        'items': {
+                            'type': 'object',
+                            'properties': {
+                                'index': {'type': 'integer'},
+                                'symbol': {'type': 'string'},
+                                'success': {'type': 'boolean'},
+                                'error': {'type': 'string'},
+                                'result': {'type': 'object'},
+                                'price': {'type': 'number', 'description': 'Requested price, from the batch tick snapshot.'},
+                                'sent_after_ms': {'type': 'number', 'description': 'Time from the start of the batch until the order was sent.'},
+                                'latency_ms': {'type': 'number', 'description': 'Time spent in order_send.'}
+                            }
+                        }
+                    },
+                    'succeeded': {'type': 'integer'},
+                    'failed': {'type': 'integer'},
+                    'elapsed_ms': {'type': 'number'}
+                }
+            }
+        },
+        400: {
+            'description': 'No orders given.'
+        },
+        500: {
+            'description': 'Internal server error.'
+        },
+        504: {
+            'description': 'An order timed out in the terminal: results so far, the remaining orders were not sent.'
+        }
+    }
+})
+@trade_priority
+def send_market_orders_batch_endpoint():
+    """
+    Send Market Orders in Batch
+    ---
+    description: Execute several market orders back-to-back, pricing each from one tick snapshot per symbol.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        orders = data.get('orders')
+        if not isinstance(orders, list) or not orders:
+            return jsonify({"error": "A non-empty list of orders is required"}), 400
+
+        # One tick per symbol, taken up front so the orders go out without further lookups
+        symbols = [order.get('symbol') for order in orders if isinstance(order, dict) and order.get('symbol')]
+        ticks = {symbol: tick_board.get(symbol) for symbol in dict.fromkeys(symbols)}
+
+        batch_start = perf_counter()
+        results = []
+        timed_out = None
+        for index, order in enumerate(orders):
+            entry = {"index": index, "symbol": order.get('symbol') if isinstance(order, dict) else None, "success": False}
+            results.append(entry)
+            try:
+                if not isinstance(order, dict):
+                    raise ValueError("Order must be an object")
+                request_data = build_market_order(order, ticks.get(order.get('symbol')))
+            except ValueError as e:
+                entry["error"] = str(e)
+                continue
+
+            entry["price"] = request_data["price"]
+            sent_at = perf_counter()
+            try:
+                result, error = mt5.call_with_error('order_send', request_data)
+            except MT5CallTimeout as e:
+                # The terminal is stuck: this order may still go through, the rest are not sent
+                entry["error"] = f"{e}; the order may still be executed"
+                timed_out = e
+                break
+            entry["sent_after_ms"] = (sent_at - batch_start) * 1000
+            entry["latency_ms"] = (perf_counter() - sent_at) * 1000
+
+            if result is None:
+                entry["error"] = f"Order failed: {error}"
+            elif result.retcode != mt5.TRADE_RETCODE_DONE:
+                entry["error"] = f"Order failed: {result.comment}"
+                entry["result"] = result._asdict()
+            else:
+                entry["success"] = True
+                entry["result"] = result._asdict()
+
+        for index in range(len(results), len(orders)):
+            order = orders[index]
+            results.append({"index": index, "symbol": order.get('symbol') if isinstance(order, dict) else None,
+                            "success": False, "error": f"Not sent: {timed_out}"})
+
+        succeeded = sum(1 for entry in results if entry["success"])
+        return jsonify({
+            "results": results,
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "elapsed_ms": (perf_counter() - batch_start) * 1000
+        }), 504 if timed_out else 200
+
+    except MT5CallTimeout:
+        raise
+    except Exception as e:
+        logger.error(f"Error in send_market_orders_batch: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
@@ -1,8 +1,13 @@
 from flask import Blueprint, jsonify, request
-import MetaTrader5 as mt5
+from executor import mt5, trade_priority, MT5CallTimeout
 import logging
-from lib import close_position, close_all_positions, get_positions
+import pandas as pd
+from time import perf_counter
+from lib import close_position, close_all_positions, get_positions, build_sltp_request
 from flasgger import swag_from
+from positions_delta import positions_delta
+from etag import content_etag, conditional_response
+from singleflight import singleflight
 from routes.auth import require_auth  # ✅ Importar middleware
 
 position_bp = Blueprint('position', __name__)
@@ -65,6 +70,7 @@ logger = logging.getLogger(__name__)
         }
     }
 })
+@trade_priority
 def close_position_endpoint():
     """
     Close a Specific Position
@@ -82,6 +88,8 @@ def close_position_endpoint():
         
         return jsonify({"message": "Position closed successfully", "result": result._asdict()})
     
+    except MT5CallTimeout:
+        raise
     except Exception as e:
         logger.error(f"Error in close_position: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
@@ -137,6 +145,7 @@ def close_position_endpoint():
         }
     }
 })
+@trade_priority
 def close_all_positions_endpoint():
     """
     Close All Positions
@@ -157,6 +166,8 @@ def close_all_positions_endpoint():
             "results": [result._asdict() for result in results]
         })
     
+    except MT5CallTimeout:
+        raise
     except Exception as e:
         logger.error(f"Error in close_all_positions: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
@@ -211,6 +222,7 @@ def close_all_positions_endpoint():
         }
     }
 })
+@trade_priority
 def modify_sl_tp_endpoint():
     """
     Modify Stop Loss and Take Profit
@@ -239,10 +251,153 @@ def modify_sl_tp_endpoint():
         
         return jsonify({"message": "SL/TP modified successfully", "result": result._asdict()})
     
+    except MT5CallTimeout:
+        raise
     except Exception as e:
         logger.error(f"Error in modify_sl_tp: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
 
+@position_bp.route('/modify_sl_tp/batch', methods=['POST'])
+@require_auth
+@swag_from({
+    'tags': ['Position'],
+    'security': [{'ApiKeyAuth': []}],
+    'parameters': [
+        {
+            'name': 'body',
+            'in': 'body',
+            'required': True,
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'modifications': {
+                        'type': 'array',
+                        'description': 'SL/TP changes; a missing sl or tp keeps the current level.',
+                        'items': {
+                            'type': 'object',
+                            'properties': {
+                                'position': {'type': 'integer', 'description': 'Position ticket (alias: ticket).'},
+                                'sl': {'type': 'number'},
+                                'tp': {'type': 'number'}
+                            },
+                            'required': ['position']
+                        }
+                    }
+                },
+                'required': ['modifications']
+            }
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Every modification was attempted; results are in request order.',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'results': {
+                        'type': 'array',
+                        'items': {
+                            'type': 'object',
+                            'properties': {
+                                'index': {'type': 'integer'},
+                                'position': {'type': 'integer'},
+                                'success': {'type': 'boolean'},
+                                'error': {'type': 'string'},
+                                'result': {'type': 'object'},
+                                'latency_ms': {'type': 'number'}
+                            }
+                        }
+                    },
+                    'succeeded': {'type': 'integer'},
+                    'failed': {'type': 'integer'},
+                    'elapsed_ms': {'type': 'number'}
+                }
+            }
+        },
+        400: {
+            'description': 'No modifications given.'
+        },
+        500: {
+            'description': 'Internal server error.'
+        },
+        504: {
+            'description': 'A change timed out in the terminal: results so far, the remaining changes were not sent.'
+        }
+    }
+})
+@trade_priority
+def modify_sl_tp_batch_endpoint():
+    """
+    Modify Stop Loss and Take Profit in Batch
+    ---
+    description: Apply SL/TP changes to several positions in one request, back-to-back.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        modifications = data.get('modifications')
+        if not isinstance(modifications, list) or not modifications:
+            return jsonify({"error": "A non-empty list of modifications is required"}), 400
+
+        # One positions snapshot supplies the symbol and unchanged levels for every ticket
+        positions = mt5.positions_get()
+        if positions is None:
+            return jsonify({"error": "Failed to retrieve positions"}), 500
+        positions_by_ticket = {position.ticket: position._asdict() for position in positions}
+
+        batch_start = perf_counter()
+        results = []
+        timed_out = None
+        for index, modification in enumerate(modifications):
+            ticket = modification.get('position', modification.get('ticket')) if isinstance(modification, dict) else None
+            entry = {"index": index, "position": ticket, "success": False}
+            results.append(entry)
+            try:
+                if not isinstance(modification, dict):
+                    raise ValueError("Modification must be an object")
+                position = positions_by_ticket.get(int(ticket)) if ticket is not None else None
+                request_data = build_sltp_request(modification, position)
+            except (TypeError, ValueError) as e:
+                entry["error"] = str(e)
+                continue
+
+            sent_at = perf_counter()
+            try:
+                result, error = mt5.call_with_error('order_send', request_data)
+            except MT5CallTimeout as e:
+                # The terminal is stuck: this change may still be applied, the rest are not sent
+                entry["error"] = f"{e}; the change may still be applied"
+                timed_out = e
+                break
+            entry["latency_ms"] = (perf_counter() - sent_at) * 1000
+
+            if result is None:
+                entry["error"] = f"Failed to modify SL/TP: {error}"
+            elif result.retcode != mt5.TRADE_RETCODE_DONE:
+                entry["error"] = f"Failed to modify SL/TP: {result.comment}"
+                entry["result"] = result._asdict()
+            else:
+                entry["success"] = True
+                entry["result"] = result._asdict()
+
+        for index in range(len(results), len(modifications)):
+            modification = modifications[index]
+            ticket = modification.get('position', modification.get('ticket')) if isinstance(modification, dict) else None
+            results.append({"index": index, "position": ticket, "success": False, "error": f"Not sent: {timed_out}"})
+
+        succeeded = sum(1 for entry in results if entry["success"])
+        return jsonify({
+            "results": results,
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "elapsed_ms": (perf_counter() - batch_start) * 1000
+        }), 504 if timed_out else 200
+
+    except MT5CallTimeout:
+        raise
+    except Exception as e:
+        logger.error(f"Error in modify_sl_tp_batch: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
 @position_bp.route('/get_positions', methods=['GET'])
 @require_auth  # ✅ Añadir protección
 @swag_from({
@@ -255,6 +410,22 @@ def modify_sl_tp_endpoint():
             'type': 'integer',
             'required': False,
             'description': 'Magic number to filter positions.'
+        },
+        {
+            'name': 'cursor',
+            'in': 'query',
+            'type': 'string',
+            'required': False,
+            'description': 'Delta mode: the cursor from the previous delta response (empty for the first call). '
+                           'The response then holds only added, changed and removed tickets plus price/profit/swap marks '
+                           'for every ticket; full=true means the cursor was unknown and added holds every position.'
+        },
+        {
+            'name': 'If-None-Match',
+            'in': 'header',
+            'type': 'string',
+            'required': False,
+            'description': 'ETag of a previous full response; answered with 304 if the positions are unchanged.'
         }
     ],
     'responses': {
@@ -288,6 +459,9 @@ def modify_sl_tp_endpoint():
                 }
             }
         },
+        304: {
+            'description': 'Positions unchanged since the ETag given in If-None-Match.'
+        },
         400: {
             'description': 'Bad request or failed to retrieve positions.'
         },
@@ -296,6 +470,7 @@ def modify_sl_tp_endpoint():
         }
     }
 })
+@singleflight
 def get_positions_endpoint():
     """
     Get Open Positions
@@ -305,16 +480,26 @@ def get_positions_endpoint():
     try:
         magic = request.args.get('magic', type=int)
 
+        if 'cursor' in request.args:
+            delta = positions_delta.delta(request.args['cursor'], magic)
+            if delta is None:
+                return jsonify({"error": "Failed to retrieve positions"}), 500
+            return jsonify(delta), 200
+
         positions_df = get_positions(magic)
 
         if positions_df is None:
             return jsonify({"error": "Failed to retrieve positions"}), 500
             
         if positions_df.empty:
-            return jsonify({"positions": []}), 200
-            
-        return jsonify(positions_df.to_dict(orient='records')), 200
+            return conditional_response(content_etag('application/json'), lambda: jsonify({"positions": []}))
+
+        # price_current and profit are part of every row, so the hash covers tick-driven changes too
+        etag = content_etag('application/json', pd.util.hash_pandas_object(positions_df, index=False).values)
+        return conditional_response(etag, lambda: jsonify(positions_df))
     
+    except MT5CallTimeout:
+        raise
     except Exception as e:
         logger.error(f"Error in get_positions: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
@@ -342,6 +527,7 @@ def get_positions_endpoint():
         }
     }
 })
+@singleflight
 def positions_total_endpoint():
     """
     Get Total Open Positions
@@ -355,6 +541,8 @@ def positions_total_endpoint():
         
         return jsonify({"total": total})
     
+    except MT5CallTimeout:
+        raise
     except Exception as e:
         logger.error(f"Error in positions_total: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
\ No newline at end of file
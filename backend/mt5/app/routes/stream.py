@@ -0,0 +1,133 @@
+import os
+import json
+import logging
+from flask import Blueprint, Response, jsonify, request
+from flasgger import swag_from
+from events import event_bus
+from tick_board import tick_board
+from routes.auth import require_auth
+
+stream_bp = Blueprint('stream', __name__)
+logger = logging.getLogger(__name__)
+
+STREAM_KEEPALIVE = float(os.environ.get('STREAM_KEEPALIVE', 15))  # seconds between keepalive comments
+STREAM_RETRY_MS = 1000  # reconnect delay suggested to EventSource clients
+EVENT_TYPES = ('tick', 'position', 'deal')
+
+
+def _event_id(seq: int) -> str:
+    return f"{event_bus.epoch}-{seq}"
+
+
+def _parse_event_id(value):
+    """Sequence number from an ``<epoch>-<seq>`` id, or None if it belongs to an earlier bridge run."""
+    epoch, _, seq = (value or '').partition('-')
+    if not seq.isdigit() or epoch != str(event_bus.epoch):
+        return None
+    return int(seq)
+
+
+def _format(event_type: str, seq: int, data) -> str:
+    return f"id: {_event_id(seq)}\nevent: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@stream_bp.route('/stream', methods=['GET'])
+@require_auth
+@swag_from({
+    'tags': ['Stream'],
+    'security': [{'ApiKeyAuth': []}],
+    'parameters': [
+        {
+            'name': 'symbols',
+            'in': 'query',
+            'type': 'string',
+            'required': False,
+            'description': 'Comma-separated symbols to receive ticks for; they are polled while the stream is open. All polled symbols if omitted.'
+        },
+        {
+            'name': 'types',
+            'in': 'query',
+            'type': 'string',
+            'required': False,
+            'default': 'tick,position,deal',
+            'description': 'Comma-separated event types to receive.'
+        },
+        {
+            'name': 'since',
+            'in': 'query',
+            'type': 'string',
+            'required': False,
+            'description': 'Resume after this event id (same as the Last-Event-ID header).'
+        }
+    ],
+    'produces': ['text/event-stream'],
+    'responses': {
+        200: {
+            'description': 'Server-sent events. Each event id is "<epoch>-<seq>" with seq increasing by one per published event. '
+                           'A "reset" event means the requested resume point is no longer available and client state should be reloaded.'
+        },
+        400: {
+            'description': 'Unknown event type.'
+        }
+    }
+})
+def stream_endpoint():
+    """
+    Event Stream
+    ---
+    description: Push tick updates and position/deal changes as server-sent events, resumable by event id.
+    """
+    symbols = [s.strip() for s in request.args.get('symbols', '').split(',') if s.strip()]
+    types = [t.strip() for t in request.args.get('types', ','.join(EVENT_TYPES)).split(',') if t.strip()]
+    unknown = set(types) - set(EVENT_TYPES)
+    if unknown:
+        return jsonify({"error": f"Unknown event types: {sorted(unknown)}"}), 400
+
+    resume_id = request.args.get('since') or request.headers.get('Last-Event-ID')
+    resume_seq = _parse_event_id(resume_id)
+    symbol_filter = set(symbols)
+    type_filter = set(types)
+    start_seq = event_bus.seq
+
+    def wanted(event):
+        if event['type'] not in type_filter:
+            return False
+        return event['type'] != 'tick' or not symbol_filter or event['data']['symbol'] in symbol_filter
+
+    def generate():
+        tick_board.watch(symbols)
+        try:
+            yield f"retry: {STREAM_RETRY_MS}\n\n"
+            seq = start_seq
+            if resume_id:
+                backlog = event_bus.since(resume_seq) if resume_seq is not None else None
+                if backlog is None:
+                    yield _format('reset', seq, {'reason': 'resume point unavailable', 'seq': seq})
+                else:
+                    for event in backlog:
+                        if wanted(event):
+                            yield _format(event['type'], event['seq'], event)
+                    if backlog:
+                        seq = backlog[-1]['seq']
+
+            while True:
+                events = event_bus.wait(seq, STREAM_KEEPALIVE)
+                if events is None:
+                    # This subscriber fell behind the buffer
+                    seq = event_bus.seq
+                    yield _format('reset', seq, {'reason': 'subscriber fell behind', 'seq': seq})
+                    continue
+                if not events:
+                    yield ": keepalive\n\n"
+                    continue
+                for event in events:
+                    if wanted(event):
+                        yield _format(event['type'], event['seq'], event)
+                seq = events[-1]['seq']
+        finally:
+            tick_board.unwatch(symbols)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
@@ -1,8 +1,12 @@
-from flask import Blueprint, jsonify
-import MetaTrader5 as mt5
+from flask import Blueprint, jsonify, request
+from executor import mt5
 from flasgger import swag_from
 import logging
+from singleflight import singleflight
 from routes.auth import require_auth  # ✅ Importar middleware
+from tick_board import tick_board
+from symbol_specs import symbol_specs
+from etag import content_etag, conditional_response
 
 symbol_bp = Blueprint('symbol', __name__)
 logger = logging.getLogger(__name__)
@@ -31,7 +35,9 @@ logger = logging.getLogger(__name__)
                     'ask': {'type': 'number'},
                     'last': {'type': 'number'},
                     'volume': {'type': 'integer'},
-                    'time': {'type': 'integer'}
+                    'time': {'type': 'integer'},
+                    'time_msc': {'type': 'integer'},
+                    'age_ms': {'type': 'integer', 'description': 'Milliseconds since the bridge last polled this tick.'}
                 }
             }
         },
@@ -40,18 +46,85 @@ logger = logging.getLogger(__name__)
         }
     }
 })
+@singleflight
 def get_symbol_info_tick_endpoint(symbol):
     """
     Get Symbol Tick Information
     ---
     description: Retrieve the latest tick information for a given symbol.
     """
-    tick = mt5.symbol_info_tick(symbol)
+    tick = tick_board.get(symbol)
     if tick is None:
         return jsonify({"error": "Failed to get symbol tick info"}), 404
     
-    tick_dict = tick._asdict()
-    return jsonify(tick_dict)
+    return jsonify(tick)
+
+TICK_FIELDS = ['time', 'time_msc', 'bid', 'ask', 'last', 'volume', 'volume_real', 'flags', 'age_ms']
+
+@symbol_bp.route('/symbol_info_ticks', methods=['GET'])
+@require_auth
+@swag_from({
+    'tags': ['Symbol'],
+    'security': [{'ApiKeyAuth': []}],
+    'parameters': [
+        {
+            'name': 'symbols',
+            'in': 'query',
+            'type': 'string',
+            'required': True,
+            'description': 'Comma-separated symbol names (e.g., EURUSD,USDJPY,XAUUSD).'
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Latest ticks as parallel arrays: element i of every field array belongs to symbols[i]. Symbols without a tick are listed in missing.',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'symbols': {'type': 'array', 'items': {'type': 'string'}},
+                    'time': {'type': 'array', 'items': {'type': 'integer'}},
+                    'time_msc': {'type': 'array', 'items': {'type': 'integer'}},
+                    'bid': {'type': 'array', 'items': {'type': 'number'}},
+                    'ask': {'type': 'array', 'items': {'type': 'number'}},
+                    'last': {'type': 'array', 'items': {'type': 'number'}},
+                    'volume': {'type': 'array', 'items': {'type': 'integer'}},
+                    'volume_real': {'type': 'array', 'items': {'type': 'number'}},
+                    'flags': {'type': 'array', 'items': {'type': 'integer'}},
+                    'age_ms': {'type': 'array', 'items': {'type': 'integer'}},
+                    'missing': {'type': 'array', 'items': {'type': 'string'}}
+                }
+            }
+        },
+        400: {
+            'description': 'Symbols parameter is missing.'
+        }
+    }
+})
+@singleflight
+def get_symbol_info_ticks_endpoint():
+    """
+    Get Tick Information for Multiple Symbols
+    ---
+    description: Retrieve the latest tick for several symbols in a single round trip.
+    """
+    symbols = [s.strip() for s in request.args.get('symbols', '').split(',') if s.strip()]
+    if not symbols:
+        return jsonify({"error": "Symbols parameter is required"}), 400
+
+    ticks = {'symbols': []}
+    ticks.update({field: [] for field in TICK_FIELDS})
+    missing = []
+    for symbol in dict.fromkeys(symbols):
+        tick = tick_board.get(symbol)
+        if tick is None:
+            missing.append(symbol)
+            continue
+        ticks['symbols'].append(symbol)
+        for field in TICK_FIELDS:
+            ticks[field].append(tick[field])
+
+    ticks['missing'] = missing
+    return jsonify(ticks)
 
 @symbol_bp.route('/symbol_info/<symbol>', methods=['GET'])
 @require_auth  # ✅ Añadir protección
@@ -65,6 +138,13 @@ def get_symbol_info_tick_endpoint(symbol):
             'type': 'string',
             'required': True,
             'description': 'Symbol name to retrieve information.'
+        },
+        {
+            'name': 'If-None-Match',
+            'in': 'header',
+            'type': 'string',
+            'required': False,
+            'description': 'ETag of a previous response; answered with 304 if the symbol info is unchanged.'
         }
     ],
     'responses': {
@@ -87,11 +167,15 @@ def get_symbol_info_tick_endpoint(symbol):
                 }
             }
         },
+        304: {
+            'description': 'Symbol info unchanged since the ETag given in If-None-Match.'
+        },
         404: {
             'description': 'Failed to get symbol info.'
         }
     }
 })
+@singleflight
 def get_symbol_info(symbol):
     """
     Get Symbol Information
@@ -102,5 +186,103 @@ def get_symbol_info(symbol):
     if symbol_info is None:
         return jsonify({"error": "Failed to get symbol info"}), 404
     
-    symbol_info_dict = symbol_info._asdict()
-    return jsonify(symbol_info_dict)
\ No newline at end of file
+    symbol_specs.update(symbol_info._asdict())
+    return conditional_response(content_etag('application/json', symbol_info), lambda: jsonify(symbol_info))
+
+@symbol_bp.route('/symbol_spec/<symbol>', methods=['GET'])
+@require_auth
+@swag_from({
+    'tags': ['Symbol'],
+    'security': [{'ApiKeyAuth': []}],
+    'parameters': [
+        {
+            'name': 'symbol',
+            'in': 'path',
+            'type': 'string',
+            'required': True,
+            'description': 'Symbol name to retrieve the specification for.'
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Static symbol specification (no prices), served from a TTL cache.',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'name': {'type': 'string'},
+                    'digits': {'type': 'integer'},
+                    'point': {'type': 'number'},
+                    'trade_contract_size': {'type': 'number'},
+                    'volume_min': {'type': 'number'},
+                    'volume_max': {'type': 'number'},
+                    'volume_step': {'type': 'number'},
+                    'filling_mode': {'type': 'integer'},
+                    'trade_mode': {'type': 'integer'}
+                }
+            }
+        },
+        404: {
+            'description': 'Failed to get symbol info.'
+        }
+    }
+})
+@singleflight
+def get_symbol_spec(symbol):
+    """
+    Get Symbol Specification
+    ---
+    description: Retrieve the contract specification of a symbol without its current prices.
+    """
+    spec = symbol_specs.get(symbol)
+    if spec is None:
+        return jsonify({"error": "Failed to get symbol info"}), 404
+
+    return jsonify(spec)
+
+@symbol_bp.route('/symbol_select', methods=['POST'])
+@require_auth
+@swag_from({
+    'tags': ['Symbol'],
+    'security': [{'ApiKeyAuth': []}],
+    'parameters': [
+        {
+            'name': 'body',
+            'in': 'body',
+            'required': True,
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'symbol': {'type': 'string'},
+                    'enable': {'type': 'boolean', 'default': True}
+                },
+                'required': ['symbol']
+            }
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Symbol selected or removed from Market Watch.'
+        },
+        400: {
+            'description': 'Symbol is missing or the terminal rejected the selection.'
+        }
+    }
+})
+def symbol_select_endpoint():
+    """
+    Select Symbol
+    ---
+    description: Add a symbol to (or remove it from) Market Watch and drop its cached specification.
+    """
+    data = request.get_json(silent=True) or {}
+    symbol = data.get('symbol')
+    if not symbol:
+        return jsonify({"error": "Symbol is required"}), 400
+
+    enable = bool(data.get('enable', True))
+    selected = mt5.symbol_select(symbol, enable)
+    symbol_specs.invalidate(symbol)
+    if not selected:
+        return jsonify({"error": f"Failed to select symbol: {mt5.last_error()}"}), 400
+
+    return jsonify({"symbol": symbol, "enable": enable})
\ No newline at end of file
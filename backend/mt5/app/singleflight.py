@@ -0,0 +1,101 @@
+import os
+import time
+import threading
+from functools import wraps
+from typing import Dict
+
+from flask import Response, make_response, request
+
+# Seconds a finished response is still handed to identical requests that arrive after it
+SINGLEFLIGHT_WINDOW = float(os.environ.get('SINGLEFLIGHT_WINDOW', 0.05))
+# Request headers that change the response of a read route
+KEY_HEADERS = ('Accept', 'If-None-Match')
+
+
+class _Call:
+    __slots__ = ('event', 'snapshot', 'done_at')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.snapshot = None
+        self.done_at = None
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent read requests.
+
+    The first request for a key (the leader) runs the view; requests for the same key that
+    arrive while it runs, or up to ``window`` seconds after it finished, get a copy of its
+    response instead of querying the terminal again. Streamed responses cannot be copied,
+    so requests merged into one run the view themselves.
+    """
+
+    def __init__(self, window: float = SINGLEFLIGHT_WINDOW):
+        self.window = window
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {'leaders': 0, 'merged': 0, 'hits': 0, 'unshareable': 0}
+
+    def _expired(self, call: _Call, now: float) -> bool:
+        return call.done_at is not None and now - call.done_at > self.window
+
+    def run(self, key, view) -> Response:
+        now = time.monotonic()
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None or self._expired(call, now):
+                for stale in [k for k, c in self._calls.items() if self._expired(c, now)]:
+                    del self._calls[stale]
+                call = self._calls[key] = _Call()
+                leader = True
+                self._stats['leaders'] += 1
+            else:
+                leader = False
+                self._stats['merged' if call.done_at is None else 'hits'] += 1
+
+        if leader:
+            try:
+                response = make_response(view())
+                if not response.is_streamed and not response.direct_passthrough:
+                    call.snapshot = (response.get_data(), response.status_code, list(response.headers.items()))
+                return response
+            finally:
+                call.done_at = time.monotonic()
+                call.event.set()
+                if call.snapshot is None or self.window <= 0:
+                    with self._lock:
+                        if self._calls.get(key) is call:
+                            del self._calls[key]
+
+        call.event.wait()
+        if call.snapshot is None:
+            with self._lock:
+                self._stats['unshareable'] += 1
+            return make_response(view())
+        data, status, headers = call.snapshot
+        return Response(data, status=status, headers=headers)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = sum(1 for call in self._calls.values() if call.done_at is None)
+        requests = stats['leaders'] + stats['merged'] + stats['hits']
+        stats['coalesced_ratio'] = (stats['merged'] + stats['hits']) / requests if requests else 0.0
+        return stats
+
+
+single_flight = SingleFlight()
+
+
+def singleflight(f):
+    """Share one run of the decorated GET view between identical concurrent requests."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = (
+            request.path,
+            tuple(sorted(request.args.items(multi=True))),
+            tuple(request.headers.get(header, '') for header in KEY_HEADERS),
+        )
+        return single_flight.run(key, lambda: f(*args, **kwargs))
+    return decorated_function
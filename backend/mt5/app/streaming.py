@@ -0,0 +1,87 @@
+import os
+import logging
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from flask import Response, request
+
+from columnar import COLUMNAR_STREAM_MIMETYPE, encode_stream_frame, rates_columns
+from json_provider import dumps_bytes
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+STREAM_MIMETYPES = (NDJSON_MIMETYPE, COLUMNAR_STREAM_MIMETYPE)
+STREAM_PAGE_SECONDS = int(os.environ.get('STREAM_PAGE_SECONDS', 7 * 24 * 60 * 60))  # deal history per page
+STREAM_PAGE_BARS = int(os.environ.get('STREAM_PAGE_BARS', 50000))  # nominal bars per rates page
+
+
+def wants_stream(*offers: str) -> Optional[str]:
+    """
+    The streaming mimetype the client asked for, or None for a regular response.
+
+    Streaming is opt-in: it is only chosen when the Accept header names one of ``offers``
+    explicitly and prefers it over JSON.
+    """
+    accept = request.accept_mimetypes
+    offers = offers or STREAM_MIMETYPES
+    best = accept.best_match(('application/json',) + offers)
+    return best if best in offers and best in accept.values() else None
+
+
+def time_windows(start: int, end: int, step: int) -> Iterator[Tuple[int, int, Optional[int]]]:
+    """
+    Split the inclusive range [start, end] (epoch seconds) into pages.
+
+    :return: (from, to, cursor) tuples with inclusive, non-overlapping bounds; ``cursor`` is
+             where the next page starts, or None on the last page.
+    """
+    step = max(1, step)
+    window_from = start
+    while window_from <= end:
+        window_to = min(window_from + step - 1, end)
+        cursor = window_to + 1 if window_to < end else None
+        yield window_from, window_to, cursor
+        window_from = window_to + 1
+
+
+def ndjson_pages(fetch: Callable, start: int, end: int, step: int, key: str) -> Iterator[bytes]:
+    """
+    One NDJSON line per time window: {"from", "to", "cursor", <key>: [...]}.
+
+    ``fetch(from, to)`` returns the items of a window, or None on failure. A failure ends the
+    stream with an {"error", "cursor"} line, the cursor being where to resume from. A complete
+    stream ends with a page whose cursor is null.
+    """
+    for window_from, window_to, cursor in time_windows(start, end, step):
+        try:
+            items = fetch(window_from, window_to)
+        except Exception as e:
+            logger.error(f"Error streaming {key} for {window_from}-{window_to}: {str(e)}")
+            items = None
+        if items is None:
+            yield dumps_bytes({"error": f"Failed to get {key}", "cursor": window_from}) + b'\n'
+            return
+        yield dumps_bytes({"from": window_from, "to": window_to, "cursor": cursor, key: items}) + b'\n'
+
+
+def columnar_pages(fetch: Callable, start: int, end: int, step: int, meta: Dict) -> Iterator[bytes]:
+    """
+    One columnar frame of rates per time window, with from/to/cursor added to ``meta``.
+
+    A failure ends the stream with an empty frame whose meta holds "error" and "cursor".
+    """
+    for window_from, window_to, cursor in time_windows(start, end, step):
+        try:
+            rates = fetch(window_from, window_to)
+        except Exception as e:
+            logger.error(f"Error streaming rates for {window_from}-{window_to}: {str(e)}")
+            rates = None
+        if rates is None:
+            yield encode_stream_frame({}, dict(meta, error="Failed to get rates data", cursor=window_from))
+            return
+        yield encode_stream_frame(rates_columns(rates), dict(meta, cursor=cursor, **{'from': window_from, 'to': window_to}))
+
+
+def stream_response(chunks: Iterator[bytes], mimetype: str) -> Response:
+    # X-Accel-Buffering keeps reverse proxies from holding pages back
+    return Response(chunks, mimetype=mimetype, headers={'X-Accel-Buffering': 'no'})
@@ -0,0 +1,69 @@
+import os
+import time
+import logging
+import threading
+from typing import Dict, Optional
+
+from executor import mt5
+
+logger = logging.getLogger(__name__)
+
+SYMBOL_SPEC_TTL = float(os.environ.get('SYMBOL_SPEC_TTL', 3600))  # seconds
+
+# symbol_info fields that describe the contract rather than the market; quotes, volumes and
+# session statistics are deliberately left out so a cached spec is never mistaken for a price.
+# Tick values (which follow the profit currency rate), swaps and margin rates can change during
+# the day too, so they are not cached either: read them from symbol_info.
+STATIC_FIELDS = [
+    'name', 'description', 'path', 'digits', 'point', 'spread_float',
+    'currency_base', 'currency_profit', 'currency_margin',
+    'trade_mode', 'trade_calc_mode', 'trade_exemode', 'filling_mode', 'expiration_mode', 'order_mode',
+    'trade_contract_size', 'trade_tick_size', 'trade_stops_level', 'trade_freeze_level',
+    'volume_min', 'volume_max', 'volume_step', 'volume_limit', 'swap_mode',
+]
+
+
+class SymbolSpecCache:
+    """
+    Static symbol specifications (contract size, volume limits, digits, filling modes...)
+    cached per symbol for ``ttl`` seconds.
+
+    Entries are dropped early when a symbol is (de)selected in Market Watch, since that is
+    when the terminal may load a different specification.
+    """
+
+    def __init__(self, ttl: float = SYMBOL_SPEC_TTL):
+        self.ttl = ttl
+        self._specs = {}
+        self._lock = threading.Lock()
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        """
+        :return: The static fields of ``symbol_info(symbol)``, or None if the symbol is unknown.
+        """
+        with self._lock:
+            entry = self._specs.get(symbol)
+        if entry is not None and time.monotonic() - entry[1] < self.ttl:
+            return entry[0]
+
+        info = mt5.symbol_info(symbol)
+        if info is None:
+            return None
+        return self.update(info._asdict())
+
+    def update(self, info: Dict) -> Dict:
+        """Store the static part of a freshly read ``symbol_info`` dict and return it."""
+        spec = {field: info[field] for field in STATIC_FIELDS if field in info}
+        with self._lock:
+            self._specs[info['name']] = (spec, time.monotonic())
+        return spec
+
+    def invalidate(self, symbol: str = None):
+        with self._lock:
+            if symbol is None:
+                self._specs.clear()
+            else:
+                self._specs.pop(symbol, None)
+
+
+symbol_specs = SymbolSpecCache()
@@ -0,0 +1,200 @@
+import os
+import time
+import logging
+import threading
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+from executor import mt5
+
+from events import event_bus
+from connection import connection
+from history_store import history_store
+
+logger = logging.getLogger(__name__)
+
+TICK_POLL_INTERVAL = float(os.environ.get('TICK_POLL_INTERVAL', 0.25))  # seconds between polls
+TICK_POLL_SYMBOLS = [s.strip() for s in os.environ.get('TICK_POLL_SYMBOLS', '').split(',') if s.strip()]
+TICK_MAX_AGE = float(os.environ.get('TICK_MAX_AGE', 1.0))  # seconds before a board entry is re-read inline
+TICK_IDLE_TTL = float(os.environ.get('TICK_IDLE_TTL', 300))  # seconds an unread discovered symbol stays polled
+POSITION_POLL_INTERVAL = float(os.environ.get('POSITION_POLL_INTERVAL', 1.0))  # seconds between position diffs
+
+# Position fields whose change is reported as a 'modified' event (prices and profit move every tick)
+POSITION_STATE_FIELDS = ('volume', 'sl', 'tp', 'time_update_msc')
+# How far back the first deal sync looks; deals before that are never published
+DEAL_LOOKBACK = 86400
+
+
+class TickBoard:
+    """
+    Latest-tick table kept fresh by a background thread.
+
+    Symbols are polled when configured through TICK_POLL_SYMBOLS, when they have an open
+    position, while a stream subscribes to them, or once a request has read a tick for them
+    (until unread for TICK_IDLE_TTL seconds). Readers get the last polled tick plus its
+    ``age_ms`` and only hit the terminal themselves when the entry is older than ``max_age``.
+
+    The same thread diffs open positions every POSITION_POLL_INTERVAL seconds and publishes
+    'tick', 'position' and 'deal' events on the event bus as things change.
+    """
+
+    def __init__(self, interval: float = TICK_POLL_INTERVAL, symbols=TICK_POLL_SYMBOLS,
+                 max_age: float = TICK_MAX_AGE, idle_ttl: float = TICK_IDLE_TTL):
+        self.interval = interval
+        self.max_age = max_age
+        self.idle_ttl = idle_ttl
+        self._pinned = set(symbols)
+        self._last_read = {}
+        self._watched = Counter()
+        self._position_symbols = set()
+        self._positions = None
+        self._deal_cursor = None
+        self._seen_deals = set()
+        self._ticks = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_position_poll = 0.0
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='tick-board', daemon=True)
+        self._thread.start()
+        logger.info(f"Tick board polling every {self.interval}s")
+
+    def stop(self):
+        self._stop.set()
+
+    def get(self, symbol: str, max_age: Optional[float] = None) -> Optional[Dict]:
+        """
+        Latest tick for ``symbol`` as a dict with an added ``age_ms`` field.
+
+        :param max_age: Maximum acceptable entry age in seconds (defaults to TICK_MAX_AGE).
+        :return: The tick, or None if the terminal has no tick for the symbol.
+        """
+        max_age = self.max_age if max_age is None else max_age
+        now = time.monotonic()
+        with self._lock:
+            entry = self._ticks.get(symbol)
+
+        if entry is None or now - entry[1] > max_age:
+            entry = self._refresh(symbol)
+            if entry is None:
+                return None
+
+        # Only symbols the terminal returned a tick for are polled, so unknown names are not retried
+        with self._lock:
+            self._last_read[symbol] = now
+
+        tick, polled_at = entry
+        return dict(tick, age_ms=int((time.monotonic() - polled_at) * 1000))
+
+    def symbols(self):
+        with self._lock:
+            return sorted(self._pinned | self._position_symbols | set(self._watched) | set(self._last_read))
+
+    def watch(self, symbols: Iterable[str]):
+        """Keep ``symbols`` polled until a matching ``unwatch`` (calls are reference counted)."""
+        with self._lock:
+            self._watched.update(symbols)
+
+    def unwatch(self, symbols: Iterable[str]):
+        with self._lock:
+            self._watched.subtract(symbols)
+            self._watched = +self._watched
+
+    def _refresh(self, symbol: str):
+        tick = mt5.symbol_info_tick(symbol)
+        if tick is None:
+            return None
+        tick = tick._asdict()
+        entry = (tick, time.monotonic())
+        with self._lock:
+            previous = self._ticks.get(symbol)
+            self._ticks[symbol] = entry
+
+        if previous is None or previous[0]['time_msc'] != tick['time_msc'] \
+                or previous[0]['bid'] != tick['bid'] or previous[0]['ask'] != tick['ask']:
+            event_bus.publish('tick', dict(tick, symbol=symbol))
+        return entry
+
+    def _poll_positions(self):
+        positions = mt5.positions_get()
+        if positions is None:
+            return
+        current = {position.ticket: position._asdict() for position in positions}
+        self._position_symbols = {position['symbol'] for position in current.values()}
+
+        previous, self._positions = self._positions, current
+        if previous is None:
+            # First poll: take the snapshot and start the deal cursor without replaying history
+            self._sync_deals(publish=False)
+            return
+
+        traded = False
+        for ticket, position in current.items():
+            before = previous.get(ticket)
+            if before is None:
+                event_bus.publish('position', {'event': 'opened', 'position': position})
+                traded = True
+            elif any(before[field] != position[field] for field in POSITION_STATE_FIELDS):
+                event_bus.publish('position', {'event': 'modified', 'position': position})
+                traded = traded or before['volume'] != position['volume']
+        for ticket in previous.keys() - current.keys():
+            event_bus.publish('position', {'event': 'closed', 'position': previous[ticket]})
+            traded = True
+
+        if traded:
+            self._sync_deals()
+            history_store.wake()
+
+    def _sync_deals(self, publish: bool = True):
+        # Deal times are terminal server time, so the window is padded instead of trusting the local clock
+        date_from = self._deal_cursor if self._deal_cursor is not None else int(time.time()) - DEAL_LOOKBACK
+        deals = mt5.history_deals_get(date_from, int(time.time()) + DEAL_LOOKBACK)
+        if deals is None:
+            return
+        history_store.add_deals(deals)
+        for deal in sorted(deals, key=lambda deal: deal.time_msc):
+            if deal.ticket in self._seen_deals:
+                continue
+            self._seen_deals.add(deal.ticket)
+            if publish:
+                event_bus.publish('deal', deal._asdict())
+        if deals:
+            self._deal_cursor = max(deal.time for deal in deals)
+            # Deals at the cursor second may be returned again; older tickets can be forgotten
+            self._seen_deals = {deal.ticket for deal in deals if deal.time >= self._deal_cursor}
+        elif self._deal_cursor is None:
+            self._deal_cursor = date_from
+
+    def poll(self):
+        now = time.monotonic()
+        if now - self._last_position_poll >= POSITION_POLL_INTERVAL:
+            self._last_position_poll = now
+            self._poll_positions()
+
+        with self._lock:
+            for symbol, last_read in list(self._last_read.items()):
+                if now - last_read > self.idle_ttl:
+                    del self._last_read[symbol]
+                    if symbol not in self._pinned and symbol not in self._position_symbols \
+                            and symbol not in self._watched:
+                        self._ticks.pop(symbol, None)
+
+        for symbol in self.symbols():
+            self._refresh(symbol)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not connection.connected:
+                continue
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Error polling ticks: {str(e)}")
+
+
+tick_board = TickBoard()
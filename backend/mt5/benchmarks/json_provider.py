@@ -0,0 +1,113 @@
+"""
+Micro-benchmark: Flask's default JSON provider vs. the orjson provider.
+
+Compares the response bodies the bridge builds for /get_positions (a positions DataFrame)
+and /fetch_data_pos (a copy_rates_* structured array), each the old way (per-row dicts
+through the stdlib encoder) and the new way (the MT5 result handed to ``jsonify``).
+
+    python benchmarks/json_provider.py [--positions 200] [--bars 10000] [--repeat 50]
+
+Runs without a terminal: the payloads are synthetic but shaped like the MT5 results.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+from json_provider import OrjsonProvider, datetime_view  # noqa: E402
+
+TradePosition = namedtuple('TradePosition', [
+    'ticket', 'time', 'time_msc', 'time_update', 'time_update_msc', 'type', 'magic', 'identifier',
+    'reason', 'volume', 'price_open', 'sl', 'tp', 'price_current', 'swap', 'profit', 'symbol',
+    'comment', 'external_id',
+])
+
+RATES_DTYPE = np.dtype([
+    ('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'),
+    ('tick_volume', '<u8'), ('spread', '<i4'), ('real_volume', '<u8'),
+])
+
+
+def make_positions(count: int) -> pd.DataFrame:
+    now = int(time.time())
+    rng = np.random.default_rng(0)
+    return pd.DataFrame([
+        TradePosition(i, now, now * 1000, now, now * 1000, i % 2, 234000, i, 0, 0.1,
+                      1.1 + rng.random() / 100, 1.09, 0.0, 1.1, 0.0, float(rng.normal()), 'EURUSD', '', '')._asdict()
+        for i in range(count)
+    ])
+
+
+def make_rates(count: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    rates = np.zeros(count, dtype=RATES_DTYPE)
+    rates['time'] = int(time.time()) // 60 * 60 - 60 * np.arange(count)[::-1]
+    close = 1.1 + np.cumsum(rng.normal(0, 1e-4, count))
+    rates['open'] = close
+    rates['high'] = close + 1e-4
+    rates['low'] = close - 1e-4
+    rates['close'] = close
+    rates['tick_volume'] = rng.integers(1, 500, count)
+    return rates
+
+
+def timed(function, repeat: int) -> float:
+    """Best wall time of ``repeat`` runs, in milliseconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--positions', type=int, default=200)
+    parser.add_argument('--bars', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    default_app = Flask('default')
+    default_app.json = DefaultJSONProvider(default_app)
+    orjson_app = Flask('orjson')
+    orjson_app.json = OrjsonProvider(orjson_app)
+
+    positions_df = make_positions(args.positions)
+    rates = make_rates(args.bars)
+
+    def old_positions():
+        return default_app.json.response(positions_df.to_dict(orient='records')).get_data()
+
+    def new_positions():
+        return orjson_app.json.response(positions_df).get_data()
+
+    def old_rates():
+        df = pd.DataFrame(rates)
+        df['time'] = pd.to_datetime(df['time'], unit='s')
+        return default_app.json.response(df.to_dict(orient='records')).get_data()
+
+    def new_rates():
+        return orjson_app.json.response(datetime_view(rates)).get_data()
+
+    cases = [
+        (f"positions ({args.positions})", old_positions, new_positions),
+        (f"rates ({args.bars} bars)", old_rates, new_rates),
+    ]
+    with default_app.app_context(), orjson_app.app_context():
+        print(f"{'payload':<22}{'default ms':>12}{'orjson ms':>12}{'speedup':>10}{'bytes':>12}")
+        for name, old, new in cases:
+            old_ms = timed(old, args.repeat)
+            new_ms = timed(new, args.repeat)
+            print(f"{name:<22}{old_ms:>12.2f}{new_ms:>12.2f}{old_ms / new_ms:>9.1f}x{len(new()):>12}")
+
+
+if __name__ == '__main__':
+    main()